@@ -21,11 +21,37 @@ class Config:
     DB_TIMEOUT: int = int(os.getenv("DB_TIMEOUT", "20"))
     HTTP_TIMEOUT: int = int(os.getenv("HTTP_TIMEOUT", "300"))
     REALTIME_POLL_INTERVAL: int = 2
+    CHAT_RECONCILE_INTERVAL: int = 30  # Id-set check of the open room (server-side deletes)
+    REALTIME_RETRY_MIN: float = 2   # Backoff of realtime channels whose join failed (doubles per attempt)
+    REALTIME_RETRY_MAX: float = 60
+
+    # === HTTP Connection Pool (shared by REST / Auth / Storage) ===
+    HTTP_POOL_MAX_CONNECTIONS: int = int(os.getenv("HTTP_POOL_MAX_CONNECTIONS", "50"))
+    HTTP_POOL_MAX_KEEPALIVE: int = int(os.getenv("HTTP_POOL_MAX_KEEPALIVE", "20"))
+    HTTP_KEEPALIVE_EXPIRY: float = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+    HTTP2_ENABLED: bool = os.getenv("HTTP2_ENABLED", "true").lower() == "true"
 
     # === File Upload Limits ===
     MAX_FILE_SIZE_MB: int = 50
     MAX_FILE_SIZE_BYTES: int = MAX_FILE_SIZE_MB * 1024 * 1024
     SIGNED_URL_EXPIRY_SECONDS: int = 60 * 60 * 24 * 7  # 7 days (보안 강화)
+    # Streaming upload chunk; Supabase's resumable (TUS) endpoint expects 6MB chunks
+    STORAGE_UPLOAD_CHUNK_SIZE: int = int(os.getenv("STORAGE_UPLOAD_CHUNK_SIZE", str(6 * 1024 * 1024)))
+    STORAGE_RESUMABLE_THRESHOLD: int = int(os.getenv("STORAGE_RESUMABLE_THRESHOLD", str(6 * 1024 * 1024)))
+    STORAGE_LIST_PAGE_SIZE: int = int(os.getenv("STORAGE_LIST_PAGE_SIZE", "1000"))
+    STORAGE_REMOVE_BATCH_SIZE: int = int(os.getenv("STORAGE_REMOVE_BATCH_SIZE", "100"))
+    # Orphan GC: objects younger than this are never swept (uploaded but not yet sent)
+    STORAGE_GC_MIN_AGE_HOURS: int = int(os.getenv("STORAGE_GC_MIN_AGE_HOURS", "24"))
+
+    # === Media Processing (image / video compression) ===
+    MEDIA_MAX_WORKERS: int = int(os.getenv("MEDIA_MAX_WORKERS", "1"))  # fly.io VM has one shared CPU
+    MEDIA_JOB_TIMEOUT: int = int(os.getenv("MEDIA_JOB_TIMEOUT", "300"))
+    UPLOAD_PIPELINE_WORKERS: int = int(os.getenv("UPLOAD_PIPELINE_WORKERS", "2"))
+    PROXY_UPLOAD_TIMEOUT: int = int(os.getenv("PROXY_UPLOAD_TIMEOUT", "600"))  # browser -> uploads/ -> Storage
+    # Web files at/above this size PUT straight to a signed Storage URL (no server hop, but no
+    # compression/thumbnails either); smaller files keep the proxy path.
+    DIRECT_UPLOAD_ENABLED: bool = os.getenv("DIRECT_UPLOAD_ENABLED", "true").lower() == "true"
+    DIRECT_UPLOAD_MIN_BYTES: int = int(os.getenv("DIRECT_UPLOAD_MIN_BYTES", str(5 * 1024 * 1024)))
 
     # === Pagination & Limits ===
     DEFAULT_MESSAGE_LIMIT: int = 50
@@ -33,10 +59,14 @@ class Config:
     MAX_SEARCH_RESULTS: int = 30
     UNREAD_COUNT_CAP: int = 99
     MAX_TOPICS_PER_CHANNEL: int = 500
+    CALENDAR_MONTH_BUCKETS: int = 6  # Months of events a calendar view keeps (shown + prefetched neighbours)
 
     # === Cache TTL (seconds) ===
     CATEGORY_CACHE_TTL: int = 300  # 5 minutes
     ROLE_CACHE_TTL: int = 600  # 10 minutes
+    PROFILE_CACHE_TTL: int = 300  # 5 minutes
+    SCHEDULE_CACHE_TTL: int = 3600  # Entries are version-checked; TTL only bounds memory
+    CALENDAR_MONTH_CACHE_TTL: int = 300  # Realtime changes clear it sooner
 
     # === UI Colors ===
     class Colors:
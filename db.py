@@ -1,16 +1,114 @@
 import os
+import base64
 import mimetypes
+import importlib.util
 from datetime import datetime
 from dotenv import load_dotenv
 import httpx
 from gotrue import SyncGoTrueClient
-from postgrest import SyncPostgrestClient
+import asyncio
+import threading
+import weakref
+from postgrest import SyncPostgrestClient, AsyncPostgrestClient
+from postgrest.utils import SyncClient, AsyncClient
 try:
     from realtime import AsyncRealtimeClient
 except ImportError:
     AsyncRealtimeClient = None
 
 load_dotenv()
+from config import config  # after load_dotenv so .env overrides apply
+from concurrent.futures import ThreadPoolExecutor
+from utils.cache import signed_url_cache
+
+# HTTP/2 needs the optional 'h2' package (httpx[http2]); fall back to HTTP/1.1 keep-alive without it
+HAS_HTTP2 = importlib.util.find_spec("h2") is not None
+
+def _build_transport() -> httpx.HTTPTransport:
+    return httpx.HTTPTransport(
+        http2=config.HTTP2_ENABLED and HAS_HTTP2,
+        limits=httpx.Limits(
+            max_connections=config.HTTP_POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=config.HTTP_POOL_MAX_KEEPALIVE,
+            keepalive_expiry=config.HTTP_KEEPALIVE_EXPIRY,
+        ),
+        retries=1,
+    )
+
+class SharedTransport(httpx.BaseTransport):
+    """
+    Process-wide connection pool shared by every REST, Auth and Storage client.
+    Clients built on top of it can be closed freely; only reset() tears the pool down.
+    """
+
+    def __init__(self):
+        self._inner = _build_transport()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        return self._inner.handle_request(request)
+
+    def close(self):
+        # Owned by the process, not by any single client
+        pass
+
+    def reset(self):
+        """Drop all pooled connections (e.g. after a network failure) and start a fresh pool."""
+        old, self._inner = self._inner, _build_transport()
+        try:
+            old.close()
+        except Exception:
+            pass
+
+_shared_transport = None
+
+def get_shared_transport() -> SharedTransport:
+    global _shared_transport
+    if _shared_transport is None:
+        _shared_transport = SharedTransport()
+    return _shared_transport
+
+class PooledPostgrestClient(SyncPostgrestClient):
+    """SyncPostgrestClient whose session rides on the shared pool instead of opening its own."""
+
+    def create_session(self, base_url, headers, timeout, verify=True, proxy=None) -> SyncClient:
+        return SyncClient(
+            base_url=base_url,
+            headers=headers,
+            timeout=timeout,
+            follow_redirects=True,
+            transport=get_shared_transport(),
+        )
+
+class HeaderScopedSession:
+    """Layers per-user headers (JWT) on each request of a shared session."""
+
+    def __init__(self, session: SyncClient, headers: dict):
+        self._session = session
+        self.headers = httpx.Headers(headers)
+
+    def request(self, method, url, *, headers=None, **kwargs):
+        merged = httpx.Headers(self.headers)
+        if headers:
+            merged.update(headers)
+        return self._session.request(method, url, headers=merged, **kwargs)
+
+    def close(self):
+        # The underlying session is shared; nothing to release per user
+        pass
+
+    aclose = close
+
+class UserRestClient(SyncPostgrestClient):
+    """
+    PostgREST client acting with a user's JWT (RLS applies).
+    Cheap to create: no new connection, just headers layered on the shared session.
+    """
+
+    def __init__(self, session: SyncClient, headers: dict):
+        self.session = HeaderScopedSession(session, headers)
+
+    def aclose(self):
+        pass
 
 class SupabaseClient:
     def __init__(self, url: str, key: str):
@@ -21,8 +119,8 @@ class SupabaseClient:
             "Authorization": f"Bearer {key}",
             "Content-Type": "application/json"
         }
-        # Shared client for efficiency (latency reduction)
-        self._http_client = httpx.Client(headers=self.headers, timeout=60.0)
+        # [OPTIMIZATION] Auth, Storage and REST all share one pooled transport (keep-alive / HTTP2)
+        self._http_client = httpx.Client(headers=self.headers, timeout=60.0, transport=get_shared_transport())
         
         # Initialize Auth
         self.auth = SyncGoTrueClient(
@@ -33,7 +131,7 @@ class SupabaseClient:
         )
         
         # Initialize Database (PostgREST)
-        self.rest = SyncPostgrestClient(
+        self.rest = PooledPostgrestClient(
             f"{url}/rest/v1",
             headers=self.headers,
             schema="public",
@@ -44,31 +142,21 @@ class SupabaseClient:
         self.storage = ManualStorageManager(f"{url}/storage/v1", self.headers, self._http_client)
 
     def check_connection(self):
-        """Verify and refresh the HTTP client if it's dead/disconnected."""
+        """Verify the pooled transport and reset it if connections are dead/disconnected."""
         try:
             # Simple health check call to Supabase Auth
             resp = self._http_client.get(f"{self.url}/auth/v1/health")
             if resp.status_code >= 500:
                 raise httpx.HTTPError("Server side error")
         except (httpx.HTTPError, Exception) as e:
-            log_info(f"Supabase Client: Connectivity issue detected ({e}). Re-initializing...")
-            try:
-                self._http_client.close()
-            except Exception as close_err:
-                log_info(f"Client close warning: {close_err}")
-            self._http_client = httpx.Client(headers=self.headers, timeout=60.0)
-            self.auth.http_client = self._http_client
-            self.rest.session = self._http_client # SyncPostgrestClient uses .session
-            self.storage.client = self._http_client
-            log_info("Supabase Client: Re-initialized.")
-
-    def __del__(self):
-        """Cleanup HTTP client on garbage collection."""
-        try:
-            if hasattr(self, '_http_client') and self._http_client:
-                self._http_client.close()
-        except Exception:
-            pass
+            log_info(f"Supabase Client: Connectivity issue detected ({e}). Resetting connection pool...")
+            # Clients stay bound to the shared transport; only its pooled sockets are replaced
+            get_shared_transport().reset()
+            log_info("Supabase Client: Connection pool re-initialized.")
+
+    def get_user_client(self, headers: dict) -> UserRestClient:
+        """REST client that sends the given auth headers (e.g. user JWT) over the shared pool."""
+        return UserRestClient(self.rest.session, headers)
 
     def get_realtime_client(self):
         if not AsyncRealtimeClient:
@@ -94,22 +182,77 @@ class SupabaseClient:
             "Authorization": f"Bearer {self.key}"
         }
 
+def _iter_file_chunks(fileobj, chunk_size: int):
+    """Yield a file object in bounded chunks (peak memory = one chunk)."""
+    while True:
+        chunk = fileobj.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+def _remaining_size(fileobj):
+    try:
+        return os.fstat(fileobj.fileno()).st_size - fileobj.tell()
+    except (AttributeError, OSError, ValueError):
+        return None
+
 class ManualStorageManager:
     def __init__(self, url, headers, client=None):
         self.url = url
         self.headers = headers
-        self.client = client or httpx.Client(headers=headers)
+        self.client = client or httpx.Client(headers=headers, transport=get_shared_transport())
     def from_(self, bucket):
         return ManualBucket(self.url, self.headers, bucket, self.client)
 
+    # Bucket-first helpers used by StorageRepository
+    def upload(self, bucket, path, content, content_type=None):
+        options = {"content-type": content_type} if content_type else None
+        return self.from_(bucket).upload(path, content, file_options=options)
+
+    def upload_file(self, bucket, path, local_path, content_type=None, progress_callback=None):
+        return self.from_(bucket).upload_file(path, local_path, content_type, progress_callback=progress_callback)
+
+    def get_public_url(self, bucket, path):
+        return self.from_(bucket).get_public_url(path)
+
+    def list_files(self, bucket, path=""):
+        return self.from_(bucket).list(path)
+
+    def delete(self, bucket, path):
+        return self.from_(bucket).remove(path)
+
+_signing_executor = None
+
+def _get_signing_executor() -> ThreadPoolExecutor:
+    """Small pool for background re-signing of stale cached URLs."""
+    global _signing_executor
+    if _signing_executor is None:
+        _signing_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="sign")
+    return _signing_executor
+
 class ManualBucket:
+    TUS_VERSION = "1.0.0"
+    # Index of the upload-sign endpoint that last worked (skip the failing one next time)
+    _upload_sign_endpoint = 0
+
     def __init__(self, url, headers, bucket, client=None):
+        self.base_url = url
+        self.bucket = bucket
         self.url = f"{url}/object/{bucket}"
         self.headers = headers
-        self.client = client or httpx.Client(headers=headers)
+        self.client = client or httpx.Client(headers=headers, transport=get_shared_transport())
+
+    def _auth_headers(self):
+        # Storage calls carry their own Content-Type; never the JSON default of the REST client
+        return {k: v for k, v in self.headers.items() if k.lower() != "content-type"}
+
     def upload(self, path, content, file_options=None, **kwargs):
+        """
+        Upload bytes, a file object or an iterator of byte chunks.
+        File objects and iterators are streamed in STORAGE_UPLOAD_CHUNK_SIZE pieces, never buffered whole.
+        """
         # [CRITICAL FIX] Avoid sending 'Content-Type: application/json' for binary files
-        upload_headers = self.headers.copy()
+        upload_headers = self._auth_headers()
         
         # Handle Options (Support file_options from SDK style calls)
         if file_options and isinstance(file_options, dict):
@@ -117,15 +260,20 @@ class ManualBucket:
             ctype = file_options.get("content-type") or file_options.get("contentType")
             if ctype:
                 upload_headers["Content-Type"] = ctype
+            if str(file_options.get("upsert", "")).lower() == "true":
+                upload_headers["x-upsert"] = "true"
         
         # Determine MIME Type if not set
         if "Content-Type" not in upload_headers:
             mime_type, _ = mimetypes.guess_type(path)
-            if mime_type:
-                upload_headers["Content-Type"] = mime_type
-            elif "Content-Type" in upload_headers:
-                # Drop if we can't guess but it's binary
-                del upload_headers["Content-Type"]
+            upload_headers["Content-Type"] = mime_type or "application/octet-stream"
+
+        if hasattr(content, "read"):
+            # [OPTIMIZATION] Stream file objects; a known length avoids chunked transfer-encoding
+            size = _remaining_size(content)
+            if size is not None:
+                upload_headers["Content-Length"] = str(size)
+            content = _iter_file_chunks(content, config.STORAGE_UPLOAD_CHUNK_SIZE)
             
         resp = self.client.post(f"{self.url}/{path}", headers=upload_headers, content=content)
         if resp.status_code not in [200, 201]:
@@ -133,18 +281,92 @@ class ManualBucket:
         resp.raise_for_status()
         return resp.json()
 
+    def upload_file(self, path, local_path, content_type=None, upsert=False, progress_callback=None):
+        """Stream a local file; files above STORAGE_RESUMABLE_THRESHOLD use the resumable (TUS) endpoint."""
+        content_type = content_type or mimetypes.guess_type(local_path)[0] or "application/octet-stream"
+        size = os.path.getsize(local_path)
+        with open(local_path, "rb") as f:
+            if size > config.STORAGE_RESUMABLE_THRESHOLD:
+                return self.upload_resumable(path, f, size, content_type, upsert=upsert,
+                                             progress_callback=progress_callback)
+            options = {"content-type": content_type, "upsert": "true" if upsert else "false"}
+            result = self.upload(path, f, file_options=options)
+            if progress_callback:
+                progress_callback(size, size)
+            return result
+
+    def upload_resumable(self, path, fileobj, size, content_type=None, upsert=False,
+                         chunk_size=None, max_retries=3, progress_callback=None):
+        """
+        TUS resumable upload (POST creates the upload, PATCH sends each chunk).
+        A failed chunk is retried from the offset the server reports via HEAD.
+        """
+        chunk_size = chunk_size or config.STORAGE_UPLOAD_CHUNK_SIZE
+        base_storage_url, bucket = self.url.split("/object/")
+        content_type = content_type or mimetypes.guess_type(path)[0] or "application/octet-stream"
+
+        def b64(value):
+            return base64.b64encode(str(value).encode()).decode()
+
+        metadata = {"bucketName": bucket, "objectName": path, "contentType": content_type, "cacheControl": "3600"}
+        tus_headers = {**self._auth_headers(), "Tus-Resumable": self.TUS_VERSION}
+        endpoint = f"{base_storage_url}/upload/resumable"
+
+        resp = self.client.post(endpoint, headers={
+            **tus_headers,
+            "Upload-Length": str(size),
+            "Upload-Metadata": ",".join(f"{k} {b64(v)}" for k, v in metadata.items()),
+            "x-upsert": "true" if upsert else "false",
+        })
+        if resp.status_code != 201:
+            print(f"STORAGE ERROR (resumable create): {resp.status_code} {resp.text}")
+        resp.raise_for_status()
+        location = str(httpx.URL(endpoint).join(resp.headers["Location"]))
+
+        start = fileobj.tell()
+        offset, failures = 0, 0
+        while offset < size:
+            fileobj.seek(start + offset)
+            chunk = fileobj.read(chunk_size)
+            try:
+                r = self.client.patch(location, headers={
+                    **tus_headers,
+                    "Upload-Offset": str(offset),
+                    "Content-Type": "application/offset+octet-stream",
+                }, content=chunk)
+                r.raise_for_status()
+                offset = int(r.headers.get("Upload-Offset", offset + len(chunk)))
+                failures = 0
+            except httpx.HTTPError as e:
+                failures += 1
+                if failures > max_retries:
+                    print(f"STORAGE ERROR (resumable): giving up on '{path}' at {offset}/{size}: {e}")
+                    raise
+                # Resume from whatever the server actually persisted
+                head = self.client.head(location, headers=tus_headers)
+                if head.status_code == 200:
+                    offset = int(head.headers.get("Upload-Offset", offset))
+                continue
+            if progress_callback:
+                progress_callback(offset, size)
+
+        return {"Key": f"{bucket}/{path}"}
+
+    def get_public_url(self, path):
+        base_storage_url, bucket = self.url.split("/object/")
+        return f"{base_storage_url}/object/public/{bucket}/{path}"
+
     def create_upload_url(self, path):
         # Fallback for simple POST (Often fails with auth)
         return f"{self.url}/{path}"
 
     def create_signed_upload_url(self, path, expires_in=120):
+        """Signed upload URL for one object path. Single-use (token per upload), so never cached."""
         import urllib.parse
         safe_path = urllib.parse.quote(path)
         
-        parts = self.url.split("/object/")
-        base_storage_url = parts[0]
-        # Current bucket from instance
-        bucket = self.url.split("/")[-1]
+        base_storage_url = self.base_url
+        bucket = self.bucket
         
         headers = self.headers.copy()
         headers["Content-Type"] = "application/json"
@@ -155,9 +377,13 @@ class ManualBucket:
             f"{base_storage_url}/object/upload/sign/{bucket}/{safe_path}",
             f"{base_storage_url}/object/{bucket}/{safe_path}/sign"
         ]
+        # [OPTIMIZATION] Start with whichever endpoint worked last time (no doomed first POST)
+        first = ManualBucket._upload_sign_endpoint
+        order = [first] + [i for i in range(len(endpoints)) if i != first]
         
         last_error = ""
-        for endpoint in endpoints:
+        for idx in order:
+            endpoint = endpoints[idx]
             try:
                 resp = self.client.post(endpoint, headers=headers, json={"expiresIn": expires_in})
                 if resp.status_code == 200:
@@ -167,6 +393,7 @@ class ManualBucket:
                     
                     if s_url and s_url.startswith("/"):
                         s_url = f"{base_storage_url}{s_url}"
+                    ManualBucket._upload_sign_endpoint = idx
                     return s_url
                 last_error = f"{resp.status_code}: {resp.text}"
             except Exception as e:
@@ -177,22 +404,17 @@ class ManualBucket:
         print(msg)
         raise Exception(msg)
 
-    def list(self, path=None):
-        # Construct List Endpoint: .../object/list/{bucket}
-        # self.url is .../object/{bucket}
-        parts = self.url.split("/object/")
-        base_storage_url = parts[0]
-        bucket = self.url.split("/")[-1]
-        
-        list_url = f"{base_storage_url}/object/list/{bucket}"
+    def list(self, path=None, limit=100, offset=0):
+        """One page of a folder listing (objects and sub-folders; folders have id None)."""
+        list_url = f"{self.base_url}/object/list/{self.bucket}"
         
         headers = self.headers.copy()
         headers["Content-Type"] = "application/json"
         
         body = {
             "prefix": path if path else "",
-            "limit": 10,
-            "offset": 0,
+            "limit": limit,
+            "offset": offset,
             "sortBy": {"column": "name", "order": "asc"}
         }
         
@@ -205,38 +427,370 @@ class ManualBucket:
             print(f"List Bucket Error: {e}")
             raise e
 
-    def create_signed_url(self, path, expires_in=60):
-        # [FIX] Implement missing method matching supabase-py interface
-        parts = self.url.split("/object/")
-        base_storage_url = parts[0]
-        bucket = self.url.split("/")[-1]
-        
+    def list_all(self, path=None, page_size=None):
+        """
+        Yield every object under `path` (recursing into folders) with its full "path" added.
+        Pages of STORAGE_LIST_PAGE_SIZE; nothing is accumulated in memory.
+        """
+        page_size = page_size or config.STORAGE_LIST_PAGE_SIZE
+        prefix = (path or "").strip("/")
+        offset = 0
+        while True:
+            page = self.list(prefix, limit=page_size, offset=offset)
+            for item in page:
+                full = f"{prefix}/{item['name']}" if prefix else item["name"]
+                if item.get("id") is None:  # Folder placeholder
+                    yield from self.list_all(full, page_size)
+                else:
+                    yield {**item, "path": full}
+            if len(page) < page_size:
+                return
+            offset += page_size
+
+    def remove(self, paths):
+        """
+        Delete objects (str or list of paths). Batched: one DELETE per STORAGE_REMOVE_BATCH_SIZE paths.
+        Returns the removed object rows reported by Storage.
+        """
+        if isinstance(paths, str):
+            paths = [paths]
+        headers = self.headers.copy()
+        headers["Content-Type"] = "application/json"
+        batch = max(1, config.STORAGE_REMOVE_BATCH_SIZE)
+        removed = []
+        for i in range(0, len(paths), batch):
+            chunk = paths[i:i + batch]
+            resp = self.client.request("DELETE", self.url, headers=headers, json={"prefixes": chunk})
+            resp.raise_for_status()
+            removed.extend(resp.json() or [])
+            for path in chunk:
+                signed_url_cache.invalidate_path(self.bucket, path)
+        return removed
+
+    def _sign(self, path, expires_in):
         # Endpoint: POST /object/sign/{bucket}/{path}
-        # Path should be part of the URL path
-        sign_url = f"{base_storage_url}/object/sign/{bucket}/{path}"
+        sign_url = f"{self.base_url}/object/sign/{self.bucket}/{path}"
         
         headers = self.headers.copy()
         headers["Content-Type"] = "application/json"
         
+        resp = self.client.post(sign_url, headers=headers, json={"expiresIn": expires_in})
+        resp.raise_for_status()
+        data = resp.json()
+        
+        # [FIX] Check all possible keys (API variations)
+        s_url = data.get("signedURL") or data.get("signedUrl") or data.get("url")
+        
+        if s_url and s_url.startswith("/"):
+             s_url = f"{self.base_url}{s_url}"
+        
+        if not s_url:
+             print(f"Signed URL Warning: No URL in response: {data}")
+        return s_url
+
+    def _refresh_signed_url(self, key, path, expires_in):
         try:
-            resp = self.client.post(sign_url, headers=headers, json={"expiresIn": expires_in})
-            resp.raise_for_status()
-            data = resp.json()
-            
-            # [FIX] Check all possible keys (API variations)
-            s_url = data.get("signedURL") or data.get("signedUrl") or data.get("url")
-            
-            if s_url and s_url.startswith("/"):
-                 s_url = f"{base_storage_url}{s_url}"
-            
-            if not s_url:
-                 print(f"Signed URL Warning: No URL in response: {data}")
-                 
+            s_url = self._sign(path, expires_in)
+            if s_url:
+                signed_url_cache.put(key, s_url, expires_in)
+        except Exception as e:
+            print(f"Signed URL refresh failed for '{path}': {e}")
+        finally:
+            signed_url_cache.release_refresh(key)
+
+    def create_signed_url(self, path, expires_in=60):
+        """
+        supabase-py style {"signedURL": ...}.
+        [OPTIMIZATION] Served from signed_url_cache; a URL nearing expiry is still returned
+        while a background re-sign replaces it.
+        """
+        key = (self.bucket, path, expires_in)
+        cached, stale = signed_url_cache.lookup(key)
+        if cached:
+            if stale and signed_url_cache.claim_refresh(key):
+                _get_signing_executor().submit(self._refresh_signed_url, key, path, expires_in)
+            return {"signedURL": cached}
+        
+        try:
+            s_url = self._sign(path, expires_in)
+            if s_url:
+                signed_url_cache.put(key, s_url, expires_in)
             return {"signedURL": s_url}
         except Exception as e:
             print(f"Manual Signed URL Error: {e}")
             raise e
 
+    def create_signed_urls(self, paths, expires_in=60):
+        """
+        Batch form: [{"path", "signedURL"}] in input order (signedURL None for paths that failed).
+        [OPTIMIZATION] Fresh cache entries are free; all misses are signed with ONE POST /object/sign/{bucket}.
+        """
+        results, missing = _cached_signed_urls(self.bucket, paths, expires_in)
+        if missing:
+            headers = self.headers.copy()
+            headers["Content-Type"] = "application/json"
+            resp = self.client.post(f"{self.base_url}/object/sign/{self.bucket}", headers=headers,
+                                    json={"expiresIn": expires_in, "paths": missing})
+            resp.raise_for_status()
+            _store_signed_batch(self.base_url, self.bucket, resp.json(), expires_in, results)
+        return [{"path": p, "signedURL": results.get(p)} for p in paths]
+
+def _cached_signed_urls(bucket, paths, expires_in):
+    """({path: cached URL}, [paths to sign]) for a batch; URLs near expiry count as misses."""
+    results, missing = {}, []
+    for path in dict.fromkeys(paths):
+        cached, stale = signed_url_cache.lookup((bucket, path, expires_in))
+        if cached and not stale:
+            results[path] = cached
+        else:
+            missing.append(path)
+    return results, missing
+
+def _store_signed_batch(base_url, bucket, items, expires_in, results):
+    for item in items or []:
+        s_url = item.get("signedURL") or item.get("signedUrl")
+        if not s_url or item.get("error"):
+            continue
+        if s_url.startswith("/"):
+            s_url = f"{base_url}{s_url}"
+        results[item.get("path")] = s_url
+        signed_url_cache.put((bucket, item.get("path"), expires_in), s_url, expires_in)
+
+# ---------------------------------------------------------------------------
+# Async data layer
+# Services await these directly instead of hopping sync calls through asyncio.to_thread.
+# ---------------------------------------------------------------------------
+
+def _build_async_transport() -> httpx.AsyncHTTPTransport:
+    return httpx.AsyncHTTPTransport(
+        http2=config.HTTP2_ENABLED and HAS_HTTP2,
+        limits=httpx.Limits(
+            max_connections=config.HTTP_POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=config.HTTP_POOL_MAX_KEEPALIVE,
+            keepalive_expiry=config.HTTP_KEEPALIVE_EXPIRY,
+        ),
+        retries=1,
+    )
+
+class AsyncSharedTransport(httpx.AsyncBaseTransport):
+    """
+    Async counterpart of SharedTransport.
+    Pooled connections belong to one event loop, so there is one pool per loop (e.g. Flet's loop
+    plus asyncio.run() in worker threads, concurrently); a pool is closed once its loop is closed.
+    """
+
+    def __init__(self):
+        self._pools = weakref.WeakKeyDictionary()  # event loop -> pooled transport
+        self._orphans = []  # Pools whose loop was garbage-collected, closed on the next request
+        self._lock = threading.Lock()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            inner = self._pools.get(loop)
+            if inner is None:
+                inner = self._pools[loop] = _build_async_transport()
+                weakref.finalize(loop, self._orphans.append, inner)
+            # Pools of loops that have been closed (asyncio.run() finished) are released here
+            dead = [(l, t) for l, t in self._pools.items() if l.is_closed()]
+            for l, _ in dead:
+                del self._pools[l]
+            dead += [(None, t) for t in self._orphans]
+            self._orphans.clear()
+        for l, transport in dead:
+            await self._close_pool(transport, l)
+        return await inner.handle_async_request(request)
+
+    @staticmethod
+    async def _close_pool(transport, loop):
+        """Release a pool's sockets: on its own loop if that one still runs elsewhere, else here (best effort)."""
+        try:
+            if loop is not None and loop is not asyncio.get_running_loop() and loop.is_running() and not loop.is_closed():
+                asyncio.run_coroutine_threadsafe(transport.aclose(), loop)
+            else:
+                await transport.aclose()
+        except Exception:
+            pass  # Connections already torn down with their loop
+
+    async def aclose(self):
+        # Owned by the process, not by any single client
+        pass
+
+    async def reset(self):
+        with self._lock:
+            pools = list(self._pools.items())
+            self._pools.clear()
+        for loop, transport in pools:
+            await self._close_pool(transport, loop)
+
+_shared_async_transport = None
+
+def get_shared_async_transport() -> AsyncSharedTransport:
+    global _shared_async_transport
+    if _shared_async_transport is None:
+        _shared_async_transport = AsyncSharedTransport()
+    return _shared_async_transport
+
+class PooledAsyncPostgrestClient(AsyncPostgrestClient):
+    """AsyncPostgrestClient whose session rides on the shared async pool."""
+
+    def create_session(self, base_url, headers, timeout, verify=True, proxy=None) -> AsyncClient:
+        return AsyncClient(
+            base_url=base_url,
+            headers=headers,
+            timeout=timeout,
+            follow_redirects=True,
+            transport=get_shared_async_transport(),
+        )
+
+class AsyncHeaderScopedSession:
+    """Layers per-user headers (JWT) on each request of a shared async session."""
+
+    def __init__(self, session: AsyncClient, headers: dict):
+        self._session = session
+        self.headers = httpx.Headers(headers)
+
+    async def request(self, method, url, *, headers=None, **kwargs):
+        merged = httpx.Headers(self.headers)
+        if headers:
+            merged.update(headers)
+        return await self._session.request(method, url, headers=merged, **kwargs)
+
+    async def aclose(self):
+        pass
+
+class AsyncUserRestClient(AsyncPostgrestClient):
+    """Async PostgREST client acting with a user's JWT over the shared pool."""
+
+    def __init__(self, session: AsyncClient, headers: dict):
+        self.session = AsyncHeaderScopedSession(session, headers)
+
+    async def aclose(self):
+        pass
+
+class AsyncSupabaseClient:
+    """
+    Async mirror of SupabaseClient: same table()/from_()/rpc()/storage surface,
+    but every call is awaited on the event loop (no worker thread per round-trip).
+    Auth stays on the sync SupabaseClient.
+    """
+
+    def __init__(self, url: str, key: str):
+        self.url = url
+        self.key = key
+        self.headers = {
+            "apikey": key,
+            "Authorization": f"Bearer {key}",
+            "Content-Type": "application/json"
+        }
+        self._http_client = httpx.AsyncClient(headers=self.headers, timeout=60.0, transport=get_shared_async_transport())
+        self.rest = PooledAsyncPostgrestClient(
+            f"{url}/rest/v1",
+            headers=self.headers,
+            schema="public",
+            timeout=60
+        )
+        self.storage = AsyncManualStorageManager(f"{url}/storage/v1", self.headers, self._http_client)
+
+    def get_user_client(self, headers: dict) -> AsyncUserRestClient:
+        """Async REST client that sends the given auth headers over the shared pool."""
+        return AsyncUserRestClient(self.rest.session, headers)
+
+    def table(self, table_name: str):
+        return self.rest.from_(table_name)
+
+    def from_(self, table_name: str):
+        return self.rest.from_(table_name)
+
+    def rpc(self, fn: str, params: dict = None):
+        return self.rest.rpc(fn, params or {})
+
+class AsyncManualStorageManager:
+    def __init__(self, url, headers, client):
+        self.url = url
+        self.headers = headers
+        self.client = client
+    def from_(self, bucket):
+        return AsyncManualBucket(self.url, self.headers, bucket, self.client)
+
+class AsyncManualBucket:
+    """Async subset of ManualBucket used from coroutines (upload / list / signed URLs)."""
+
+    def __init__(self, url, headers, bucket, client):
+        self.base_url = url
+        self.bucket = bucket
+        self.url = f"{url}/object/{bucket}"
+        self.headers = headers
+        self.client = client
+
+    async def upload(self, path, content, file_options=None, **kwargs):
+        upload_headers = {k: v for k, v in self.headers.items() if k != "Content-Type"}
+        ctype = None
+        if file_options and isinstance(file_options, dict):
+            ctype = file_options.get("content-type") or file_options.get("contentType")
+        ctype = ctype or mimetypes.guess_type(path)[0]
+        if ctype:
+            upload_headers["Content-Type"] = ctype
+
+        resp = await self.client.post(f"{self.url}/{path}", headers=upload_headers, content=content)
+        if resp.status_code not in [200, 201]:
+            print(f"STORAGE ERROR: {resp.status_code} {resp.text}")
+        resp.raise_for_status()
+        return resp.json()
+
+    async def list(self, path=None, limit=100, offset=0):
+        body = {
+            "prefix": path if path else "",
+            "limit": limit,
+            "offset": offset,
+            "sortBy": {"column": "name", "order": "asc"}
+        }
+        resp = await self.client.post(f"{self.base_url}/object/list/{self.bucket}", headers=self.headers, json=body)
+        resp.raise_for_status()
+        return resp.json()
+
+    async def _sign(self, path, expires_in):
+        resp = await self.client.post(f"{self.base_url}/object/sign/{self.bucket}/{path}", headers=self.headers, json={"expiresIn": expires_in})
+        resp.raise_for_status()
+        data = resp.json()
+        s_url = data.get("signedURL") or data.get("signedUrl") or data.get("url")
+        if s_url and s_url.startswith("/"):
+            s_url = f"{self.base_url}{s_url}"
+        return s_url
+
+    async def _refresh_signed_url(self, key, path, expires_in):
+        try:
+            s_url = await self._sign(path, expires_in)
+            if s_url:
+                signed_url_cache.put(key, s_url, expires_in)
+        except Exception as e:
+            print(f"Signed URL refresh failed for '{path}': {e}")
+        finally:
+            signed_url_cache.release_refresh(key)
+
+    async def create_signed_url(self, path, expires_in=60):
+        """Shares signed_url_cache with ManualBucket.create_signed_url."""
+        key = (self.bucket, path, expires_in)
+        cached, stale = signed_url_cache.lookup(key)
+        if cached:
+            if stale and signed_url_cache.claim_refresh(key):
+                asyncio.create_task(self._refresh_signed_url(key, path, expires_in))
+            return {"signedURL": cached}
+        s_url = await self._sign(path, expires_in)
+        if s_url:
+            signed_url_cache.put(key, s_url, expires_in)
+        return {"signedURL": s_url}
+
+    async def create_signed_urls(self, paths, expires_in=60):
+        """Async form of ManualBucket.create_signed_urls (same cache, one POST for all misses)."""
+        results, missing = _cached_signed_urls(self.bucket, paths, expires_in)
+        if missing:
+            resp = await self.client.post(f"{self.base_url}/object/sign/{self.bucket}", headers=self.headers,
+                                          json={"expiresIn": expires_in, "paths": missing})
+            resp.raise_for_status()
+            _store_signed_batch(self.base_url, self.bucket, resp.json(), expires_in, results)
+        return [{"path": p, "signedURL": results.get(p)} for p in paths]
+
 url = os.environ.get("SUPABASE_URL")
 key = os.environ.get("SUPABASE_KEY")
 service_key = os.environ.get("SUPABASE_SERVICE_KEY")
@@ -244,8 +798,10 @@ service_key = os.environ.get("SUPABASE_SERVICE_KEY")
 if not url or not key:
     print("WARNING: SUPABASE_URL or SUPABASE_KEY not found in .env")
     supabase = None
+    async_supabase = None
 else:
     supabase = SupabaseClient(url, key)
+    async_supabase = AsyncSupabaseClient(url, key)
 
 # [DIAGNOSTIC] Global log buffer for UI debugging
 app_logs = []
@@ -260,16 +816,19 @@ def log_info(msg):
 try:
     if service_key:
         service_supabase = SupabaseClient(url, service_key)
+        async_service_supabase = AsyncSupabaseClient(url, service_key)
         has_service_key = True
         log_info("Service Supabase Connection: Established")
     else:
         print("INFO: SUPABASE_SERVICE_KEY not set. Using anon key for all operations.")
         service_supabase = supabase
+        async_service_supabase = async_supabase
         has_service_key = False
         log_info("Service Supabase Connection: FAILED (No Key)")
 except Exception as e:
     log_info(f"Service Supabase Connection: CRITICAL ERROR - {e}")
     service_supabase = supabase
+    async_service_supabase = async_supabase
     has_service_key = False
 
 
@@ -78,6 +78,14 @@ async def main(page: ft.Page):
     #     page.overlay.append(file_picker)
     #     page.chat_file_picker = file_picker
 
+    # A closed tab never navigates: release this session's background polls when Flet closes it
+    # (on_close fires once the session is gone, not on a brief reconnect)
+    def release_session(e=None):
+        from services.poll_scheduler import poll_scheduler
+        poll_scheduler.cancel_owner(page)
+
+    page.on_close = release_session
+
     router = Router(page)
     await router.start()
 
@@ -0,0 +1,19 @@
+-- [OPTIMIZATION] Month-window calendar queries
+-- calendar_service.get_events_in_range() asks for one channel's events overlapping a month:
+--   channel_id = ? AND start_date <= <month end> AND end_date >= <month start>
+-- instead of the newest 500 rows of the channel. These indexes keep that a range scan at any
+-- history size; the partial one serves the work-schedule reads of payroll / the staff calendar
+-- (services/schedule_service.py).
+
+CREATE INDEX IF NOT EXISTS idx_calendar_events_channel_start
+    ON public.calendar_events(channel_id, start_date);
+
+CREATE INDEX IF NOT EXISTS idx_calendar_events_channel_end
+    ON public.calendar_events(channel_id, end_date);
+
+CREATE INDEX IF NOT EXISTS idx_calendar_events_work_schedule
+    ON public.calendar_events(channel_id, start_date) WHERE is_work_schedule;
+
+ANALYZE public.calendar_events;
+
+NOTIFY pgrst, 'reload config';
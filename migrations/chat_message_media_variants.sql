@@ -0,0 +1,11 @@
+-- [OPTIMIZATION] Image derivatives for chat messages
+-- The upload pipeline stores small WebP renditions next to the original upload:
+--   thumb_url   : ~400px (2x the 200px bubble), shown in ChatBubble
+--   preview_url : ~1280px, shown in the full-screen image viewer
+-- image_url keeps pointing at the original. Older rows have NULLs and fall back to image_url.
+
+ALTER TABLE public.chat_messages
+    ADD COLUMN IF NOT EXISTS thumb_url text,
+    ADD COLUMN IF NOT EXISTS preview_url text;
+
+NOTIFY pgrst, 'reload config';
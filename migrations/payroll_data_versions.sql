@@ -0,0 +1,93 @@
+-- [OPTIMIZATION] Payroll data versions
+-- A counter per (channel, scope) that changes whenever rows feeding payroll change:
+--   * scope 'contracts' -> any INSERT/UPDATE/DELETE on labor_contracts of the channel
+--   * scope 'YYYY-MM'   -> any write to a work-schedule calendar_event starting in that month
+-- schedule_service caches Rosters under (channel, year, month, version) and only re-reads
+-- contracts/events when one of the two counters moved (deletes included, unlike max(updated_at)).
+-- calendar_events.start_date is ISO-8601 text in the app ("YYYY-MM-DDTHH:MM:SS", sliced as
+-- start_date[:7] by services/schedule_service.py); the month scope is left(start_date::text, 7),
+-- which gives the same 'YYYY-MM' whether the column is text, timestamp or timestamptz.
+
+-- 1. Table
+CREATE TABLE IF NOT EXISTS public.payroll_data_versions (
+    channel_id bigint REFERENCES public.channels(id) ON DELETE CASCADE NOT NULL,
+    scope text NOT NULL,
+    version bigint NOT NULL DEFAULT 1,
+    updated_at timestamp with time zone DEFAULT timezone('utc'::text, now()) NOT NULL,
+    PRIMARY KEY (channel_id, scope)
+);
+
+ALTER TABLE public.payroll_data_versions ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "View channel payroll versions" ON public.payroll_data_versions;
+CREATE POLICY "View channel payroll versions" ON public.payroll_data_versions
+FOR SELECT
+TO authenticated
+USING (
+  exists (select 1 from public.channel_members where channel_id = payroll_data_versions.channel_id and user_id = auth.uid())
+);
+
+-- 2. Bump helper
+CREATE OR REPLACE FUNCTION public.bump_payroll_version(p_channel_id bigint, p_scope text)
+RETURNS void
+LANGUAGE sql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+  INSERT INTO public.payroll_data_versions AS v (channel_id, scope, version, updated_at)
+  VALUES (p_channel_id, p_scope, 1, now())
+  ON CONFLICT (channel_id, scope)
+  DO UPDATE SET version = v.version + 1, updated_at = now();
+$$;
+
+-- 3. Contracts: any change invalidates every month of the channel
+CREATE OR REPLACE FUNCTION public.bump_payroll_contracts()
+RETURNS trigger
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  IF TG_OP <> 'INSERT' AND OLD.channel_id IS NOT NULL THEN
+    PERFORM public.bump_payroll_version(OLD.channel_id, 'contracts');
+  END IF;
+  IF TG_OP <> 'DELETE' AND NEW.channel_id IS NOT NULL
+     AND (TG_OP = 'INSERT' OR NEW.channel_id IS DISTINCT FROM OLD.channel_id) THEN
+    PERFORM public.bump_payroll_version(NEW.channel_id, 'contracts');
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_labor_contracts_payroll_version ON public.labor_contracts;
+CREATE TRIGGER trg_labor_contracts_payroll_version
+AFTER INSERT OR UPDATE OR DELETE ON public.labor_contracts
+FOR EACH ROW EXECUTE FUNCTION public.bump_payroll_contracts();
+
+-- 4. Work-schedule events: only the month(s) the row starts in
+CREATE OR REPLACE FUNCTION public.bump_payroll_schedule()
+RETURNS trigger
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  IF TG_OP <> 'INSERT' AND OLD.is_work_schedule AND OLD.channel_id IS NOT NULL THEN
+    PERFORM public.bump_payroll_version(OLD.channel_id, left(OLD.start_date::text, 7));
+  END IF;
+  IF TG_OP <> 'DELETE' AND NEW.is_work_schedule AND NEW.channel_id IS NOT NULL
+     AND (TG_OP = 'INSERT' OR NOT OLD.is_work_schedule
+          OR left(NEW.start_date::text, 7) IS DISTINCT FROM left(OLD.start_date::text, 7)
+          OR NEW.channel_id IS DISTINCT FROM OLD.channel_id) THEN
+    PERFORM public.bump_payroll_version(NEW.channel_id, left(NEW.start_date::text, 7));
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_calendar_events_payroll_version ON public.calendar_events;
+CREATE TRIGGER trg_calendar_events_payroll_version
+AFTER INSERT OR UPDATE OR DELETE ON public.calendar_events
+FOR EACH ROW EXECUTE FUNCTION public.bump_payroll_schedule();
+
+NOTIFY pgrst, 'reload config';
@@ -0,0 +1,24 @@
+-- [OPTIMIZATION] Content-addressed upload deduplication
+-- Maps the SHA-256 of an uploaded file (as picked by the user, before compression)
+-- to the storage object already holding it, plus its WebP derivatives.
+-- storage_service checks this before compressing/transferring and reuses the object on a match.
+
+CREATE TABLE IF NOT EXISTS public.storage_content_index (
+    bucket      text        NOT NULL,
+    digest      text        NOT NULL,          -- hex sha256
+    path        text        NOT NULL,          -- object path of the (compressed) original
+    size        bigint,
+    public_url  text        NOT NULL,
+    thumb_url   text,
+    preview_url text,
+    created_at  timestamptz NOT NULL DEFAULT now(),
+    PRIMARY KEY (bucket, digest)
+);
+
+-- Storage GC looks entries up by object path
+CREATE INDEX IF NOT EXISTS idx_storage_content_index_path
+    ON public.storage_content_index(bucket, path);
+
+ALTER TABLE public.storage_content_index ENABLE ROW LEVEL SECURITY;  -- service role only
+
+NOTIFY pgrst, 'reload config';
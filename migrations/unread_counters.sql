@@ -0,0 +1,181 @@
+-- [OPTIMIZATION] Incrementally Maintained Unread Counters
+-- Replaces COUNT(*) over chat history (unread_counts_view) with a per (topic, user) counter.
+--   * INSERT on chat_messages      -> +1 for every topic member except the sender
+--   * DELETE on chat_messages      -> -1 for members who had not read it yet
+--   * INSERT on chat_topic_members -> seed the counter with that member's unread history
+--   * INSERT/UPDATE on chat_user_reading -> recount from the new last_read_at, in the same transaction
+--                                       as the read-marker write (chat_service.update_last_read)
+-- Badge refresh cost becomes O(topics) no matter how much history a store has.
+
+-- 1. Table
+CREATE TABLE IF NOT EXISTS public.chat_unread_counters (
+    topic_id bigint REFERENCES public.chat_topics(id) ON DELETE CASCADE NOT NULL,
+    user_id uuid REFERENCES public.profiles(id) ON DELETE CASCADE NOT NULL,
+    count integer NOT NULL DEFAULT 0,
+    updated_at timestamp with time zone DEFAULT timezone('utc'::text, now()) NOT NULL,
+    PRIMARY KEY (topic_id, user_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_chat_unread_counters_user
+    ON public.chat_unread_counters(user_id) WHERE count > 0;
+
+ALTER TABLE public.chat_unread_counters ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Read own unread counters" ON public.chat_unread_counters;
+CREATE POLICY "Read own unread counters" ON public.chat_unread_counters
+FOR SELECT
+TO authenticated
+USING (user_id = auth.uid());
+
+-- 2. Message insert: bump every other member
+CREATE OR REPLACE FUNCTION public.bump_unread_counters()
+RETURNS trigger
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  INSERT INTO public.chat_unread_counters AS c (topic_id, user_id, count, updated_at)
+  SELECT tm.topic_id, tm.user_id, 1, now()
+  FROM public.chat_topic_members tm
+  WHERE tm.topic_id = NEW.topic_id
+    AND tm.user_id IS DISTINCT FROM NEW.user_id
+  ON CONFLICT (topic_id, user_id)
+  DO UPDATE SET count = c.count + 1, updated_at = now();
+  RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_chat_messages_bump_unread ON public.chat_messages;
+CREATE TRIGGER trg_chat_messages_bump_unread
+AFTER INSERT ON public.chat_messages
+FOR EACH ROW EXECUTE FUNCTION public.bump_unread_counters();
+
+-- 3. Message delete: undo the bump for members who had not read it
+CREATE OR REPLACE FUNCTION public.drop_unread_counters()
+RETURNS trigger
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  UPDATE public.chat_unread_counters c
+  SET count = c.count - 1, updated_at = now()
+  WHERE c.topic_id = OLD.topic_id
+    AND c.user_id IS DISTINCT FROM OLD.user_id
+    AND c.count > 0
+    AND OLD.created_at > COALESCE(
+        (SELECT cur.last_read_at FROM public.chat_user_reading cur
+         WHERE cur.topic_id = c.topic_id AND cur.user_id = c.user_id),
+        '1970-01-01'::timestamp with time zone);
+  RETURN OLD;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_chat_messages_drop_unread ON public.chat_messages;
+CREATE TRIGGER trg_chat_messages_drop_unread
+AFTER DELETE ON public.chat_messages
+FOR EACH ROW EXECUTE FUNCTION public.drop_unread_counters();
+
+-- 4. New member: seed with history they have not read (one-time count on join)
+CREATE OR REPLACE FUNCTION public.seed_unread_counter()
+RETURNS trigger
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  INSERT INTO public.chat_unread_counters (topic_id, user_id, count)
+  SELECT NEW.topic_id, NEW.user_id, COUNT(m.id)
+  FROM public.chat_messages m
+  LEFT JOIN public.chat_user_reading cur
+         ON cur.topic_id = NEW.topic_id AND cur.user_id = NEW.user_id
+  WHERE m.topic_id = NEW.topic_id
+    AND m.user_id IS DISTINCT FROM NEW.user_id
+    AND m.created_at > COALESCE(cur.last_read_at, '1970-01-01'::timestamp with time zone)
+  ON CONFLICT (topic_id, user_id) DO NOTHING;
+  RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_chat_topic_members_seed_unread ON public.chat_topic_members;
+CREATE TRIGGER trg_chat_topic_members_seed_unread
+AFTER INSERT ON public.chat_topic_members
+FOR EACH ROW EXECUTE FUNCTION public.seed_unread_counter();
+
+-- 5. Member leaves: drop their counter
+CREATE OR REPLACE FUNCTION public.clear_unread_counter()
+RETURNS trigger
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  DELETE FROM public.chat_unread_counters
+  WHERE topic_id = OLD.topic_id AND user_id = OLD.user_id;
+  RETURN OLD;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_chat_topic_members_clear_unread ON public.chat_topic_members;
+CREATE TRIGGER trg_chat_topic_members_clear_unread
+AFTER DELETE ON public.chat_topic_members
+FOR EACH ROW EXECUTE FUNCTION public.clear_unread_counter();
+
+-- 6. Read marker moved: recount what is still unread after it. Runs inside the read-marker write,
+--    so a message arriving between "mark read" and a separate reset can no longer be lost.
+CREATE OR REPLACE FUNCTION public.reset_unread_counter()
+RETURNS trigger
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  INSERT INTO public.chat_unread_counters AS c (topic_id, user_id, count, updated_at)
+  SELECT NEW.topic_id, NEW.user_id, COUNT(m.id), now()
+  FROM public.chat_messages m
+  WHERE m.topic_id = NEW.topic_id
+    AND m.user_id IS DISTINCT FROM NEW.user_id
+    AND m.created_at > COALESCE(NEW.last_read_at, '1970-01-01'::timestamp with time zone)
+  ON CONFLICT (topic_id, user_id)
+  DO UPDATE SET count = EXCLUDED.count, updated_at = now();
+  RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_chat_user_reading_reset_unread ON public.chat_user_reading;
+CREATE TRIGGER trg_chat_user_reading_reset_unread
+AFTER INSERT OR UPDATE OF last_read_at ON public.chat_user_reading
+FOR EACH ROW EXECUTE FUNCTION public.reset_unread_counter();
+
+-- 7. Backfill from the existing aggregation (one-time)
+INSERT INTO public.chat_unread_counters (topic_id, user_id, count)
+SELECT tm.topic_id, tm.user_id, COUNT(m.id)
+FROM public.chat_topic_members tm
+JOIN public.chat_messages m ON m.topic_id = tm.topic_id
+LEFT JOIN public.chat_user_reading cur ON cur.topic_id = tm.topic_id AND cur.user_id = tm.user_id
+WHERE m.user_id IS DISTINCT FROM tm.user_id
+  AND m.created_at > COALESCE(cur.last_read_at, '1970-01-01'::timestamp with time zone)
+GROUP BY tm.topic_id, tm.user_id
+ON CONFLICT (topic_id, user_id) DO UPDATE SET count = EXCLUDED.count, updated_at = now();
+
+-- 8. Point the unread RPC (migrations/unread_counts_rpc.sql) at the counters
+CREATE OR REPLACE FUNCTION public.get_unread_counts(p_user_id uuid, p_cap integer DEFAULT 99)
+RETURNS TABLE (topic_id bigint, unread_count integer)
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+  SELECT c.topic_id, LEAST(c.count, p_cap)
+  FROM public.chat_unread_counters c
+  WHERE c.user_id = p_user_id
+    AND c.count > 0;
+$$;
+
+-- [SECURITY] Server-only (see unread_counts_rpc.sql): p_user_id is caller-supplied under SECURITY DEFINER
+REVOKE ALL ON FUNCTION public.get_unread_counts(uuid, integer) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.get_unread_counts(uuid, integer) TO service_role;
+
+-- Force Schema Cache Reload for PostgREST
+NOTIFY pgrst, 'reload config';
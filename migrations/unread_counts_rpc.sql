@@ -0,0 +1,47 @@
+-- [OPTIMIZATION] Unread Counts RPC
+-- Returns unread counts for ALL of a user's topics in one round-trip,
+-- including topics the user has never opened (no chat_user_reading row).
+-- Replaces the per-topic COUNT fan-out in chat_service.get_unread_counts.
+-- Each count stops at p_cap (config.UNREAD_COUNT_CAP) so a busy room never scans its full history.
+
+-- 1. Supporting indexes
+CREATE INDEX IF NOT EXISTS idx_chat_messages_topic_created
+    ON public.chat_messages(topic_id, created_at);
+
+CREATE INDEX IF NOT EXISTS idx_chat_topic_members_user
+    ON public.chat_topic_members(user_id);
+
+-- 2. Function
+CREATE OR REPLACE FUNCTION public.get_unread_counts(p_user_id uuid, p_cap integer DEFAULT 99)
+RETURNS TABLE (topic_id bigint, unread_count integer)
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+  SELECT cm.topic_id, c.unread_count
+  FROM public.chat_topic_members cm
+  LEFT JOIN public.chat_user_reading cur
+         ON cur.topic_id = cm.topic_id AND cur.user_id = cm.user_id
+  CROSS JOIN LATERAL (
+      SELECT COUNT(*)::integer AS unread_count
+      FROM (
+          SELECT 1
+          FROM public.chat_messages m
+          WHERE m.topic_id = cm.topic_id
+            AND m.user_id IS DISTINCT FROM cm.user_id  -- Exclude own messages
+            AND m.created_at > COALESCE(cur.last_read_at, '1970-01-01'::timestamp with time zone)
+          LIMIT p_cap
+      ) capped
+  ) c
+  WHERE cm.user_id = p_user_id
+    AND c.unread_count > 0;
+$$;
+
+-- [SECURITY] SECURITY DEFINER + caller-supplied p_user_id: only the server (service role) may call it,
+-- otherwise any logged-in user could read another user's unread counts.
+REVOKE ALL ON FUNCTION public.get_unread_counts(uuid, integer) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.get_unread_counts(uuid, integer) TO service_role;
+
+-- Force Schema Cache Reload for PostgREST
+NOTIFY pgrst, 'reload config';
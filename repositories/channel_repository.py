@@ -1,5 +1,6 @@
 from db import service_supabase
 from utils.logger import log_error
+from utils.cache import role_cache, role_key, invalidate_channel_members, MISSING
 
 class ChannelRepository:
     """
@@ -44,33 +45,49 @@ class ChannelRepository:
     @staticmethod
     def update_member_role(channel_id, user_id, new_role):
         """Update a member's role within a channel."""
-        return service_supabase.table("channel_members")\
+        res = service_supabase.table("channel_members")\
             .update({"role": new_role})\
             .eq("channel_id", channel_id)\
             .eq("user_id", user_id)\
             .execute()
+        invalidate_channel_members(channel_id, user_id)
+        return res
 
     @staticmethod
     def remove_member(channel_id, user_id):
         """Remove a member from a channel."""
-        return service_supabase.table("channel_members")\
+        res = service_supabase.table("channel_members")\
             .delete()\
             .eq("channel_id", channel_id)\
             .eq("user_id", user_id)\
             .execute()
+        invalidate_channel_members(channel_id, user_id)
+        return res
 
     @staticmethod
     def get_member_role(channel_id, user_id):
-        """Fetch specific member's role."""
+        """Fetch specific member's role (None if not a member). Read-through role_cache."""
+        key = role_key(channel_id, user_id)
+        role = role_cache.get(key)
+        if role is not MISSING:
+            return role
         try:
+            # [OPTIMIZATION] limit(2) instead of single(): "not a member" is an empty result, not an error
             res = service_supabase.table("channel_members")\
                 .select("role")\
                 .eq("channel_id", channel_id)\
                 .eq("user_id", user_id)\
-                .single().execute()
-            return res.data["role"] if res.data else None
+                .limit(2).execute()
         except Exception:
+            return None  # Transient failure: do not cache
+        rows = res.data or []
+        if len(rows) > 1:
+            # Duplicate membership rows: no role, as .single() did, and not cached
+            log_error(f"Duplicate channel_members rows: channel={channel_id} user={user_id}")
             return None
+        role = rows[0].get("role") if rows else None
+        role_cache.set(key, role)
+        return role
 
     @staticmethod
     def update_channel_name(channel_id, name):
@@ -107,6 +124,7 @@ class ChannelRepository:
         service_supabase.table("channel_members").update({"role": "owner"}).eq("channel_id", channel_id).eq("user_id", new_owner_id).execute()
         # 3. Demote Old (simplified)
         service_supabase.table("channel_members").update({"role": "manager"}).eq("channel_id", channel_id).eq("role", "owner").neq("user_id", new_owner_id).execute()
+        invalidate_channel_members(channel_id)
 
     @staticmethod
     def get_invite_by_code(code, current_time_iso):
@@ -147,11 +165,13 @@ class ChannelRepository:
     @staticmethod
     def create_membership(channel_id, user_id, role="staff"):
         """Add member to channel."""
-        return service_supabase.table("channel_members").insert({
+        res = service_supabase.table("channel_members").insert({
             "channel_id": channel_id,
             "user_id": user_id,
             "role": role
         }).execute()
+        invalidate_channel_members(channel_id, user_id)
+        return res
 
     @staticmethod
     def update_channel_location(channel_id, lat, lng, address=None):
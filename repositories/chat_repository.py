@@ -1,6 +1,7 @@
 from typing import List, Dict, Any, Optional
 from db import service_supabase
 from utils.logger import log_error
+from utils.cache import category_cache, role_cache, role_key, topic_meta_cache, MISSING
 
 class ChatRepository:
     """
@@ -15,10 +16,13 @@ class ChatRepository:
 
     @staticmethod
     def get_categories(channel_id: int) -> List[Dict[str, Any]]:
-        res = service_supabase.table("chat_categories").select("*")\
-            .eq("channel_id", channel_id)\
-            .order("display_order", desc=True).execute()
-        return res.data or []
+        def _load():
+            res = service_supabase.table("chat_categories").select("*")\
+                .eq("channel_id", channel_id)\
+                .order("display_order", desc=True).execute()
+            return res.data or []
+        # Copies: callers may sort / annotate the rows without touching the cached list
+        return [dict(c) for c in category_cache.get_or_load(str(channel_id), _load)]
 
     @staticmethod
     def create_category(name: str, channel_id: int):
@@ -26,14 +30,17 @@ class ChatRepository:
             "name": name, 
             "channel_id": channel_id
         }).execute()
+        category_cache.invalidate(str(channel_id))
 
     @staticmethod
     def update_category(cat_id: str, new_name: str):
         service_supabase.table("chat_categories").update({"name": new_name}).eq("id", cat_id).execute()
+        category_cache.clear()  # Only the category id is known here
 
     @staticmethod
     def delete_category(cat_id: str):
         service_supabase.table("chat_categories").delete().eq("id", cat_id).execute()
+        category_cache.clear()
 
     @staticmethod
     def get_topic_member_ids(user_id: str) -> List[str]:
@@ -61,8 +68,27 @@ class ChatRepository:
 
     @staticmethod
     def get_topic_by_id(topic_id: str) -> Optional[Dict[str, Any]]:
-        res = service_supabase.table("chat_topics").select("id, created_by, channel_id").eq("id", topic_id).single().execute()
-        return res.data
+        def _load():
+            res = service_supabase.table("chat_topics").select("id, created_by, channel_id").eq("id", topic_id).single().execute()
+            return res.data
+        return topic_meta_cache.get_or_load(str(topic_id), _load)
+
+    @staticmethod
+    def get_topics_meta(topic_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """{str(topic_id): {id, created_by, channel_id}} for many topics: cache hits plus ONE in_ query."""
+        found, missing = {}, []
+        for tid in dict.fromkeys(str(t) for t in topic_ids):
+            meta = topic_meta_cache.get(tid)
+            if meta is MISSING:
+                missing.append(tid)
+            elif meta:
+                found[tid] = meta
+        if missing:
+            res = service_supabase.table("chat_topics").select("id, created_by, channel_id").in_("id", missing).execute()
+            for row in res.data or []:
+                topic_meta_cache.set(str(row["id"]), row)
+                found[str(row["id"])] = row
+        return found
 
     @staticmethod
     def create_topic(topic_data: Dict[str, Any]) -> List[Dict[str, Any]]:
@@ -72,14 +98,18 @@ class ChatRepository:
     @staticmethod
     def update_topic(topic_id: str, data: Dict[str, Any]):
         service_supabase.table("chat_topics").update(data).eq("id", topic_id).execute()
+        topic_meta_cache.invalidate(str(topic_id))
 
     @staticmethod
     def delete_topic(topic_id: str):
         service_supabase.table("chat_topics").delete().eq("id", topic_id).execute()
+        topic_meta_cache.invalidate(str(topic_id))
 
     @staticmethod
     def delete_topics_batch(topic_ids: List[str]):
         service_supabase.table("chat_topics").delete().in_("id", topic_ids).execute()
+        for tid in topic_ids:
+            topic_meta_cache.invalidate(str(tid))
 
     @staticmethod
     def update_topics_category(old_category_name: str, new_category_name: str):
@@ -92,8 +122,17 @@ class ChatRepository:
 
     @staticmethod
     def get_unread_counts_from_view(user_id: str) -> List[Dict[str, Any]]:
-        """Queries the server-side optimized view for unread counts."""
-        res = service_supabase.table("unread_counts_view").select("topic_id, unread_count").eq("user_id", user_id).execute()
+        """Reads the trigger-maintained chat_unread_counters table (see migrations/unread_counters.sql)."""
+        res = service_supabase.table("chat_unread_counters").select("topic_id, unread_count:count")\
+            .eq("user_id", user_id)\
+            .gt("count", 0)\
+            .execute()
+        return res.data or []
+
+    @staticmethod
+    def get_unread_counts_rpc(user_id: str, cap: int) -> List[Dict[str, Any]]:
+        """Single round-trip unread counts for every topic the user belongs to (see migrations/unread_counts_rpc.sql)."""
+        res = service_supabase.rpc("get_unread_counts", {"p_user_id": user_id, "p_cap": cap}).execute()
         return res.data or []
 
     @staticmethod
@@ -104,13 +143,61 @@ class ChatRepository:
     def delete_read_status_by_topic(topic_id: str):
         service_supabase.table("chat_user_reading").delete().eq("topic_id", topic_id).execute()
 
+    MESSAGE_COLUMNS = "id, topic_id, user_id, content, image_url, thumb_url, preview_url, created_at, profiles(username, full_name)"
+
+    @staticmethod
+    def get_messages(topic_id: str, limit: int = 50, before_id: Optional[int] = None,
+                     before_created_at: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Newest-first page of messages.
+        Pass the oldest loaded (id, created_at) as the cursor to page further back (keyset, no OFFSET).
+        """
+        query = service_supabase.table("chat_messages").select(ChatRepository.MESSAGE_COLUMNS)\
+            .eq("topic_id", topic_id)
+        if before_id and before_created_at:
+            query = query.or_(
+                f'created_at.lt."{before_created_at}",'
+                f'and(created_at.eq."{before_created_at}",id.lt.{before_id})'
+            )
+        elif before_id:
+            query = query.lt("id", before_id)
+        res = query.order("created_at", desc=True).order("id", desc=True).limit(limit).execute()
+        return res.data or []
+
     @staticmethod
-    def get_messages(topic_id: str, limit: int = 50) -> List[Dict[str, Any]]:
-        res = service_supabase.table("chat_messages").select(
-            "id, topic_id, user_id, content, image_url, created_at, profiles(username, full_name)"
-        ).eq("topic_id", topic_id).order("created_at", desc=True).limit(limit).execute()
+    def get_messages_since(topic_id: str, last_id: int, limit: int = 100) -> List[Dict[str, Any]]:
+        """Messages with id > last_id, oldest first (delta fetch for reloads)."""
+        res = service_supabase.table("chat_messages").select(ChatRepository.MESSAGE_COLUMNS)\
+            .eq("topic_id", topic_id)\
+            .gt("id", last_id)\
+            .order("id")\
+            .limit(limit)\
+            .execute()
         return res.data or []
 
+    @staticmethod
+    def get_room_fingerprint(topic_id: str):
+        """(newest message id, message count) of a room in one request."""
+        res = service_supabase.table("chat_messages").select("id", count="exact")\
+            .eq("topic_id", topic_id)\
+            .order("id", desc=True)\
+            .limit(1)\
+            .execute()
+        newest = res.data[0]["id"] if res.data else None
+        return newest, res.count or 0
+
+    @staticmethod
+    def get_message_ids_between(topic_id: str, min_id: int, max_id: int, limit: int) -> List[int]:
+        """Ids of the topic's messages in [min_id, max_id] (reconciles the loaded window)."""
+        res = service_supabase.table("chat_messages").select("id")\
+            .eq("topic_id", topic_id)\
+            .gte("id", min_id)\
+            .lte("id", max_id)\
+            .order("id")\
+            .limit(limit)\
+            .execute()
+        return [r["id"] for r in res.data or []]
+
     @staticmethod
     def get_recent_messages(since_time: str) -> List[Dict[str, Any]]:
         res = service_supabase.table("chat_messages").select("topic_id, created_at, user_id").gt("created_at", since_time).execute()
@@ -226,8 +313,45 @@ class ChatRepository:
 
     @staticmethod
     def get_channel_member_role(channel_id: int, user_id: str) -> Optional[str]:
-        member_res = service_supabase.table("channel_members").select("role").eq("channel_id", channel_id).eq("user_id", user_id).single().execute()
-        return member_res.data.get("role") if member_res.data else None
+        def _load():
+            # limit(2) instead of .single(): a non-member is a cacheable None, while duplicate
+            # membership rows still fail like .single() did (and are not cached)
+            member_res = service_supabase.table("channel_members").select("role").eq("channel_id", channel_id).eq("user_id", user_id).limit(2).execute()
+            rows = member_res.data or []
+            if len(rows) > 1:
+                log_error(f"Duplicate channel_members rows: channel={channel_id} user={user_id}")
+                raise ValueError("Ambiguous channel membership")
+            return rows[0].get("role") if rows else None
+        return role_cache.get_or_load(role_key(channel_id, user_id), _load)
+
+    @staticmethod
+    def get_channel_member_roles(channel_ids: List[Any], user_id: str) -> Dict[str, Optional[str]]:
+        """{str(channel_id): role or None} for one user across channels: cache hits plus ONE in_ query."""
+        roles, missing = {}, []
+        for cid in dict.fromkeys(str(c) for c in channel_ids):
+            role = role_cache.get(role_key(cid, user_id))
+            if role is MISSING:
+                missing.append(cid)
+            else:
+                roles[cid] = role
+        if missing:
+            res = service_supabase.table("channel_members").select("channel_id, role")\
+                .eq("user_id", user_id).in_("channel_id", missing).execute()
+            fetched, duplicated = {}, set()
+            for r in res.data or []:
+                cid = str(r["channel_id"])
+                if cid in fetched:
+                    duplicated.add(cid)
+                fetched[cid] = r.get("role")
+            for cid in missing:
+                if cid in duplicated:
+                    # Ambiguous membership: no role (denied), not cached - same as get_channel_member_role
+                    log_error(f"Duplicate channel_members rows: channel={cid} user={user_id}")
+                    roles[cid] = None
+                    continue
+                roles[cid] = fetched.get(cid)
+                role_cache.set(role_key(cid, user_id), roles[cid])
+        return roles
 
     @staticmethod
     def get_channel_members(channel_id: int) -> List[Dict[str, Any]]:
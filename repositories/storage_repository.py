@@ -11,6 +11,22 @@ class StorageRepository:
         # Using service_supabase's manual storage manager for stability
         return service_supabase.storage.upload(bucket_name, path, file_content, content_type)
 
+    @staticmethod
+    def upload_local_file(bucket_name, path, local_path, content_type=None, progress_callback=None):
+        """Stream a local file to a bucket (chunked / resumable; never read whole into memory)."""
+        return service_supabase.storage.upload_file(bucket_name, path, local_path, content_type, progress_callback)
+
+    @staticmethod
+    def create_signed_upload_url(bucket_name, path, expires_in=600):
+        """URL the browser can PUT the object to directly."""
+        return service_supabase.storage.from_(bucket_name).create_signed_upload_url(path, expires_in)
+
+    @staticmethod
+    def create_signed_urls(bucket_name, paths, expires_in):
+        """{path: signed download URL} for many objects: cache hits plus ONE sign request for the rest."""
+        rows = service_supabase.storage.from_(bucket_name).create_signed_urls(list(paths), expires_in)
+        return {r["path"]: r["signedURL"] for r in rows if r.get("signedURL")}
+
     @staticmethod
     def get_public_url(bucket_name, path):
         """Get the public URL for a file."""
@@ -25,3 +41,65 @@ class StorageRepository:
     def delete_file(bucket_name, path):
         """Delete a file from a bucket."""
         return service_supabase.storage.delete(bucket_name, path)
+
+    @staticmethod
+    def iter_objects(bucket_name, prefix=""):
+        """Every object in a bucket (paginated, recursive); rows carry "path" and "metadata"."""
+        return service_supabase.storage.from_(bucket_name).list_all(prefix)
+
+    @staticmethod
+    def remove_files(bucket_name, paths):
+        """Batched multi-object delete."""
+        return service_supabase.storage.from_(bucket_name).remove(list(paths))
+
+    @staticmethod
+    def iter_column_values(table, columns, page_size=1000):
+        """Yield every non-null value of `columns` in `table`, one page of rows at a time."""
+        start = 0
+        while True:
+            res = service_supabase.table(table).select(", ".join(columns))\
+                .order("id").range(start, start + page_size - 1).execute()
+            for row in res.data or []:
+                for col in columns:
+                    if row.get(col):
+                        yield row[col]
+            if len(res.data or []) < page_size:
+                return
+            start += page_size
+
+    @staticmethod
+    def find_referencing_values(table, column, values):
+        """Subset of `values` that some row of `table` still stores in `column`."""
+        if not values:
+            return set()
+        res = service_supabase.table(table).select(column).in_(column, list(values)).execute()
+        return {row[column] for row in res.data or []}
+
+    @staticmethod
+    def forget_paths(bucket_name, paths):
+        """Drop content-index rows for deleted objects (so dedup never hands them out again)."""
+        if not paths:
+            return None
+        return service_supabase.table("storage_content_index").delete()\
+            .eq("bucket", bucket_name).in_("path", list(paths)).execute()
+
+    @staticmethod
+    def find_by_digest(bucket_name, digest):
+        """Return the content-index row for a SHA-256 digest, or None."""
+        res = service_supabase.table("storage_content_index")\
+            .select("path, public_url, thumb_url, preview_url")\
+            .eq("bucket", bucket_name).eq("digest", digest).limit(1).execute()
+        return res.data[0] if res.data else None
+
+    @staticmethod
+    def record_digest(bucket_name, digest, path, size, media):
+        """Remember which object holds this content (first writer wins)."""
+        return service_supabase.table("storage_content_index").upsert({
+            "bucket": bucket_name,
+            "digest": digest,
+            "path": path,
+            "size": size,
+            "public_url": media.get("public_url"),
+            "thumb_url": media.get("thumb_url"),
+            "preview_url": media.get("preview_url"),
+        }, on_conflict="bucket,digest", ignore_duplicates=True).execute()
@@ -0,0 +1,23 @@
+import os
+import sys
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+try:
+    from services.storage_gc import collect_garbage
+except ImportError:
+    # Handle running from scripts/ subdirectory
+    sys.path.append(os.path.dirname(os.getcwd()))
+    from services.storage_gc import collect_garbage
+
+if __name__ == "__main__":
+    dry_run = "--dry-run" in sys.argv
+    print(f"Running Storage Orphan GC{' (dry run)' if dry_run else ''}...")
+    try:
+        for report in collect_garbage(dry_run=dry_run):
+            print(f"  {report['bucket']}: scanned {report['scanned']}, orphans {report['orphans']}, "
+                  f"deleted {report['deleted']}, reclaimed {report['reclaimed_bytes']} bytes, errors {report['errors']}")
+        print("GC completed.")
+    except Exception as e:
+        print(f"GC Failed: {e}")
@@ -1,28 +1,34 @@
 import asyncio
+import calendar as cal_mod
 from typing import List, Dict, Any, Optional
-from db import service_supabase
+from db import async_service_supabase
 from utils.logger import log_error, log_info
+from utils.cache import profile_cache, invalidate_schedule, MISSING
+
+FETCH_PAGE_SIZE = 1000  # PostgREST max-rows; larger windows are read page by page
+
+
+def month_bounds(year: int, month: int):
+    """ISO (first instant, last instant) of a month, matching the start_date/end_date text format."""
+    last_day = cal_mod.monthrange(year, month)[1]
+    return f"{year}-{month:02d}-01T00:00:00", f"{year}-{month:02d}-{last_day}T23:59:59"
 
 async def get_all_events(user_id: str, channel_id: int) -> List[Dict[str, Any]]:
     """Fetch calendar events visible to the user in specific channel."""
     # [ROBUSTNESS] Use Authenticated Client if possible to bypass RLS
     from services.auth_service import auth_service
-    from postgrest import SyncPostgrestClient
-    import os
     
     headers = auth_service.get_auth_headers()
-    client = service_supabase
+    client = async_service_supabase
     
     if headers:
-        url = os.environ.get("SUPABASE_URL")
-        # Creating a temporary client for this request
-        # Note: SyncPostgrestClient is lightweight
-        client = SyncPostgrestClient(f"{url}/rest/v1", headers=headers, schema="public", timeout=20)
+        # User-scoped view over the shared connection pool (no per-request client)
+        client = async_service_supabase.get_user_client(headers)
     
     # query 1: Fetch ALL filtered events for this channel (Shared Calendar Model)
     # [FIX] Simplified policy: If you are in the channel, you see all channel events.
     # This removes the need for complex 'participant_ids' JSONB filtering on the server/client.
-    t1 = asyncio.to_thread(lambda: client.from_("calendar_events")
+    t1 = (client.from_("calendar_events")
                            .select("*, profiles!calendar_events_created_by_fkey(full_name)")
                            .eq("channel_id", channel_id) # Filter by Channel
                            .order("start_date", desc=True)
@@ -46,12 +52,52 @@ async def get_all_events(user_id: str, channel_id: int) -> List[Dict[str, Any]]:
     # For now, we return all channel events.
     return events
 
+async def get_events_in_range(user_id: str, channel_id: int, start_iso: str, end_iso: str) -> List[Dict[str, Any]]:
+    """
+    Calendar events of the channel overlapping [start_iso, end_iso] (multi-day events that began earlier included).
+    Served by idx_calendar_events_channel_start / _end (migrations/calendar_month_window.sql); paged, so no row cap.
+    """
+    from services.auth_service import auth_service
+
+    headers = auth_service.get_auth_headers()
+    client = async_service_supabase
+    if headers:
+        # User-scoped view over the shared connection pool (no per-request client)
+        client = async_service_supabase.get_user_client(headers)
+
+    events, start = [], 0
+    try:
+        while True:
+            res = await (client.from_("calendar_events")
+                         .select("*, profiles!calendar_events_created_by_fkey(full_name)")
+                         .eq("channel_id", channel_id)
+                         .lte("start_date", end_iso)
+                         .gte("end_date", start_iso)
+                         .order("start_date")
+                         .order("id")
+                         .range(start, start + FETCH_PAGE_SIZE - 1)
+                         .execute())
+            page = res.data or []
+            events.extend(page)
+            if len(page) < FETCH_PAGE_SIZE:
+                return events
+            start += FETCH_PAGE_SIZE
+    except Exception as e:
+        log_error(f"Calendar Range Fetch Error: {e}")
+        raise
+
+
+async def get_month_events(user_id: str, channel_id: int, year: int, month: int) -> List[Dict[str, Any]]:
+    """Every event shown on the month grid (the month's window only, regardless of store history size)."""
+    start_iso, end_iso = month_bounds(year, month)
+    return await get_events_in_range(user_id, channel_id, start_iso, end_iso)
+
 async def delete_event(event_id: str, user_id: str) -> bool:
     """Delete an event by ID with ownership verification."""
     try:
         # [SECURITY] 소유권 검증 - 본인이 생성한 이벤트만 삭제 가능
-        event_res = await asyncio.to_thread(
-            lambda: service_supabase.table("calendar_events")
+        event_res = await (
+            async_service_supabase.table("calendar_events")
                 .select("id, created_by")
                 .eq("id", event_id)
                 .execute()
@@ -65,8 +111,8 @@ async def delete_event(event_id: str, user_id: str) -> bool:
             log_error(f"Unauthorized delete attempt: user={user_id}, event={event_id}")
             raise PermissionError("본인이 생성한 이벤트만 삭제할 수 있습니다.")
 
-        await asyncio.to_thread(
-            lambda: service_supabase.table("calendar_events")
+        await (
+            async_service_supabase.table("calendar_events")
                 .delete()
                 .eq("id", event_id)
                 .execute()
@@ -85,34 +131,43 @@ async def load_profiles(channel_id: int) -> List[Dict[str, Any]]:
     # Supabase doesn't support implicit join on M2M easily without foreign key setup on view
     # So we do: Get user_ids from channel_members -> Get profiles
     
+    cached = profile_cache.get(str(channel_id))
+    if cached is not MISSING:
+        return cached
+
     try:
         # 1. Get Member IDs (Async)
-        m_res = await asyncio.to_thread(lambda: service_supabase.table("channel_members").select("user_id").eq("channel_id", channel_id).execute())
+        m_res = await async_service_supabase.table("channel_members").select("user_id").eq("channel_id", channel_id).execute()
         uids = [m['user_id'] for m in m_res.data] if m_res.data else []
         
-        if not uids: return []
+        if not uids:
+            profile_cache.set(str(channel_id), [])
+            return []
         
         # 2. Get Profiles (Async)
-        res = await asyncio.to_thread(lambda: service_supabase.table("profiles")
+        res = await (async_service_supabase.table("profiles")
             .select("id, full_name")
             .in_("id", uids)
             .execute())
             
-        return res.data or []
+        profiles = res.data or []
+        profile_cache.set(str(channel_id), profiles)
+        return profiles
     except Exception as e:
         print(f"Error loading profiles: {e}")
         return []
 
 async def create_event(event_data: Dict[str, Any]):
     """Create a new calendar event."""
-    await asyncio.to_thread(lambda: service_supabase.table("calendar_events").insert(event_data).execute())
+    await async_service_supabase.table("calendar_events").insert(event_data).execute()
+    invalidate_schedule(event_data.get("channel_id"))
 
 async def update_event(event_id: str, event_data: Dict[str, Any], user_id: str):
     """Update an event by ID with ownership verification."""
     # [SECURITY] Ownership check
-    event_res = await asyncio.to_thread(
-        lambda: service_supabase.table("calendar_events")
-            .select("id, created_by")
+    event_res = await (
+        async_service_supabase.table("calendar_events")
+            .select("id, created_by, channel_id")
             .eq("id", event_id)
             .execute()
     )
@@ -126,10 +181,11 @@ async def update_event(event_id: str, event_data: Dict[str, Any], user_id: str):
     # Remove fields that shouldn't be updated manually or might cause error
     clean_data = {k: v for k, v in event_data.items() if k not in ["id", "created_at", "created_by"]}
     
-    await asyncio.to_thread(
-        lambda: service_supabase.table("calendar_events")
+    await (
+        async_service_supabase.table("calendar_events")
             .update(clean_data)
             .eq("id", event_id)
             .execute()
     )
+    invalidate_schedule(event_res.data[0].get("channel_id"))
     log_info(f"Event updated: {event_id} by user {user_id}")
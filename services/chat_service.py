@@ -10,13 +10,9 @@ from repositories.chat_repository import ChatRepository
 from db import supabase
 from utils.network import retry_operation
 from utils.logger import log_error, log_info
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from config import config
 from datetime import datetime, timezone, timedelta
 
-# [OPTIMIZATION] Global ThreadPoolExecutor for lightweight DB tasks
-# Avoids overhead of creating new threads for every unread count check
-_executor = ThreadPoolExecutor(max_workers=10)
-
 def get_categories(channel_id: int) -> List[Dict[str, Any]]:
     """Fetch all chat categories for a specific channel."""
     try:
@@ -91,6 +87,34 @@ def _verify_topic_permission(topic_id: str, user_id: str) -> bool:
         log_error(f"Permission check error: {e}")
         return False
 
+def filter_permitted_topics(topic_ids: List[str], user_id: str) -> List[str]:
+    """
+    Batch form of _verify_topic_permission: the subset of topic_ids the user may modify.
+    [OPTIMIZATION] One in_ query for topic owners and one for the user's roles in their channels,
+    regardless of how many topics are selected.
+    """
+    if not topic_ids:
+        return []
+    try:
+        topics = ChatRepository.get_topics_meta(topic_ids)
+        admin_cids = [
+            str(t["channel_id"]) for t in topics.values()
+            if t.get("created_by") != user_id and t.get("channel_id")
+        ]
+        roles = ChatRepository.get_channel_member_roles(admin_cids, user_id) if admin_cids else {}
+    except Exception as e:
+        log_error(f"Batch permission check error: {e}")
+        return []
+
+    permitted = []
+    for tid in topic_ids:
+        topic = topics.get(str(tid))
+        if not topic:
+            continue
+        if topic.get("created_by") == user_id or roles.get(str(topic.get("channel_id"))) in ["owner", "manager"]:
+            permitted.append(tid)
+    return permitted
+
 def update_topic_order(topic_id: str, new_order: int, user_id: str = None):
     """Update display order of a topic."""
     if user_id and not _verify_topic_permission(topic_id, user_id):
@@ -114,15 +138,9 @@ def delete_topics_batch(topic_ids: List[str], user_id: str = None):
     """Delete multiple topics (Optimized)."""
     if not topic_ids: return
     
-    # [SECURITY] Permission Check for each (Can be optimized to single query if needed)
-    valid_ids = []
-    for tid in topic_ids:
-        try:
-            if not user_id or _verify_topic_permission(tid, user_id):
-                valid_ids.append(tid)
-        except:
-            continue
-            
+    # [SECURITY] Permission check for the whole selection in two queries
+    valid_ids = filter_permitted_topics(topic_ids, user_id) if user_id else list(topic_ids)
+
     if not valid_ids:
         raise PermissionError("삭제할 수 있는 토픽이 없거나 권한이 없습니다.")
 
@@ -180,16 +198,64 @@ def create_topic(name: str, category: str, creator_id: str, channel_id: int):
         ChatRepository.add_topic_member(tid, creator_id, "owner")
         return t_data
 
-def get_messages(topic_id: str, limit: int = 30) -> List[Dict[str, Any]]:
-    """Fetch messages for a topic."""
+def get_messages(topic_id: str, limit: int = 30, before_id=None, before_created_at: str = None) -> List[Dict[str, Any]]:
+    """
+    Fetch a page of messages for a topic (oldest first).
+    Without a cursor this is the latest page; with before_id/before_created_at it is the page just older than that message.
+    """
     try:
-        messages = ChatRepository.get_messages(topic_id, limit)
+        messages = ChatRepository.get_messages(topic_id, limit, before_id, before_created_at)
         messages.reverse()
         return messages
     except Exception as e:
         print(f"Service Error (get_messages): {e}")
         raise e
 
+def get_messages_since(topic_id: str, last_id) -> List[Dict[str, Any]]:
+    """Fetch only messages newer than last_id (oldest first)."""
+    try:
+        return ChatRepository.get_messages_since(topic_id, last_id, config.MAX_MESSAGE_LIMIT)
+    except Exception as e:
+        print(f"Service Error (get_messages_since): {e}")
+        raise e
+
+def get_room_fingerprint(topic_id: str):
+    """(newest id, count) of a room: changes on inserts and deletes. Shared poll probe for everyone in the room."""
+    try:
+        return ChatRepository.get_room_fingerprint(topic_id)
+    except Exception as e:
+        print(f"Service Error (get_room_fingerprint): {e}")
+        raise e
+
+def get_user_sync_fingerprint(user_id: str):
+    """(joined topic ids, unread counters) of a user. Shared poll probe for all of the user's sessions."""
+    try:
+        topic_ids = tuple(sorted(str(t) for t in ChatRepository.get_topic_member_ids(user_id)))
+        unread = tuple(sorted((str(r["topic_id"]), int(r["unread_count"]))
+                              for r in ChatRepository.get_unread_counts_rpc(user_id, config.UNREAD_COUNT_CAP)))
+        return topic_ids, unread
+    except Exception as e:
+        print(f"Service Error (get_user_sync_fingerprint): {e}")
+        raise e
+
+def reconcile_loaded_messages(topic_id: str, loaded_ids) -> Dict[str, Any]:
+    """
+    Compare the ids shown for a room with the server's ids over the same range.
+    Returns {"removed": {ids deleted server-side}, "missing": bool (rows on the server not shown)}.
+    """
+    ids = [int(i) for i in loaded_ids]
+    if not ids:
+        return {"removed": set(), "missing": False}
+    try:
+        limit = len(ids) + config.MAX_MESSAGE_LIMIT
+        server = ChatRepository.get_message_ids_between(topic_id, min(ids), max(ids), limit)
+    except Exception as e:
+        print(f"Service Error (reconcile_loaded_messages): {e}")
+        raise e
+    server_ids = {str(i) for i in server}
+    shown = {str(i) for i in ids}
+    return {"removed": shown - server_ids, "missing": bool(server_ids - shown) or len(server) >= limit}
+
 def update_last_read(topic_id: str, user_id: str):
     """Update last read timestamp for a user on a topic."""
     import datetime
@@ -199,12 +265,13 @@ def update_last_read(topic_id: str, user_id: str):
             "topic_id": topic_id, 
             "user_id": user_id, 
             "last_read_at": now_utc
-        })
+        })  # The chat_user_reading trigger recounts the unread counter atomically (migrations/unread_counters.sql)
     except Exception as e:
         log_error(f"Update Read Error: {e}")
 
-def send_message(topic_id: str, content: str = None, image_url: str = None, user_id: str = None):
-    """Send a message to a topic."""
+def send_message(topic_id: str, content: str = None, image_url: str = None, user_id: str = None,
+                 thumb_url: str = None, preview_url: str = None):
+    """Send a message to a topic. thumb_url / preview_url are the WebP derivatives of an image attachment."""
     if not content and not image_url: return
     
     final_content = content
@@ -218,12 +285,17 @@ def send_message(topic_id: str, content: str = None, image_url: str = None, user
         else:
              final_content = "[파일 첨부]"
 
-    ChatRepository.insert_message({
+    data = {
         "topic_id": topic_id,
         "content": final_content,
         "image_url": image_url,
         "user_id": user_id
-    })
+    }
+    if thumb_url:
+        data["thumb_url"] = thumb_url
+    if preview_url:
+        data["preview_url"] = preview_url
+    ChatRepository.insert_message(data)
 
 def get_storage_signed_url(filename: str, bucket: str = "uploads") -> str:
     """Get a signed upload URL."""
@@ -253,55 +325,67 @@ def get_public_url(filename: str, bucket: str = "uploads") -> str:
         base_url = supabase.url if hasattr(supabase, "url") else os.environ.get("SUPABASE_URL", "")
         return f"{base_url}/storage/v1/object/public/{bucket}/{filename}"
 
+def get_signed_download_urls(paths: List[str], bucket: str = "uploads",
+                             expires_in: int = config.SIGNED_URL_EXPIRY_SECONDS) -> Dict[str, str]:
+    """{path: signed download URL}; one sign request covers every uncached path."""
+    from repositories.storage_repository import StorageRepository
+    try:
+        return StorageRepository.create_signed_urls(bucket, paths, expires_in)
+    except Exception as e:
+        log_error(f"Service Error (get_signed_download_urls): {e}")
+        return {}
+
+ATTACHMENT_FIELDS = ("image_url", "thumb_url", "preview_url")
+
+def sign_message_attachments(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Copies of messages whose attachment URLs are replaced by signed download URLs.
+    [OPTIMIZATION] All attachments of a page are signed with one batch call per bucket (not one per image).
+    URLs that fail to sign are left as stored.
+    """
+    from services.storage_gc import path_from_url
+    by_bucket: Dict[str, set] = {}
+    for msg in messages:
+        for field in ATTACHMENT_FIELDS:
+            parsed = path_from_url(msg.get(field))
+            if parsed:
+                by_bucket.setdefault(parsed[0], set()).add(parsed[1])
+    if not by_bucket:
+        return messages
+
+    signed = {bucket: get_signed_download_urls(sorted(paths), bucket) for bucket, paths in by_bucket.items()}
+    result = []
+    for msg in messages:
+        updates = {}
+        for field in ATTACHMENT_FIELDS:
+            parsed = path_from_url(msg.get(field))
+            url = parsed and signed[parsed[0]].get(parsed[1])
+            if url:
+                updates[field] = url
+        result.append({**msg, **updates} if updates else msg)
+    return result
+
 def get_unread_counts(user_id: str, topics: List[Dict[str, Any]]) -> Dict[str, int]:
     """
     Calculate unread messages for a list of topics.
     Returns: {topic_id: count}
 
-    [OPTIMIZATION] Uses server-side SQL View 'unread_counts_view'
+    [OPTIMIZATION] One RPC call (get_unread_counts) covers read AND never-read topics,
+    capped at config.UNREAD_COUNT_CAP. No per-topic fallback queries.
     """
     if not topics:
         return {}
     
     try:
-        # 1. Fetch unread counts from View
-        view_data = ChatRepository.get_unread_counts_from_view(user_id)
-        # Record which topics HAVE unread messages (>0)
-        counts = {str(item['topic_id']): int(item['unread_count']) for item in view_data}
-
-        # [FIX] Check which topics have ANY read status history
-        # If a topic is in chat_user_reading but NOT in view_data, it means 0 unread.
-        read_history = ChatRepository.get_user_read_status(user_id)
-        has_read_topic_ids = set(str(r['topic_id']) for r in read_history)
-
-        # 2. Handle 'Never Read' topics (Fallback for topics with NO entry in chat_user_reading)
-        topic_ids = [str(t['id']) for t in topics]
-        read_topic_ids = set(counts.keys())
-        
-        # A topic needs fallback counting ONLY if: 
-        # NOT in unread_counts_view AND NOT in chat_user_reading (truly never opened)
-        missing_topic_ids = [tid for tid in topic_ids if tid not in read_topic_ids and tid not in has_read_topic_ids]
-
-        if missing_topic_ids:
-            # [OPTIMIZATION] Parallel Execution for truly "Never Read" topics
-            from concurrent.futures import ThreadPoolExecutor, as_completed
-            
-            def fetch_count(tid):
-                try:
-                    c = ChatRepository.get_message_count_for_topic(tid, user_id)
-                    return tid, c
-                except Exception:
-                    return tid, 0
-
-            future_to_tid = {_executor.submit(fetch_count, tid): tid for tid in missing_topic_ids}
-            for future in as_completed(future_to_tid):
-                    tid, count = future.result()
-                    if count > 0:
-                        counts[tid] = count
-
-        return counts
+        rows = ChatRepository.get_unread_counts_rpc(user_id, config.UNREAD_COUNT_CAP)
+        visible = {str(t['id']) for t in topics}
+        return {
+            str(r['topic_id']): int(r['unread_count'])
+            for r in rows
+            if str(r['topic_id']) in visible and r.get('unread_count')
+        }
     except Exception as e:
-        log_error(f"Service Error (get_unread_counts_optimized): {e}")
+        log_error(f"Service Error (get_unread_counts): {e}")
         return {}
 
 
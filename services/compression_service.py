@@ -1,6 +1,8 @@
 import os
 import shutil
 import subprocess
+import threading
+import time
 import datetime
 from pathlib import Path
 
@@ -12,13 +14,24 @@ except ImportError:
     HAS_PIL = False
     print("WARNING: Pillow (PIL) not found. Image compression disabled.")
 
+IMAGE_EXTS = ['.jpg', '.jpeg', '.png', '.webp', '.bmp']
+
 def is_ffmpeg_available():
     return shutil.which("ffmpeg") is not None
 
-def compress_file(file_path: str) -> str:
+def discard_temp(path: str, original_path: str):
+    """Remove a compressed temp file once it has been uploaded (never the original)."""
+    if path and path != original_path and os.path.exists(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+def compress_file(file_path: str, progress_callback=None, cancel_event=None, timeout=None) -> str:
     """
     Analyzes and compresses file if necessary.
     Returns: Path to compressed file (temp) or original path if no compression needed.
+    Prefer services.media_worker for upload paths (bounded concurrency, timeout, cancellation).
     """
     if not os.path.exists(file_path):
         return file_path
@@ -26,12 +39,12 @@ def compress_file(file_path: str) -> str:
     ext = os.path.splitext(file_path)[1].lower()
     
     # 1. Image Compression
-    if ext in ['.jpg', '.jpeg', '.png', '.webp', '.bmp']:
+    if ext in IMAGE_EXTS:
         return compress_image(file_path)
     
     # 2. Video Compression
     elif ext in ['.mp4', '.mov', '.avi', '.mkv']:
-        return compress_video(file_path)
+        return compress_video(file_path, progress_callback, cancel_event, timeout)
         
     return file_path
 
@@ -87,7 +100,61 @@ def compress_image(file_path: str, max_width=1280, quality=80) -> str:
         print(f"Image Compression Error: {e}")
         return file_path
 
-def compress_video(file_path: str) -> str:
+# name -> (max edge in px, WebP quality)
+DERIVATIVE_SPECS = {
+    "thumb": (400, 70),     # 200x200 bubble at 2x density
+    "preview": (1280, 80),  # Full-screen viewer
+}
+
+def make_image_derivatives(file_path: str) -> dict:
+    """
+    Render WebP thumbnail/preview copies of an image into temp_uploads.
+    Returns {"thumb": path, "preview": path}; empty when the file is not an image or Pillow is missing.
+    """
+    if not HAS_PIL or os.path.splitext(file_path)[1].lower() not in IMAGE_EXTS:
+        return {}
+    try:
+        temp_dir = os.path.join(os.getcwd(), "temp_uploads")
+        os.makedirs(temp_dir, exist_ok=True)
+        stem = os.path.splitext(os.path.basename(file_path))[0]
+        timestamp = datetime.datetime.now().strftime('%H%M%S%f')
+
+        with Image.open(file_path) as src:
+            img = ImageOps.exif_transpose(src)
+            if img.mode not in ("RGB", "RGBA"):
+                img = img.convert("RGBA" if "transparency" in img.info else "RGB")
+
+            out = {}
+            # Largest first so each smaller rendition resamples fewer pixels
+            for name, (edge, quality) in sorted(DERIVATIVE_SPECS.items(), key=lambda kv: -kv[1][0]):
+                img.thumbnail((edge, edge), Image.Resampling.LANCZOS)
+                path = os.path.join(temp_dir, f"{name}_{timestamp}_{stem}.webp")
+                img.save(path, "WEBP", quality=quality, method=4)
+                out[name] = path
+            return out
+    except Exception as e:
+        print(f"Derivative Generation Error: {e}")
+        return {}
+
+def probe_duration(file_path: str) -> float:
+    """Media duration in seconds via ffprobe (0.0 if unknown)."""
+    if not shutil.which("ffprobe"):
+        return 0.0
+    try:
+        out = subprocess.run(
+            ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "csv=p=0", file_path],
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, timeout=15
+        )
+        return float(out.stdout.decode().strip() or 0)
+    except Exception:
+        return 0.0
+
+def compress_video(file_path: str, progress_callback=None, cancel_event=None, timeout=None) -> str:
+    """
+    Re-encode a video with ffmpeg.
+    progress_callback(fraction) is fed from ffmpeg's -progress output; setting cancel_event
+    or exceeding timeout (seconds) kills ffmpeg and returns the original file.
+    """
     if not is_ffmpeg_available():
         # Fallback: Check size limit
         size_mb = os.path.getsize(file_path) / (1024 * 1024)
@@ -110,14 +177,38 @@ def compress_video(file_path: str) -> str:
             "-vcodec", "libx264", "-crf", "28", "-preset", "faster",
             "-acodec", "aac", "-b:a", "128k",
             "-movflags", "+faststart",
+            "-loglevel", "error", "-nostats", "-progress", "pipe:1",
             "-y", # Overwrite
             output_path
         ]
         
-        # Run process
-        result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        
-        if result.returncode == 0 and os.path.exists(output_path):
+        duration_us = probe_duration(file_path) * 1_000_000 if progress_callback else 0
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+        # Watchdog: kill ffmpeg on cancel or timeout (stdout reads below may block)
+        finished = threading.Event()
+        deadline = time.monotonic() + timeout if timeout else None
+        def watchdog():
+            while not finished.wait(0.5):
+                if (cancel_event and cancel_event.is_set()) or (deadline and time.monotonic() > deadline):
+                    proc.kill()
+                    return
+        threading.Thread(target=watchdog, daemon=True).start()
+
+        try:
+            for raw in proc.stdout:
+                line = raw.decode(errors="ignore").strip()
+                if progress_callback and duration_us and line.startswith("out_time_us="):
+                    try:
+                        progress_callback(min(int(line.split("=", 1)[1]) / duration_us, 1.0))
+                    except ValueError:
+                        pass
+            proc.wait()
+        finally:
+            finished.set()
+        stderr = proc.stderr.read().decode("utf-8", errors="ignore")
+
+        if proc.returncode == 0 and os.path.exists(output_path):
             old_size = os.path.getsize(file_path)
             new_size = os.path.getsize(output_path)
             print(f"Compressed Video: {old_size/1024/1024:.1f}MB -> {new_size/1024/1024:.1f}MB")
@@ -128,7 +219,9 @@ def compress_video(file_path: str) -> str:
                 os.remove(output_path)
                 return file_path
         else:
-            print(f"FFmpeg failed: {result.stderr.decode('utf-8')}")
+            if os.path.exists(output_path):
+                os.remove(output_path)
+            print(f"FFmpeg failed ({proc.returncode}): {stderr}")
             return file_path
             
     except Exception as e:
@@ -1,21 +1,29 @@
 import asyncio
-from db import service_supabase, log_info
+from db import async_service_supabase, log_info
 from datetime import datetime, timezone
 from utils.logger import log_error
+from utils.cache import role_cache, role_key, MISSING
 
 class HandoverService:
     async def _verify_channel_member(self, user_id: str, channel_id: int) -> bool:
         """[SECURITY] 사용자가 채널 멤버인지 확인."""
+        # [OPTIMIZATION] Shares role_cache with ChannelRepository.get_member_role (None = not a member)
+        key = role_key(channel_id, user_id)
+        role = role_cache.get(key)
+        if role is not MISSING:
+            return role is not None
         try:
-            check = await asyncio.to_thread(lambda: service_supabase.table("channel_members").select("user_id").eq("channel_id", channel_id).eq("user_id", user_id).execute())
-            return len(check.data) > 0 if check.data else False
+            check = await async_service_supabase.table("channel_members").select("role").eq("channel_id", channel_id).eq("user_id", user_id).limit(1).execute()
         except Exception:
             return False
+        role = check.data[0].get("role") if check.data else None
+        role_cache.set(key, role)
+        return role is not None
 
     async def _verify_ownership(self, handover_id: str, user_id: str) -> bool:
         """[SECURITY] 인계사항 소유권 확인."""
         try:
-            check = await asyncio.to_thread(lambda: service_supabase.table("handovers").select("user_id").eq("id", handover_id).execute())
+            check = await async_service_supabase.table("handovers").select("user_id").eq("id", handover_id).execute()
             return check.data and check.data[0].get("user_id") == user_id
         except Exception:
             return False
@@ -29,7 +37,7 @@ class HandoverService:
 
         try:
             # [OPTIMIZATION] Limit to last 50 entries
-            res = await asyncio.to_thread(lambda: service_supabase.table("handovers").select("*, profiles:user_id(full_name)").eq("channel_id", channel_id).order("created_at", desc=True).limit(50).execute())
+            res = await async_service_supabase.table("handovers").select("*, profiles:user_id(full_name)").eq("channel_id", channel_id).order("created_at", desc=True).limit(50).execute()
             return res.data or []
         except Exception as e:
             log_error(f"Get handovers error: {e}")
@@ -52,7 +60,7 @@ class HandoverService:
             "created_at": datetime.now(timezone.utc).isoformat()
         }
         try:
-            await asyncio.to_thread(lambda: service_supabase.table("handovers").insert(data).execute())
+            await async_service_supabase.table("handovers").insert(data).execute()
             return True
         except Exception as e:
             log_error(f"Add handover error: {e}")
@@ -65,7 +73,7 @@ class HandoverService:
 
         try:
             # [SECURITY] 1. 해당 인계사항의 채널 ID 조회
-            check = await asyncio.to_thread(lambda: service_supabase.table("handovers").select("channel_id").eq("id", handover_id).execute())
+            check = await async_service_supabase.table("handovers").select("channel_id").eq("id", handover_id).execute()
             if not check.data:
                 return False
             
@@ -84,7 +92,7 @@ class HandoverService:
 
             # 수정 실행
             print(f"[DEBUG] Executing update...")
-            res = await asyncio.to_thread(lambda: service_supabase.table("handovers").update({
+            res = await (async_service_supabase.table("handovers").update({
                 "content": content.strip(),
                 "updated_at": datetime.now(timezone.utc).isoformat()
             }).eq("id", handover_id).execute())
@@ -100,7 +108,7 @@ class HandoverService:
             raise PermissionError("본인이 작성한 인계사항만 삭제할 수 있습니다.")
 
         try:
-            await asyncio.to_thread(lambda: service_supabase.table("handovers").delete().eq("id", handover_id).execute())
+            await async_service_supabase.table("handovers").delete().eq("id", handover_id).execute()
             return True
         except Exception as e:
             log_error(f"Delete handover error: {e}")
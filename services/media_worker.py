@@ -0,0 +1,149 @@
+"""
+Media Worker Pool for The Manager
+Image/video compression runs here instead of inline on the upload path.
+- At most MEDIA_MAX_WORKERS jobs run at once; the rest wait in the executor queue.
+- Each job reports progress (0.0-1.0), can be cancelled, and resolves by MEDIA_JOB_TIMEOUT at the latest
+  (ffmpeg is killed; in-process image work cannot be, so its late output is discarded).
+- Compression is best-effort: a failed or timed-out job resolves to the original file.
+"""
+import asyncio
+import itertools
+import threading
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+from config import config
+from services import compression_service
+from utils.logger import log_error, log_info
+
+
+class MediaJob:
+    def __init__(self, job_id: int, source_path: str, progress_callback: Optional[Callable[[float], None]],
+                 timeout: float, derivatives: bool = False):
+        self.id = job_id
+        self.source_path = source_path
+        self.want_derivatives = derivatives
+        self.derivatives: Dict[str, str] = {}  # {"thumb": path, "preview": path} for images
+        self.progress_callback = progress_callback
+        self.timeout = timeout
+        self.status = "queued"  # queued -> running -> done | cancelled | timed_out
+        self.progress = 0.0
+        self.cancel_event = threading.Event()
+        self.future: Future = Future()
+        self._settle_lock = threading.Lock()
+
+    def settle(self, path: Optional[str] = None, derivatives: Optional[Dict[str, str]] = None,
+               status: str = "done", exc: Optional[BaseException] = None) -> bool:
+        """Resolve the job once; False when the deadline (or the worker) already resolved it."""
+        with self._settle_lock:
+            if self.future.done():
+                return False
+            self.status = status
+            if exc is not None:
+                self.future.set_exception(exc)
+            else:
+                self.derivatives = derivatives or {}
+                self.future.set_result(path)
+            return True
+
+    def report(self, fraction: float):
+        self.progress = fraction
+        if self.progress_callback:
+            try:
+                self.progress_callback(fraction)
+            except Exception as e:
+                log_error(f"MEDIA: progress callback error (job {self.id}): {e}")
+
+    def cancel(self):
+        """Stop the job; a queued job never starts, a running ffmpeg is killed."""
+        self.cancel_event.set()
+        if self.future.cancel():
+            self.status = "cancelled"
+
+    def result(self, timeout: Optional[float] = None) -> str:
+        """Block until done (for callers already on a worker thread)."""
+        return self.future.result(timeout)
+
+    async def wait(self) -> str:
+        """Await the compressed path; cancelling the awaiting task cancels the job."""
+        try:
+            return await asyncio.wrap_future(self.future)
+        except asyncio.CancelledError:
+            self.cancel()
+            raise
+
+
+class MediaWorkerPool:
+    def __init__(self, max_workers: int, default_timeout: float):
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="media")
+        self._default_timeout = default_timeout
+        self._jobs: Dict[int, MediaJob] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def submit(self, file_path: str, progress_callback: Optional[Callable[[float], None]] = None,
+               timeout: Optional[float] = None, derivatives: bool = False) -> MediaJob:
+        """Queue a compression job; derivatives=True also renders image thumbnail/preview (job.derivatives)."""
+        job = MediaJob(next(self._ids), file_path, progress_callback, timeout or self._default_timeout, derivatives)
+        with self._lock:
+            self._jobs[job.id] = job
+        self._executor.submit(self._run, job)
+        return job
+
+    def cancel(self, job_id: int):
+        job = self._jobs.get(job_id)
+        if job:
+            job.cancel()
+
+    def get(self, job_id: int) -> Optional[MediaJob]:
+        return self._jobs.get(job_id)
+
+    def active_jobs(self) -> int:
+        return len(self._jobs)
+
+    def _run(self, job: MediaJob):
+        try:
+            if not job.future.set_running_or_notify_cancel():
+                job.status = "cancelled"  # Cancelled while queued
+                return
+            job.status = "running"
+            log_info(f"MEDIA: job {job.id} started ({job.source_path})")
+            # Deadline for the whole job: Pillow work cannot be interrupted, so the waiter gets the
+            # original file on time and whatever the worker produces afterwards is discarded
+            deadline = threading.Timer(job.timeout, self._expire, args=(job,))
+            deadline.daemon = True
+            deadline.start()
+            try:
+                path = compression_service.compress_file(
+                    job.source_path, progress_callback=job.report,
+                    cancel_event=job.cancel_event, timeout=job.timeout
+                )
+            except Exception as e:
+                log_error(f"MEDIA: job {job.id} failed: {e}")
+                path = job.source_path
+
+            derivatives = {}
+            if job.want_derivatives and not job.cancel_event.is_set():
+                derivatives = compression_service.make_image_derivatives(path)
+            deadline.cancel()
+
+            if job.cancel_event.is_set():
+                settled = job.settle(status="cancelled", exc=CancelledError())
+            else:
+                job.report(1.0)
+                settled = job.settle(path, derivatives)
+            if not settled or job.status == "cancelled":
+                for output in [path, *derivatives.values()]:
+                    compression_service.discard_temp(output, job.source_path)
+        finally:
+            with self._lock:
+                self._jobs.pop(job.id, None)
+
+    @staticmethod
+    def _expire(job: MediaJob):
+        if job.settle(job.source_path, status="timed_out"):
+            job.cancel_event.set()  # Kills a running ffmpeg; skips derivatives
+            log_error(f"MEDIA: job {job.id} timed out after {job.timeout}s; using the original file")
+
+
+media_worker = MediaWorkerPool(config.MEDIA_MAX_WORKERS, config.MEDIA_JOB_TIMEOUT)
@@ -0,0 +1,138 @@
+"""
+Payroll Engine for The Manager
+Pure computation behind PayrollService: contracts + work-schedule overrides -> payroll dict.
+- Works on a Roster (services/schedule_engine.py): the month's weekday layout, contract history
+  per employee and contract date spans are parsed once and shared with the staff calendar.
+- Every override is parsed once into (day, hours); an employee's month is then a set of
+  override days plus the contract's weekday mask, so counts come from set/mask arithmetic instead
+  of a datetime() call per employee per day.
+- Output (including float results) is identical to the former per-day loop.
+"""
+from typing import Dict, List
+
+from services.schedule_engine import Roster, scheduled_days, parse_override, event_employee_name
+
+DEFAULT_HOURLY_WAGE = 9860
+
+
+def _accumulate(total, value, count: int):
+    # Repeated addition (not value * count) keeps float totals bit-identical to the per-day loop
+    for _ in range(count):
+        total += value
+    return total
+
+
+def compute_payroll(contracts: List[dict], overrides: List[dict], year: int, month: int) -> dict:
+    """
+    Payroll for one store-month.
+    Returns {"summary": {total_std, total_act, diff, has_incomplete}, "employees": [...]}.
+    """
+    return roster_payroll(Roster(year, month, contracts, overrides))
+
+
+def roster_payroll(roster: Roster) -> dict:
+    """compute_payroll() over an already-parsed Roster (shared with the staff calendar)."""
+    layout = roster.layout
+    eid_to_name = roster.eid_to_name
+
+    name_to_events: Dict[str, List[dict]] = {}
+    all_names = set(eid_to_name.values())
+    for o in roster.overrides:
+        nm = event_employee_name(o, eid_to_name)
+        if not nm: continue
+        all_names.add(nm)
+        name_to_events.setdefault(nm, []).append(o)
+
+    employee_results = []
+    total_std = 0
+    total_act = 0
+    has_incomplete = False
+
+    for name in sorted(all_names):
+        span = roster.latest(name)
+        latest = span.contract if span else None
+
+        # 1. Standard Calc
+        std_pay = 0
+        std_days = 0
+        h_wage = None
+        m_wage = 0
+        wage_type = 'hourly'
+        daily_hours = 0
+        work_mask = frozenset()
+        is_resigned = bool(span) and span.ended
+
+        if latest and not is_resigned:
+            wage_type = latest.get('wage_type', 'hourly')
+            h_wage = latest.get('hourly_wage') or DEFAULT_HOURLY_WAGE
+            m_wage = latest.get('monthly_wage') or 0
+            daily_hours = latest.get('daily_work_hours', 8)
+            work_mask = scheduled_days(layout, latest.get('work_days', []))
+            std_days = len(work_mask)
+
+            if wage_type == 'monthly': std_pay = m_wage
+            else: std_pay = std_days * daily_hours * h_wage
+
+        # 2. Actual Calc: override hours (in event order), then contract hours on the remaining days
+        act_hours = 0
+        override_wage = None
+        override_days = set()
+
+        events = name_to_events.get(name, [])
+        for o in events:
+            if o.get('hourly_wage'):
+                override_wage = float(o['hourly_wage'])
+            day, hours = parse_override(o)
+            if day is None: continue
+            override_days.add(day)
+            if hours is not None: act_hours += hours
+
+        fill_days = len(work_mask - override_days)
+        act_hours = _accumulate(act_hours, daily_hours, fill_days)
+        act_days = len(override_days) + fill_days
+
+        # Determine Wage
+        final_h_wage = h_wage
+        if not latest:
+            final_h_wage = override_wage
+            wage_type = 'hourly'
+        elif override_wage:
+            final_h_wage = override_wage
+
+        # Calculate Final Pay
+        final_act_pay = None
+        if final_h_wage is None and wage_type == 'hourly':
+            final_act_pay = None # Unknown
+            if act_hours > 0: has_incomplete = True
+        elif wage_type == 'monthly':
+            final_act_pay = m_wage
+        else:
+            final_act_pay = act_hours * (final_h_wage if final_h_wage else 0)
+
+        total_std += std_pay
+        if final_act_pay is not None: total_act += final_act_pay
+
+        employee_results.append({
+            "name": name,
+            "std_pay": std_pay,
+            "std_days": std_days,
+            "act_pay": final_act_pay,
+            "act_days": act_days,
+            "act_hours": act_hours,
+            "diff": (final_act_pay - std_pay) if final_act_pay is not None else 0,
+            "h_wage": final_h_wage,
+            "is_incomplete": (final_act_pay is None and act_hours > 0),
+            "wage_type": wage_type, # Pass wage type for UI logic
+            "is_registered": bool(latest), # Flag for UI
+            "events": events # Passed for context if needed
+        })
+
+    return {
+        "summary": {
+            "total_std": total_std,
+            "total_act": total_act,
+            "diff": total_act - total_std,
+            "has_incomplete": has_incomplete
+        },
+        "employees": employee_results
+    }
@@ -0,0 +1,137 @@
+"""
+Poll Scheduler for The Manager
+Replaces per-view `while True: sleep()` loops with keyed jobs owned by the server process.
+- Identical keys (e.g. "handover:<channel_id>") share ONE fetch loop across sessions.
+- A job backs off while its result does not change, and snaps back on change or poke().
+- Subscriptions are owned by a page; Router.navigate_to cancels them when the page leaves its route,
+  main.py when the session closes, and views on unmount.
+- A subscriber whose on_change raises MAX_SUBSCRIBER_FAILURES times in a row (dead controls of a
+  closed tab) is dropped, as the per-view loops used to break on error.
+"""
+import asyncio
+import itertools
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from utils.logger import log_error, log_info
+
+_UNSET = object()
+MAX_SUBSCRIBER_FAILURES = 3
+
+
+class _PollJob:
+    def __init__(self, key: str, fetch: Callable[[], Awaitable[Any]], interval: float, max_interval: float, backoff: float):
+        self.key = key
+        self.fetch = fetch
+        self.interval = interval
+        self.max_interval = max(max_interval, interval)
+        self.backoff = backoff
+        self.subscribers: Dict[int, Tuple[Any, Optional[Callable]]] = {}  # token -> (owner, on_change)
+        self.failures: Dict[int, int] = {}  # token -> consecutive on_change errors
+        self.last_result = _UNSET
+        self.wake = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+
+
+class PollScheduler:
+    def __init__(self):
+        self._jobs: Dict[str, _PollJob] = {}
+        self._token_keys: Dict[int, str] = {}
+        self._ids = itertools.count(1)
+
+    def register(self, key: str, fetch: Callable[[], Awaitable[Any]], on_change: Optional[Callable] = None, *,
+                 owner: Any = None, interval: float = 10.0, max_interval: Optional[float] = None,
+                 backoff: float = 1.5) -> int:
+        """
+        Subscribe to a poll job. The first registrant's fetch/interval define the job;
+        later registrants with the same key just add their on_change callback.
+        on_change(result) is called (sync or async) whenever the fetched result differs from the last one.
+        Returns a token for unregister().
+        """
+        job = self._jobs.get(key)
+        if job is None:
+            job = _PollJob(key, fetch, interval, max_interval or interval, backoff)
+            self._jobs[key] = job
+            job.task = asyncio.create_task(self._run(job))
+            log_info(f"POLL: Started {key} (every {interval}s, max {job.max_interval}s)")
+
+        token = next(self._ids)
+        job.subscribers[token] = (owner, on_change)
+        self._token_keys[token] = key
+        return token
+
+    def unregister(self, token: Optional[int]):
+        key = self._token_keys.pop(token, None)
+        job = self._jobs.get(key) if key else None
+        if not job:
+            return
+        job.subscribers.pop(token, None)
+        job.failures.pop(token, None)
+        if not job.subscribers:
+            self._stop(job)
+
+    def cancel_owner(self, owner: Any):
+        """Drop every subscription held by one owner (a page leaving its route)."""
+        tokens = [t for t, k in self._token_keys.items()
+                  if k in self._jobs and self._jobs[k].subscribers.get(t, (None,))[0] is owner]
+        for token in tokens:
+            self.unregister(token)
+
+    def poke(self, key: str):
+        """Run a job now and reset its back-off (call after a local write)."""
+        job = self._jobs.get(key)
+        if job:
+            job.wake.set()
+
+    def active_jobs(self) -> int:
+        return len(self._jobs)
+
+    def _stop(self, job: _PollJob):
+        self._jobs.pop(job.key, None)
+        if job.task and not job.task.done():
+            job.task.cancel()
+        log_info(f"POLL: Stopped {job.key}")
+
+    async def _run(self, job: _PollJob):
+        delay = job.interval
+        try:
+            while job.subscribers:
+                try:
+                    await asyncio.wait_for(job.wake.wait(), timeout=delay)
+                    poked = True
+                except asyncio.TimeoutError:
+                    poked = False
+                job.wake.clear()
+                if not job.subscribers:
+                    break
+
+                try:
+                    result = await job.fetch()
+                except Exception as e:
+                    log_error(f"POLL: {job.key} failed: {e}")
+                    delay = min(delay * job.backoff, job.max_interval)
+                    continue
+
+                changed = result != job.last_result
+                job.last_result = result
+                delay = job.interval if (changed or poked) else min(delay * job.backoff, job.max_interval)
+                if not changed:
+                    continue
+
+                for token, (_, on_change) in list(job.subscribers.items()):
+                    if not on_change or token not in job.subscribers:
+                        continue
+                    try:
+                        res = on_change(result)
+                        if asyncio.iscoroutine(res):
+                            await res
+                        job.failures.pop(token, None)
+                    except Exception as e:
+                        log_error(f"POLL: {job.key} subscriber error: {e}")
+                        job.failures[token] = job.failures.get(token, 0) + 1
+                        if job.failures[token] >= MAX_SUBSCRIBER_FAILURES:
+                            log_info(f"POLL: Dropping failing subscriber {token} of {job.key}")
+                            self.unregister(token)
+        except asyncio.CancelledError:
+            pass
+
+
+poll_scheduler = PollScheduler()
@@ -0,0 +1,163 @@
+"""
+Realtime Hub for The Manager
+One Supabase realtime websocket per server process, shared by every Flet session.
+Views register interest with a (table, column=value) filter; the hub keeps one
+filtered channel per filter and fans each change out in-process to the callbacks
+registered for it. A filter whose join fails stays pending and is retried with backoff
+(and on the next subscribe), so its listeners are never left without a channel.
+"""
+import asyncio
+import itertools
+from typing import Any, Callable, Dict, Optional
+from config import config
+from db import supabase
+from utils.logger import log_error, log_info
+
+
+class RealtimeHub:
+    def __init__(self):
+        self._client = None
+        self._channels: Dict[str, Any] = {}                      # key -> AsyncRealtimeChannel
+        self._listeners: Dict[str, Dict[int, Callable]] = {}     # key -> {token: callback}
+        self._token_keys: Dict[int, str] = {}                    # token -> key
+        self._pending: Dict[str, tuple] = {}                     # key -> (table, column, value, event), join failed
+        self._retry_task: Optional[asyncio.Task] = None
+        self._ids = itertools.count(1)
+        self._lock: Optional[asyncio.Lock] = None
+
+    @staticmethod
+    def _key(table: str, column: str, value: Any, event: str) -> str:
+        return f"{table}:{column}={value}:{event}"
+
+    def _get_lock(self) -> asyncio.Lock:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    async def _ensure_client(self):
+        # The realtime client reconnects and rejoins its channels on its own
+        if self._client is not None:
+            return self._client
+        if not supabase:
+            return None
+        client = supabase.get_realtime_client()
+        if not client:
+            return None
+        await client.connect()
+        self._client = client
+        log_info("REALTIME_HUB: Connected.")
+        return client
+
+    def _dispatch(self, key: str, payload: Dict[str, Any]):
+        """Fan one server event out to every session listening on this key."""
+        for callback in list(self._listeners.get(key, {}).values()):
+            try:
+                result = callback(payload)
+                if asyncio.iscoroutine(result):
+                    asyncio.create_task(result)
+            except Exception as e:
+                log_error(f"REALTIME_HUB: Listener error on {key}: {e}")
+
+    async def subscribe(self, table: str, column: str, value: Any, callback: Callable, event: str = "*") -> int:
+        """
+        Register a callback for changes on `table` where `column` = `value`.
+        Returns a token for unsubscribe(). Callbacks may be sync or async.
+        """
+        key = self._key(table, column, value, event)
+        token = next(self._ids)
+        self._listeners.setdefault(key, {})[token] = callback
+        self._token_keys[token] = key
+
+        async with self._get_lock():
+            # Filters that failed earlier get another attempt first (e.g. the socket is back)
+            await self._join_pending()
+            if key not in self._channels and key not in self._pending:
+                await self._join(key, table, column, value, event)
+        return token
+
+    async def _join(self, key: str, table: str, column: str, value: Any, event: str) -> bool:
+        """Open the filtered channel for key (caller holds the lock); on failure key stays pending."""
+        channel = None
+        try:
+            client = await self._ensure_client()
+            if not client:
+                return False  # Realtime not configured
+            channel = client.channel(f"hub:{key}")
+            channel.on_postgres_changes(
+                event=event,
+                schema="public",
+                table=table,
+                filter=f"{column}=eq.{value}",
+                callback=lambda payload, k=key: self._dispatch(k, payload)
+            )
+            await channel.subscribe()
+        except Exception as e:
+            log_error(f"REALTIME_HUB: Subscribe failed for {key}: {e}")
+            if channel is not None and self._client:
+                try:
+                    await self._client.remove_channel(channel)
+                except Exception:
+                    pass
+            self._pending[key] = (table, column, value, event)
+            self._schedule_retry()
+            return False
+        self._pending.pop(key, None)
+        self._channels[key] = channel
+        log_info(f"REALTIME_HUB: Subscribed {key} ({len(self._channels)} channels)")
+        return True
+
+    async def _join_pending(self):
+        for key, spec in list(self._pending.items()):
+            if not self._listeners.get(key):
+                self._pending.pop(key, None)  # Nobody waits for it anymore
+            elif key not in self._channels:
+                if not await self._join(key, *spec) and self._client is None:
+                    break  # No socket: the remaining keys wait for the next attempt
+
+    def _schedule_retry(self):
+        if self._retry_task is None or self._retry_task.done():
+            self._retry_task = asyncio.create_task(self._retry_pending())
+
+    async def _retry_pending(self):
+        delay = config.REALTIME_RETRY_MIN
+        while self._pending:
+            await asyncio.sleep(delay)
+            async with self._get_lock():
+                await self._join_pending()
+            delay = min(delay * 2, config.REALTIME_RETRY_MAX)
+
+    async def unsubscribe(self, token: Optional[int]):
+        """Drop one registration; the channel is left once nobody listens on it."""
+        key = self._token_keys.pop(token, None)
+        if key is None:
+            return
+        self._listeners.get(key, {}).pop(token, None)
+
+        async with self._get_lock():
+            if self._listeners.get(key):
+                return  # Another session still listens (or re-subscribed meanwhile)
+            self._listeners.pop(key, None)
+            self._pending.pop(key, None)
+            channel = self._channels.pop(key, None)
+            if not channel or not self._client:
+                return
+            try:
+                await self._client.remove_channel(channel)
+                log_info(f"REALTIME_HUB: Left {key} ({len(self._channels)} channels)")
+            except Exception as e:
+                log_error(f"REALTIME_HUB: Unsubscribe failed for {key}: {e}")
+            if not self._channels:
+                # Nobody is listening: release the socket until the next subscribe
+                try:
+                    await self._client.close()
+                except Exception:
+                    pass
+                self._client = None
+
+    def listener_count(self, key: str = None) -> int:
+        if key is not None:
+            return len(self._listeners.get(key, {}))
+        return len(self._token_keys)
+
+
+realtime_hub = RealtimeHub()
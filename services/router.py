@@ -1,5 +1,6 @@
 import flet as ft
 from utils.logger import log_error, log_info
+from services.poll_scheduler import poll_scheduler
 
 # View Imports
 # Importing here to map routes. 
@@ -134,6 +135,9 @@ class Router:
                 return
 
             log_info(f"Navigating to: {route} (Back: {is_back})")
+
+            # 0. Leaving the current route ends this page's background polls
+            poll_scheduler.cancel_owner(page)
             
             # 1. Cleanup Overlays
             await self.cleanup_overlays()
@@ -0,0 +1,218 @@
+"""
+Schedule Engine for The Manager
+Turns one store-month of labor contracts + work-schedule overrides into a Roster shared by the
+staff calendar (views/calendar_view.py) and payroll (services/payroll_engine.py).
+- Contract start/end dates are parsed once into the span of days the contract covers this month,
+  so per-day checks are integer comparisons instead of strptime() per day per contract.
+- Per-employee contract history (newest first) is grouped once.
+- Derived views (staff calendar events, payroll) are built once per Roster via derive(); cached
+  Rosters (services/schedule_service.py) hand the same results to every caller.
+"""
+import calendar as cal_mod
+import threading
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+TITLE_MARKERS = ("🟢", "❌", "⭐", "🔥")
+
+
+class MonthLayout(NamedTuple):
+    days: int
+    weekdays: Tuple[int, ...]                  # weekdays[d - 1] = weekday of day d
+    days_by_weekday: Tuple[Tuple[int, ...], ...]  # days_by_weekday[w] = days falling on weekday w
+
+
+@lru_cache(maxsize=64)
+def month_layout(year: int, month: int) -> MonthLayout:
+    first_weekday, days = cal_mod.monthrange(year, month)
+    weekdays = tuple((first_weekday + i) % 7 for i in range(days))
+    by_weekday = tuple(tuple(d for d in range(1, days + 1) if weekdays[d - 1] == w) for w in range(7))
+    return MonthLayout(days, weekdays, by_weekday)
+
+
+def scheduled_days(layout: MonthLayout, work_days) -> frozenset:
+    """Days of the month whose weekday is in the contract's work_days (same `in` test as before)."""
+    return frozenset(d for w in range(7) if w in work_days for d in layout.days_by_weekday[w])
+
+
+def parse_override(o: dict) -> Tuple[Optional[int], Optional[float]]:
+    """(day, worked hours) of a work-schedule event; None for the parts that do not parse."""
+    try:
+        day = int(o['start_date'].split('T')[0].split('-')[-1])
+    except (ValueError, IndexError, KeyError):
+        return None, None
+    try:
+        s_str = o['start_date'].split('T')[1][:5]
+        e_str = o['end_date'].split('T')[1][:5]
+        sh, sm = map(int, s_str.split(':'))
+        eh, em = map(int, e_str.split(':'))
+    except (ValueError, IndexError, KeyError):
+        return day, None
+    diff = (eh + em/60) - (sh + sm/60)
+    if diff < 0: diff += 24
+    return day, diff
+
+
+def event_employee_name(ev: dict, eid_to_name: Dict) -> str:
+    """Contract name for the event's employee_id, else the name parsed from its title."""
+    eid = ev.get('employee_id')
+    if eid and eid in eid_to_name: return eid_to_name[eid]
+    t = ev.get('title', '')
+    # Filter emojis
+    for emoji in TITLE_MARKERS:
+        t = t.replace(emoji, '')
+    return t.split('(')[0].split('결근')[0].strip() or "Unknown"
+
+
+def _parse_date(value):
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date() if value else None
+    except (TypeError, ValueError):
+        return None  # Invalid date format: no bound
+
+
+class ContractSpan(NamedTuple):
+    contract: dict
+    first_day: int  # First day of the month the contract is valid on (> days: starts later)
+    last_day: int   # Last valid day (0: ended before this month)
+
+    def covers(self, day: int) -> bool:
+        return self.first_day <= day <= self.last_day
+
+    @property
+    def ended(self) -> bool:
+        return self.last_day < 1
+
+
+def contract_span(contract: dict, year: int, month: int, days: int) -> ContractSpan:
+    sd = _parse_date(contract.get('contract_start_date'))
+    ed = _parse_date(contract.get('contract_end_date'))
+    first, last = 1, days
+    if sd and (sd.year, sd.month) >= (year, month):
+        first = sd.day if (sd.year, sd.month) == (year, month) else days + 1
+    if ed and (ed.year, ed.month) <= (year, month):
+        last = ed.day if (ed.year, ed.month) == (year, month) else 0
+    return ContractSpan(contract, first, last)
+
+
+class Roster:
+    """Contracts + work-schedule overrides of one store-month, parsed once."""
+    def __init__(self, year: int, month: int, contracts: List[dict], overrides: List[dict], key=None):
+        self.year = year
+        self.month = month
+        self.contracts = contracts
+        self.overrides = overrides
+        self.key = key  # Cache key (channel, year, month, version) or None when uncached
+        self.layout = month_layout(year, month)
+        self.eid_to_name = {c['id']: c.get('employee_name', 'Unknown').strip() for c in contracts}
+        # name -> [ContractSpan], newest contract first
+        self.histories: Dict[str, List[ContractSpan]] = {}
+        for c in sorted(contracts, key=lambda x: x.get('created_at', ''), reverse=True):
+            span = contract_span(c, year, month, self.layout.days)
+            self.histories.setdefault(c.get('employee_name', 'Unknown').strip(), []).append(span)
+        self._derived = {}
+        self._lock = threading.Lock()
+
+    def latest(self, name: str) -> Optional[ContractSpan]:
+        history = self.histories.get(name)
+        return history[0] if history else None
+
+    def derive(self, name: str, build):
+        """build(roster) once per Roster; later calls (any caller sharing this Roster) get the same result."""
+        with self._lock:
+            if name not in self._derived:
+                self._derived[name] = build(self)
+            return self._derived[name]
+
+
+def _orphan_name(title: str) -> Optional[str]:
+    # Strictly require a ledger emoji for orphaned entries (skip ghost/legacy data)
+    if '⭐' in title: return title.split('(')[0].replace('⭐', '').strip()
+    if '❌' in title: return title.replace('❌', '').replace('결근', '').strip()
+    if '🟢' in title: return title.split('(')[0].replace('🟢', '').strip()
+    if '🔥' in title: return title.split('(')[0].replace('🔥', '').strip()
+    return None
+
+
+def calendar_day_overrides(roster: Roster) -> Dict[str, Dict[int, dict]]:
+    """name -> day -> override; the latest created override wins when a day has several."""
+    result: Dict[str, Dict[int, dict]] = {}
+    for o in roster.overrides:
+        name = roster.eid_to_name.get(o.get('employee_id'))
+        if not name:
+            name = _orphan_name(o.get('title', ''))
+            if name is None: continue
+        days = result.setdefault(name.strip(), {})
+        try:
+            day = int(o['start_date'].split('T')[0].split('-')[-1])
+        except (ValueError, KeyError, IndexError, AttributeError):
+            continue  # Invalid date format
+        old_o = days.get(day)
+        if not old_o or (o.get('created_at', '') > old_o.get('created_at', '')):
+            days[day] = o
+    return result
+
+
+def staff_events(roster: Roster) -> List[dict]:
+    """Staff calendar entries: recorded overrides (green / red absence / blue off-contract) + orange contract baselines."""
+    year, month, layout = roster.year, roster.month, roster.layout
+    day_overrides = calendar_day_overrides(roster)
+    events = []
+
+    for name in sorted(set(roster.histories) | set(day_overrides)):
+        history = roster.histories.get(name, [])
+        overrides = day_overrides.get(name, {})
+
+        for day in range(1, layout.days + 1):
+            weekday = str(layout.weekdays[day - 1])
+            valid = [s.contract for s in history if s.covers(day)]
+
+            # A. Override (Actual)
+            o = overrides.get(day)
+            if o:
+                try:
+                    st = o['start_date'].split('T')[1][:5]
+                    et = o['end_date'].split('T')[1][:5]
+                except (KeyError, IndexError, AttributeError):
+                    st, et = "??", "??"
+                is_absence = (st == et == "00:00")
+
+                # Color by whether a valid contract schedules this weekday
+                final_color = o.get('color')
+                if not final_color:
+                    final_color = "green"
+                    if is_absence: final_color = "red"
+                    elif not any(weekday in (c.get('work_schedule') or {}) for c in valid): final_color = "blue"
+
+                events.append({
+                    "id": o['id'],
+                    "title": o.get('title', f"⭐ {name} ({st}~{et})"),
+                    "start_date": o['start_date'],
+                    "end_date": o['end_date'],
+                    "color": final_color,
+                    "is_virtual": False,
+                    "employee_id": o.get('employee_id'),  # Keep original eid link
+                    "employee_name": name,
+                    "memo": o.get('memo')
+                })
+
+            # B. Contract Default (Baseline): newest contract valid on the date
+            if valid:
+                c = valid[0]
+                ws = c.get('work_schedule') or {}
+                if weekday in ws:
+                    times = ws[weekday]
+                    start_t = times.get('start', '09:00')
+                    end_t = times.get('end', '18:00')
+                    events.append({
+                        "id": f"virtual_{c['id']}_{day}",
+                        "title": f"{name} ({start_t}~{end_t})",
+                        "start_date": f"{year}-{month:02d}-{day:02d}T{start_t}:00",
+                        "end_date": f"{year}-{month:02d}-{day:02d}T{end_t}:00",
+                        "color": "orange",
+                        "is_virtual": True,
+                        "employee_id": c['id'],
+                        "employee_name": name
+                    })
+    return events
@@ -0,0 +1,159 @@
+import asyncio
+import calendar as cal_mod
+from db import async_service_supabase
+from repositories.channel_repository import ChannelRepository
+from services.schedule_engine import Roster
+from utils.cache import schedule_cache, MISSING
+
+FETCH_PAGE_SIZE = 1000  # PostgREST max-rows; longer ranges are read page by page
+
+
+def month_range(start_month, end_month):
+    """[(year, month), ...] from start to end inclusive; months as (year, month) or "YYYY-MM"."""
+    def as_tuple(m):
+        if isinstance(m, str):
+            y, mo = m.split("-")[:2]
+            return int(y), int(mo)
+        return int(m[0]), int(m[1])
+
+    (y, m), end = as_tuple(start_month), as_tuple(end_month)
+    months = []
+    while (y, m) <= end:
+        months.append((y, m))
+        y, m = (y + 1, 1) if m == 12 else (y, m + 1)
+    return months
+
+
+class ScheduleService:
+    """
+    Loads labor contracts + work-schedule overrides as Rosters (services/schedule_engine.py).
+    One fetch per table for any set of stores x months; Rosters are cached per store-month under
+    the payroll_data_versions counters, so payroll and the staff calendar share fetch and parsing.
+    [SECURITY] The process-wide cache holds whole stores, read with the service client; each caller
+    gets a view scoped like the labor_contracts RLS policy (see _scoped).
+    """
+
+    async def _fetch_all(self, build_query):
+        rows, start = [], 0
+        while True:
+            res = await build_query().range(start, start + FETCH_PAGE_SIZE - 1).execute()
+            page = res.data or []
+            rows.extend(page)
+            if len(page) < FETCH_PAGE_SIZE:
+                return rows
+            start += FETCH_PAGE_SIZE
+
+    async def _fetch_versions(self, client, channel_ids, months):
+        """
+        {(str(channel_id), scope): version} from payroll_data_versions (one small query).
+        None when versions are unavailable (migration not applied) -> rosters are not cached.
+        """
+        scopes = ["contracts"] + [f"{y}-{m:02d}" for y, m in months]
+        try:
+            res = await (client.table("payroll_data_versions").select("channel_id, scope, version")
+                         .in_("channel_id", list(channel_ids)).in_("scope", scopes).execute())
+        except Exception as e:
+            print(f"Schedule version check unavailable: {e}")
+            return None
+        return {(str(r["channel_id"]), r["scope"]): r["version"] for r in res.data or []}
+
+    @staticmethod
+    def _cache_key(channel_id, year, month, versions):
+        if versions is None:
+            return None
+        cid = str(channel_id)
+        version = (versions.get((cid, "contracts"), 0), versions.get((cid, f"{year}-{month:02d}"), 0))
+        return (cid, year, month, version)
+
+    @staticmethod
+    def _scoped(roster, role, user_id):
+        """
+        The caller's view of a store Roster, as the RLS-scoped reads returned it: owners see every
+        contract, other members only their own (plus the store's work-schedule events), non-members nothing.
+        Scoped Rosters are cached next to the store Roster, so derive() results stay per caller.
+        """
+        if role == "owner":
+            return roster
+        if role:
+            contracts = [c for c in roster.contracts if str(c.get("user_id")) == str(user_id)]
+            overrides = roster.overrides
+        else:
+            contracts, overrides = [], []
+        if roster.key is None:
+            return Roster(roster.year, roster.month, contracts, overrides)
+        key = roster.key + ("member" if role else "none", str(user_id))
+        return schedule_cache.get_or_load(
+            key, lambda: Roster(roster.year, roster.month, contracts, overrides, key=key))
+
+    async def get_roster(self, channel_id, year, month, user_id):
+        rosters = await self.get_rosters([channel_id], (year, month), (year, month), user_id)
+        return rosters[channel_id][(year, month)]
+
+    async def get_rosters(self, channel_ids, start_month, end_month, user_id):
+        """{channel_id: {(year, month): Roster}} for several stores x months, as visible to user_id."""
+        months = month_range(start_month, end_month)
+        if not channel_ids or not months:
+            return {cid: {} for cid in channel_ids}
+        rosters, roles = await asyncio.gather(
+            self._get_store_rosters(list(channel_ids), months),
+            asyncio.to_thread(lambda: {cid: ChannelRepository.get_member_role(cid, user_id) for cid in channel_ids}),
+        )
+        return {cid: {ym: self._scoped(roster, roles.get(cid), user_id) for ym, roster in by_month.items()}
+                for cid, by_month in rosters.items()}
+
+    async def _get_store_rosters(self, ids, months):
+        """Unscoped store Rosters (service client); only these go into the shared cache under the store key."""
+        client = async_service_supabase
+
+        # [OPTIMIZATION] Versions first (before any data read), then serve unchanged store-months from cache
+        versions = await self._fetch_versions(client, ids, months)
+        results = {cid: {} for cid in ids}
+        todo = []
+        for cid in ids:
+            for y, m in months:
+                key = self._cache_key(cid, y, m, versions)
+                cached = schedule_cache.get(key) if key else MISSING
+                if cached is MISSING:
+                    todo.append((cid, y, m, key))
+                else:
+                    results[cid][(y, m)] = cached
+        if not todo:
+            return results
+
+        # Fetch Contracts + Overrides (Work Schedules) for the stale stores / months in parallel
+        ids = list(dict.fromkeys(cid for cid, _, _, _ in todo))
+        months = month_range(min((y, m) for _, y, m, _ in todo), max((y, m) for _, y, m, _ in todo))
+        (y0, m0), (y1, m1) = months[0], months[-1]
+        start_iso = f"{y0}-{m0:02d}-01T00:00:00"
+        end_iso = f"{y1}-{m1:02d}-{cal_mod.monthrange(y1, m1)[1]}T23:59:59"
+        contracts, overrides = await asyncio.gather(
+            self._fetch_all(lambda: client.table("labor_contracts").select("*")
+                            .in_("channel_id", ids).order("id")),
+            self._fetch_all(lambda: client.table("calendar_events").select("*")
+                            .eq("is_work_schedule", True)
+                            .gte("start_date", start_iso)
+                            .lte("start_date", end_iso)
+                            .in_("channel_id", ids).order("id")),
+        )
+
+        # Partition in memory: contracts by store, overrides by (store, year, month)
+        store_contracts = {str(cid): [] for cid in ids}
+        for c in contracts:
+            store_contracts.setdefault(str(c.get("channel_id")), []).append(c)
+        month_overrides = {}
+        for o in overrides:
+            try:
+                key = (str(o.get("channel_id")), int(o["start_date"][:4]), int(o["start_date"][5:7]))
+            except (KeyError, TypeError, ValueError):
+                continue  # Invalid date format
+            month_overrides.setdefault(key, []).append(o)
+
+        for cid, y, m, key in todo:
+            roster = Roster(y, m, store_contracts[str(cid)], month_overrides.get((str(cid), y, m), []), key=key)
+            results[cid][(y, m)] = roster
+            if key:
+                schedule_cache.set(key, roster)
+        return results
+
+
+schedule_service = ScheduleService()
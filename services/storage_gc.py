@@ -0,0 +1,127 @@
+"""
+Storage Garbage Collector for The Manager
+Deleting topics/messages/memos cascades in the database but leaves their Storage objects behind.
+collect_garbage() is a mark-and-sweep over the media buckets:
+- mark: every object URL still stored in chat_messages (image/thumb/preview) and voice_memos (audio);
+- sweep: list each bucket page by page and delete unreferenced objects in bounded batches.
+Objects younger than STORAGE_GC_MIN_AGE_HOURS are kept (uploaded but not yet sent).
+"""
+import re
+import urllib.parse
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from config import config
+from repositories.storage_repository import StorageRepository
+from utils.logger import log_error, log_info
+
+GC_BUCKETS = ("uploads", "chat-uploads")
+
+# (table, columns) whose values are Storage object URLs
+REFERENCE_SOURCES = (
+    ("chat_messages", ("image_url", "thumb_url", "preview_url")),
+    ("voice_memos", ("audio_url",)),
+)
+
+_OBJECT_URL = re.compile(r"/object/(?:public|sign|authenticated)/([^/]+)/([^?#]+)")
+
+
+def path_from_url(url: str) -> Optional[Tuple[str, str]]:
+    """(bucket, path) of a public or signed Storage URL; None for anything else."""
+    match = _OBJECT_URL.search(url or "")
+    if not match:
+        return None
+    return match.group(1), urllib.parse.unquote(match.group(2))
+
+
+def mark_referenced() -> Dict[str, Set[str]]:
+    """{bucket: {path}} of every object some row still points at."""
+    refs: Dict[str, Set[str]] = {}
+    for table, columns in REFERENCE_SOURCES:
+        for url in StorageRepository.iter_column_values(table, columns):
+            parsed = path_from_url(url)
+            if parsed:
+                refs.setdefault(parsed[0], set()).add(parsed[1])
+    return refs
+
+
+def _is_old_enough(item: dict, cutoff: datetime) -> bool:
+    stamp = item.get("created_at") or item.get("updated_at")
+    try:
+        created = datetime.fromisoformat(stamp.replace("Z", "+00:00"))
+    except (AttributeError, ValueError):
+        return False  # Unknown age: keep
+    return created < cutoff
+
+
+def _still_referenced(bucket: str, paths: Iterable[str]) -> Set[str]:
+    """Re-check a batch right before deleting (a dedup hit may have reused an object since mark)."""
+    by_url = {StorageRepository.get_public_url(bucket, p): p for p in paths}
+    hits = set()
+    for table, columns in REFERENCE_SOURCES:
+        for col in columns:
+            hits |= StorageRepository.find_referencing_values(table, col, by_url.keys())
+    return {by_url[u] for u in hits}
+
+
+def _sweep_batch(bucket: str, batch: List[dict], report: dict, dry_run: bool):
+    paths = [item["path"] for item in batch]
+    if not dry_run:
+        # Drop index rows first so no new message can pick these objects up via dedup
+        StorageRepository.forget_paths(bucket, paths)
+        keep = _still_referenced(bucket, paths)
+        batch = [item for item in batch if item["path"] not in keep]
+        if batch:
+            StorageRepository.remove_files(bucket, [item["path"] for item in batch])
+    report["deleted"] += len(batch)
+    report["reclaimed_bytes"] += sum((item.get("metadata") or {}).get("size") or 0 for item in batch)
+
+
+def sweep_bucket(bucket: str, referenced: Set[str], batch_size: int = None, max_batches: int = None,
+                 min_age_hours: int = None, dry_run: bool = False) -> dict:
+    """Delete unreferenced objects of one bucket, batch_size at a time (at most max_batches per run)."""
+    batch_size = batch_size or config.STORAGE_REMOVE_BATCH_SIZE
+    age = config.STORAGE_GC_MIN_AGE_HOURS if min_age_hours is None else min_age_hours
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=age)
+    report = {"bucket": bucket, "scanned": 0, "orphans": 0, "deleted": 0, "reclaimed_bytes": 0, "errors": 0}
+
+    # Scan fully before deleting: removing objects mid-listing would shift the offset pages
+    orphans = []
+    for item in StorageRepository.iter_objects(bucket):
+        report["scanned"] += 1
+        if item["path"] not in referenced and _is_old_enough(item, cutoff):
+            orphans.append(item)
+    report["orphans"] = len(orphans)
+
+    for n, i in enumerate(range(0, len(orphans), batch_size)):
+        if max_batches and n >= max_batches:
+            break  # The rest is picked up by the next run
+        try:
+            _sweep_batch(bucket, orphans[i:i + batch_size], report, dry_run)
+        except Exception as e:
+            report["errors"] += 1
+            log_error(f"STORAGE_GC: {bucket} batch failed: {e}")
+    return report
+
+
+def collect_garbage(buckets: Iterable[str] = GC_BUCKETS, batch_size: int = None, max_batches: int = None,
+                    min_age_hours: int = None, dry_run: bool = False) -> List[dict]:
+    """Mark-and-sweep the media buckets; returns one report per bucket (deleted / reclaimed_bytes)."""
+    try:
+        referenced = mark_referenced()
+    except Exception as e:
+        log_error(f"STORAGE_GC: mark phase failed, nothing deleted: {e}")
+        return []
+
+    reports = []
+    for bucket in buckets:
+        try:
+            report = sweep_bucket(bucket, referenced.get(bucket, set()), batch_size, max_batches,
+                                  min_age_hours, dry_run)
+        except Exception as e:
+            log_error(f"STORAGE_GC: sweep of {bucket} failed: {e}")
+            continue
+        reports.append(report)
+        log_info(f"STORAGE_GC: {bucket}{' (dry run)' if dry_run else ''}: {report['deleted']}/{report['scanned']} "
+                 f"objects, {report['reclaimed_bytes'] / (1024 * 1024):.1f}MB reclaimed")
+    return reports
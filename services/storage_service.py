@@ -1,21 +1,152 @@
 import os
+import asyncio
+import hashlib
 from repositories.storage_repository import StorageRepository
+from services.media_worker import media_worker
+from services.compression_service import discard_temp
+from config import config
 import flet as ft
 from utils.logger import log_info, log_error
 
 # [PROFESSIONAL] Refactored to use Repository Pattern
 
-def handle_file_upload(is_web: bool, file_obj, status_callback=None, picker_ref: ft.FilePicker=None):
+def new_storage_name(file_name: str) -> str:
+    import uuid
+    ext = os.path.splitext(file_name)[1] if file_name else ""
+    return f"{uuid.uuid4()}{ext or '.bin'}"
+
+def _compress_reporter(status_callback):
+    if not status_callback:
+        return None
+    return lambda fraction: status_callback(f"2/4. 최적화 진행 중... {int(fraction * 100)}%")
+
+def _progress_reporter(status_callback):
+    """Adapt (sent, total) byte progress to the status text callback."""
+    if not status_callback:
+        return None
+    def report(sent, total):
+        if total:
+            status_callback(f"3/4. 보안 서버로 전송 중... {int(sent * 100 / total)}%")
+    return report
+
+def file_digest(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """Streaming SHA-256 of a local file (hex)."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def _find_duplicate(local_path: str):
+    """
+    (digest, media) for a file; media is the stored media dict (plus the existing object's
+    storage_name) when identical content was uploaded before, else None.
+    Lookup failures just mean "upload normally".
+    """
+    try:
+        digest = file_digest(local_path)
+    except OSError as e:
+        log_error(f"Digest failed for {local_path}: {e}")
+        return None, None
+    try:
+        row = StorageRepository.find_by_digest("uploads", digest)
+    except Exception as e:
+        log_error(f"Content index lookup failed: {e}")
+        return digest, None
+    if not row:
+        return digest, None
+    log_info(f"Dedup hit {digest[:12]}: reusing {row['path']}")
+    return digest, {
+        "public_url": row.get("public_url"),
+        "thumb_url": row.get("thumb_url"),
+        "preview_url": row.get("preview_url"),
+        "storage_name": row["path"],
+    }
+
+def _remember_digest(digest, storage_name: str, size: int, media: dict):
+    if not digest or not media.get("public_url"):
+        return
+    try:
+        StorageRepository.record_digest("uploads", digest, storage_name, size, media)
+    except Exception as e:
+        log_error(f"Content index write failed: {e}")  # Next identical upload is simply stored again
+
+def _derivative_name(storage_name: str, kind: str) -> str:
+    return f"{os.path.splitext(storage_name)[0]}_{kind}.webp"
+
+def _upload_processed(job, storage_name: str, status_callback=None) -> dict:
+    """
+    Upload a finished media job: the compressed original plus any WebP derivatives.
+    Returns {"public_url", "thumb_url", "preview_url"} (derivative URLs are None for non-images).
+    """
+    final_path = job.result()
+    media = {"public_url": None, "thumb_url": None, "preview_url": None}
+    if status_callback: status_callback("3/4. 보안 서버로 전송 중...")
+    try:
+        # [OPTIMIZATION] Streamed in bounded chunks; large files go through the resumable endpoint
+        StorageRepository.upload_local_file(
+            "uploads", storage_name, final_path,
+            progress_callback=_progress_reporter(status_callback)
+        )
+        media["public_url"] = StorageRepository.get_public_url("uploads", storage_name)
+
+        # [OPTIMIZATION] Small WebP renditions so bubbles/viewers never fetch the original
+        for kind, path in job.derivatives.items():
+            try:
+                name = _derivative_name(storage_name, kind)
+                StorageRepository.upload_local_file("uploads", name, path, "image/webp")
+                media[f"{kind}_url"] = StorageRepository.get_public_url("uploads", name)
+            except Exception as e:
+                log_error(f"Derivative upload failed ({kind}): {e}")  # Bubble falls back to the original
+    finally:
+        discard_temp(final_path, job.source_path)
+        for path in job.derivatives.values():
+            discard_temp(path, job.source_path)
+    return media
+
+async def process_and_upload(file_path: str, storage_name: str, status_callback=None) -> dict:
+    """
+    Compress a local file on the media worker pool, then upload it with its derivatives.
+    Returns the media dict of _upload_processed. Cancelling the awaiting task cancels the job.
+    [OPTIMIZATION] Content already in Storage (same SHA-256) is reused: no compression, no transfer.
+    """
+    digest, media = await asyncio.to_thread(_find_duplicate, file_path)
+    if media:
+        return media
+    job = media_worker.submit(file_path, progress_callback=_compress_reporter(status_callback), derivatives=True)
+    await job.wait()
+    media = await asyncio.to_thread(_upload_processed, job, storage_name, status_callback)
+    await asyncio.to_thread(_remember_digest, digest, storage_name, os.path.getsize(file_path), media)
+    return media
+
+def use_direct_upload(file_obj) -> bool:
+    size = getattr(file_obj, "size", None) or 0
+    return config.DIRECT_UPLOAD_ENABLED and size >= config.DIRECT_UPLOAD_MIN_BYTES
+
+def handle_file_upload(is_web: bool, file_obj, status_callback=None, picker_ref: ft.FilePicker=None,
+                       allow_direct: bool = False):
     """
     Handles file upload for both Web and Native.
+    allow_direct: the caller handles "direct_upload_triggered" (waits for the picker's on_upload
+    completion before using public_url).
     """
     try:
-        import uuid
-        ext = os.path.splitext(file_obj.name)[1] if file_obj.name else ""
-        storage_name = f"{uuid.uuid4()}{ext or '.bin'}"
+        storage_name = new_storage_name(file_obj.name)
         
         if status_callback: status_callback("1/4. 업로드 준비 중...")
         
+        if is_web and allow_direct and picker_ref and use_direct_upload(file_obj):
+            # [OPTIMIZATION] Browser PUTs straight to Storage; the server only records the path
+            signed_url = StorageRepository.create_signed_upload_url("uploads", storage_name, config.PROXY_UPLOAD_TIMEOUT)
+            if signed_url:
+                picker_ref.upload(files=[ft.FilePickerUploadFile(name=file_obj.name, upload_url=signed_url, method="PUT")])
+                return {
+                    "type": "direct_upload_triggered",
+                    "storage_name": storage_name,
+                    "public_url": StorageRepository.get_public_url("uploads", storage_name),
+                }
+            log_info("Direct upload signing failed; falling back to server proxy")
+
         if is_web:
             # Web Proxy Upload logic (stays in service for now as it involves Flet picker)
             upload_url = picker_ref.page.get_upload_url(storage_name, 600)
@@ -30,35 +161,35 @@ def handle_file_upload(is_web: bool, file_obj, status_callback=None, picker_ref:
         else:
             # Native / Desktop
             if status_callback: status_callback("2/4. 최적화 진행 중...")
-            from services.compression_service import compress_file
-            final_path = compress_file(file_obj.path)
-            
-            if status_callback: status_callback("3/4. 보안 서버로 전송 중...")
-            with open(final_path, "rb") as f:
-                import mimetypes
-                ctype = mimetypes.guess_type(final_path)[0] or "application/octet-stream"
-                StorageRepository.upload_file("uploads", storage_name, f.read(), ctype)
-
-            final_url = StorageRepository.get_public_url("uploads", storage_name)
-            return {"type": "native_url", "public_url": final_url, "storage_name": storage_name}
+            # [OPTIMIZATION] Compression runs on the bounded media worker pool (timeout / cancellable)
+            digest, media = _find_duplicate(file_obj.path)
+            if media:
+                storage_name = media["storage_name"]  # The reused object, not the never-uploaded fresh name
+            else:
+                job = media_worker.submit(file_obj.path, progress_callback=_compress_reporter(status_callback), derivatives=True)
+                media = _upload_processed(job, storage_name, status_callback)
+                _remember_digest(digest, storage_name, os.path.getsize(file_obj.path), media)
+            return {"type": "native_url", "storage_name": storage_name, **media}
 
     except Exception as ex:
         log_error(f"Upload Handle Error: {ex}")
         if status_callback: status_callback(f"오류 발생: {ex}")
         return {"type": "error", "error": str(ex)}
 
-def upload_proxy_file_to_supabase(storage_name: str) -> str:
-    """Post-proxy upload processing."""
+def upload_proxy_file_to_supabase(storage_name: str) -> dict:
+    """Post-proxy upload processing: compress, render derivatives, upload. Returns the media dict."""
     local_path = os.path.join("uploads", storage_name)
     if not os.path.exists(local_path): raise Exception(f"File Not Found: {local_path}")
             
     try:
-        with open(local_path, "rb") as f:
-            import mimetypes
-            ctype = mimetypes.guess_type(local_path)[0] or "application/octet-stream"
-            StorageRepository.upload_file("uploads", storage_name, f.read(), ctype)
-        
-        return StorageRepository.get_public_url("uploads", storage_name)
+        digest, media = _find_duplicate(local_path)
+        if media:
+            return media
+        size = os.path.getsize(local_path)
+        job = media_worker.submit(local_path, derivatives=True)
+        media = _upload_processed(job, storage_name)
+        _remember_digest(digest, storage_name, size, media)
+        return media
     except Exception as e:
         log_error(f"Storage Service Error: {e}")
         raise e
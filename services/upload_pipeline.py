@@ -0,0 +1,132 @@
+"""
+Upload Completion Pipeline for The Manager
+Web uploads land in Flet's upload_dir ("uploads/") first. Instead of each view polling the
+directory, views register the storage name they expect and await a future:
+- completion is signalled by the FilePicker on_upload event (progress == 1.0) and/or by a
+  watchfiles notification for the file, whichever arrives first;
+- a small set of consumers pushes each finished file to Storage
+  (storage_service.upload_proxy_file_to_supabase) and resolves the waiter with the media dict.
+"""
+import asyncio
+import os
+from typing import Dict, Optional
+
+from config import config
+from services import storage_service
+from utils.logger import log_error, log_info
+
+try:
+    from watchfiles import awatch, Change
+except ImportError:  # Event-only mode: completion comes from on_upload events
+    awatch = None
+    Change = None
+
+
+class _Expected:
+    def __init__(self, size: Optional[int], future: asyncio.Future):
+        self.size = size
+        self.future = future
+        self.queued = False
+
+
+class UploadPipeline:
+    def __init__(self, upload_dir: str = "uploads", workers: int = 2):
+        self.upload_dir = upload_dir
+        self.workers = workers
+        self._expected: Dict[str, _Expected] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._consumers = []
+        self._watch_task: Optional[asyncio.Task] = None
+        self._stop_watch: Optional[asyncio.Event] = None
+
+    def expect(self, storage_name: str, size: Optional[int] = None) -> asyncio.Future:
+        """
+        Register an upload that Flet will write to upload_dir/storage_name.
+        The returned future resolves to storage_service's media dict once it is in Storage.
+        """
+        self._ensure_running()
+        future = asyncio.get_running_loop().create_future()
+        self._expected[storage_name] = _Expected(size, future)
+        # The file may already be complete (fast upload before registration)
+        self._try_enqueue(storage_name)
+        return future
+
+    def forget(self, storage_name: str):
+        """Stop waiting for an upload (timeout / user cancelled)."""
+        entry = self._expected.pop(storage_name, None)
+        if entry and not entry.future.done():
+            entry.future.cancel()
+        self._maybe_stop_watch()
+
+    def notify_uploaded(self, storage_name: str):
+        """Upload event from the browser (progress == 1.0) for this file."""
+        self._try_enqueue(storage_name)
+
+    def pending(self) -> int:
+        return len(self._expected)
+
+    # --- internals -------------------------------------------------------
+
+    def _is_complete(self, storage_name: str, entry: _Expected) -> bool:
+        path = os.path.join(self.upload_dir, storage_name)
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return False
+        return size > 0 and (entry.size is None or size >= entry.size)
+
+    def _try_enqueue(self, storage_name: str):
+        entry = self._expected.get(storage_name)
+        if not entry or entry.queued or not self._is_complete(storage_name, entry):
+            return
+        entry.queued = True
+        self._queue.put_nowait(storage_name)
+
+    def _ensure_running(self):
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        self._consumers = [t for t in self._consumers if not t.done()]
+        while len(self._consumers) < self.workers:
+            self._consumers.append(asyncio.create_task(self._consume()))
+        if awatch and (self._watch_task is None or self._watch_task.done()):
+            self._stop_watch = asyncio.Event()
+            self._watch_task = asyncio.create_task(self._watch(self._stop_watch))
+
+    def _maybe_stop_watch(self):
+        if not self._expected and self._stop_watch:
+            self._stop_watch.set()  # awatch returns; restarted by the next expect()
+
+    async def _watch(self, stop_event: asyncio.Event):
+        os.makedirs(self.upload_dir, exist_ok=True)
+        log_info(f"UPLOAD_PIPELINE: Watching {self.upload_dir}/")
+        try:
+            # Debounced inotify/FSEvents batches: a batch means writes to the file have settled
+            async for changes in awatch(self.upload_dir, stop_event=stop_event, recursive=False):
+                for change, path in changes:
+                    if change != Change.deleted:
+                        self._try_enqueue(os.path.basename(path))
+        except Exception as e:
+            log_error(f"UPLOAD_PIPELINE: watcher stopped: {e}")
+
+    async def _consume(self):
+        while True:
+            storage_name = await self._queue.get()
+            entry = self._expected.get(storage_name)
+            try:
+                if not entry or entry.future.done():
+                    continue
+                media = await asyncio.to_thread(storage_service.upload_proxy_file_to_supabase, storage_name)
+                if not entry.future.done():
+                    entry.future.set_result(media)
+            except Exception as e:
+                log_error(f"UPLOAD_PIPELINE: {storage_name} failed: {e}")
+                if entry and not entry.future.done():
+                    entry.future.set_exception(e)
+            finally:
+                if self._expected.get(storage_name) is entry:
+                    self._expected.pop(storage_name, None)
+                self._maybe_stop_watch()
+                self._queue.task_done()
+
+
+upload_pipeline = UploadPipeline("uploads", workers=config.UPLOAD_PIPELINE_WORKERS)
@@ -1,6 +1,6 @@
 import asyncio
 from typing import List, Dict, Any
-from db import service_supabase, log_info
+from db import async_service_supabase, log_info
 from datetime import datetime, timedelta, timezone
 from utils.logger import log_error
 
@@ -10,15 +10,15 @@ class VoiceService:
         Fetch memos for a user in a specific channel context.
         """
         try:
-            query = service_supabase.table("voice_memos").select("*, profiles:user_id(full_name)")
+            query = async_service_supabase.table("voice_memos").select("*, profiles:user_id(full_name)")
 
             if channel_id:
                 # Syntax: (user_id=me & is_private=true) OR (channel_id=curr & is_private=false)
                 or_filter = f"and(user_id.eq.{user_id},is_private.eq.true),and(channel_id.eq.{channel_id},is_private.eq.false)"
-                res = await asyncio.to_thread(lambda: query.or_(or_filter).order("created_at", desc=True).execute())
+                res = await query.or_(or_filter).order("created_at", desc=True).execute()
             else:
                 # No channel context? Just show my private ones?
-                res = await asyncio.to_thread(lambda: query.eq("user_id", user_id).eq("is_private", True).order("created_at", desc=True).execute())
+                res = await query.eq("user_id", user_id).eq("is_private", True).order("created_at", desc=True).execute()
 
             return res.data or []
         except Exception as e:
@@ -32,7 +32,7 @@ class VoiceService:
             tier = "free"
             if channel_id:
                 try:
-                    ch_res = await asyncio.to_thread(lambda: service_supabase.table("channels").select("subscription_tier").eq("id", channel_id).execute())
+                    ch_res = await async_service_supabase.table("channels").select("subscription_tier").eq("id", channel_id).execute()
                     if not ch_res.data:
                         raise Exception("채널 정보를 찾을 수 없습니다.")
                     tier = ch_res.data[0].get("subscription_tier", "free")
@@ -69,7 +69,7 @@ class VoiceService:
                 "audio_expires_at": audio_exp,
                 "text_expires_at": text_exp
             }
-            res = await asyncio.to_thread(lambda: service_supabase.table("voice_memos").insert(data).execute())
+            res = await async_service_supabase.table("voice_memos").insert(data).execute()
             if res.data:
                 return res.data[0]
             return None
@@ -80,7 +80,7 @@ class VoiceService:
     async def _verify_ownership(self, memo_id: str, user_id: str) -> bool:
         """[SECURITY] Verify user owns the memo."""
         try:
-            check = await asyncio.to_thread(lambda: service_supabase.table("voice_memos").select("user_id").eq("id", memo_id).execute())
+            check = await async_service_supabase.table("voice_memos").select("user_id").eq("id", memo_id).execute()
             if not check.data or check.data[0].get("user_id") != user_id:
                 raise PermissionError("본인이 작성한 음성 메모만 삭제할 수 있습니다.")
             return True # Ownership verified
@@ -93,7 +93,7 @@ class VoiceService:
         if not await self._verify_ownership(memo_id, user_id):
             raise PermissionError("메모 삭제 권한이 없습니다.")
 
-        await asyncio.to_thread(lambda: service_supabase.table("voice_memos").delete().eq("id", memo_id).execute())
+        await async_service_supabase.table("voice_memos").delete().eq("id", memo_id).execute()
 
     async def share_memo(self, memo_id: str, user_id: str, target: str = None):
         """Share (Publish) a private memo to Channel Public with ownership verification."""
@@ -101,7 +101,7 @@ class VoiceService:
         if not await self._verify_ownership(memo_id, user_id):
             raise PermissionError("메모 공유 권한이 없습니다.")
 
-        await asyncio.to_thread(lambda: service_supabase.table("voice_memos").update({"is_private": False}).eq("id", memo_id).execute())
+        await async_service_supabase.table("voice_memos").update({"is_private": False}).eq("id", memo_id).execute()
 
     async def update_audio_url(self, memo_id: str, url: str, user_id: str):
         """Update audio URL with ownership verification."""
@@ -109,7 +109,7 @@ class VoiceService:
         if not await self._verify_ownership(memo_id, user_id):
             raise PermissionError("메모 수정 권한이 없습니다.")
 
-        await asyncio.to_thread(lambda: service_supabase.table("voice_memos").update({"audio_url": url}).eq("id", memo_id).execute())
+        await async_service_supabase.table("voice_memos").update({"audio_url": url}).eq("id", memo_id).execute()
 
     async def cleanup_expired_memos(self):
         """
@@ -122,7 +122,7 @@ class VoiceService:
 
             # 1. Expired Audio Cleanup
             # Fetch expired audio memos
-            exp_audios = await asyncio.to_thread(lambda: service_supabase.table("voice_memos").select("id, audio_url").neq("audio_url", "null").lt("audio_expires_at", today_iso).execute())
+            exp_audios = await async_service_supabase.table("voice_memos").select("id, audio_url").neq("audio_url", "null").lt("audio_expires_at", today_iso).execute()
 
             if exp_audios.data:
                 paths_to_remove = []
@@ -140,20 +140,20 @@ class VoiceService:
                             log_info(f"Path parse warning: {parse_err}")
 
                 if paths_to_remove:
-                    from services.chat_service import service_supabase as storage_client  # Reuse admin client for storage
+                    from db import service_supabase as storage_client  # Reuse admin client for storage
                     try:
                         # storage.remove expects list of paths
                         await asyncio.to_thread(lambda: storage_client.storage.from_("chat-uploads").remove(paths_to_remove))
                         log_info(f"Cleaned up {len(paths_to_remove)} expired audio files.")
 
                         # Update DB to null
-                        await asyncio.to_thread(lambda: service_supabase.table("voice_memos").update({"audio_url": None}).in_("id", ids_to_update).execute())
+                        await async_service_supabase.table("voice_memos").update({"audio_url": None}).in_("id", ids_to_update).execute()
                     except Exception as stor_err:
                         log_error(f"Storage Cleanup Error: {stor_err}")
 
             # 2. Expired Record Cleanup
             # Delete rows where text_expires_at < NOW
-            await asyncio.to_thread(lambda: service_supabase.table("voice_memos").delete().lt("text_expires_at", today_iso).execute())
+            await async_service_supabase.table("voice_memos").delete().lt("text_expires_at", today_iso).execute()
 
         except Exception as e:
             log_error(f"Cleanup Error: {e}")
@@ -0,0 +1,94 @@
+from unittest.mock import MagicMock, patch
+
+from repositories.channel_repository import ChannelRepository
+from utils import cache
+from utils.cache import TTLCache
+
+
+def test_ttl_expiry_and_lru_eviction():
+    c = TTLCache("t", ttl=60, maxsize=2)
+    c.set("a", 1)
+    c.set("b", 2)
+    assert c.get("a") == 1          # "a" is now most recently used
+    c.set("c", 3)                   # evicts "b"
+    assert not c.contains("b")
+    assert c.get("a") == 1 and c.get("c") == 3
+
+    with patch("utils.cache.time.monotonic", return_value=10**9):
+        assert c.get("a") is cache.MISSING
+
+    stats = c.stats()
+    assert stats["evictions"] == 1
+    assert stats["hits"] == 3 and stats["misses"] == 2
+
+
+def test_get_or_load_caches_none_but_not_exceptions():
+    c = TTLCache("t", ttl=60)
+    loader = MagicMock(return_value=None)
+    assert c.get_or_load("k", loader) is None
+    assert c.get_or_load("k", loader) is None
+    loader.assert_called_once()
+
+    failing = MagicMock(side_effect=RuntimeError("boom"))
+    for _ in range(2):
+        try:
+            c.get_or_load("x", failing)
+        except RuntimeError:
+            pass
+    assert failing.call_count == 2
+
+
+def test_member_role_is_read_through_and_invalidated_by_writes():
+    cache.role_cache.clear()
+    db = MagicMock()
+    query = db.table.return_value.select.return_value.eq.return_value.eq.return_value.limit.return_value
+    query.execute.return_value = MagicMock(data=[{"role": "staff"}])
+
+    with patch("repositories.channel_repository.service_supabase", db):
+        assert ChannelRepository.get_member_role(7, "u1") == "staff"
+        assert ChannelRepository.get_member_role("7", "u1") == "staff"  # Same key for int/str ids
+        assert query.execute.call_count == 1
+
+        ChannelRepository.update_member_role(7, "u1", "manager")
+        query.execute.return_value = MagicMock(data=[{"role": "manager"}])
+        assert ChannelRepository.get_member_role(7, "u1") == "manager"
+        assert query.execute.call_count == 2
+
+
+def test_realtime_payload_invalidates_matching_entries():
+    cache.role_cache.set(cache.role_key(7, "u1"), "staff")
+    cache.role_cache.set(cache.role_key(8, "u1"), "owner")
+    cache.category_cache.set("7", [{"id": 1}])
+
+    cache.invalidate_for_change({"data": {"table": "channel_members", "record": {"channel_id": 7, "user_id": "u1"}}})
+    cache.invalidate_for_change({"data": {"table": "chat_categories", "record": {"channel_id": 7}}})
+
+    assert not cache.role_cache.contains(cache.role_key(7, "u1"))
+    assert cache.role_cache.get(cache.role_key(8, "u1")) == "owner"
+    assert not cache.category_cache.contains("7")
+
+
+def test_cached_categories_are_copies_and_duplicate_memberships_are_not_resolved():
+    from repositories.chat_repository import ChatRepository
+
+    cache.category_cache.clear()
+    cache.role_cache.clear()
+    db = MagicMock()
+    cats = db.table.return_value.select.return_value.eq.return_value.order.return_value
+    cats.execute.return_value = MagicMock(data=[{"id": 1, "name": "A"}])
+    roles = db.table.return_value.select.return_value.eq.return_value.eq.return_value.limit.return_value
+    roles.execute.return_value = MagicMock(data=[{"role": "staff"}, {"role": "owner"}])
+
+    with patch("repositories.chat_repository.service_supabase", db), \
+         patch("repositories.channel_repository.service_supabase", db):
+        ChatRepository.get_categories(7)[0]["name"] = "mutated"
+        assert ChatRepository.get_categories(7) == [{"id": 1, "name": "A"}]
+        assert cats.execute.call_count == 1
+
+        assert ChannelRepository.get_member_role(7, "u1") is None
+        try:
+            ChatRepository.get_channel_member_role(7, "u1")
+            assert False, "duplicate membership must not resolve to a role"
+        except ValueError:
+            pass
+        assert not cache.role_cache.contains(cache.role_key(7, "u1"))
@@ -0,0 +1,45 @@
+import asyncio
+from unittest.mock import patch
+
+from services import calendar_service
+
+
+class _Query:
+    """Records the PostgREST filter chain and serves pages of `rows`."""
+    def __init__(self, rows, calls):
+        self.rows, self.calls, self.page = rows, calls, None
+
+    def __getattr__(self, name):
+        def method(*args, **kwargs):
+            self.calls.append((name, args))
+            if name == "range":
+                self.page = self.rows[args[0]:args[1] + 1]
+            return self
+        return method
+
+    async def execute(self):
+        return type("Res", (), {"data": self.page})()
+
+
+class _Client:
+    def __init__(self, rows):
+        self.rows, self.calls = rows, []
+
+    def from_(self, table):
+        return _Query(self.rows, self.calls)
+
+
+def test_month_events_query_month_window_and_page_past_row_cap():
+    rows = [{"id": i} for i in range(5)]
+    client = _Client(rows)
+    with patch.object(calendar_service, "FETCH_PAGE_SIZE", 2), \
+         patch.object(calendar_service, "async_service_supabase", client), \
+         patch("services.auth_service.auth_service.get_auth_headers", return_value=None):
+        events = asyncio.run(calendar_service.get_month_events("user-a", 7, 2024, 2))
+
+    assert events == rows  # 3 pages, no 500-row cap
+    assert [args for name, args in client.calls if name == "range"] == [(0, 1), (2, 3), (4, 5)]
+    # Overlap with February: multi-day events that began in January are included
+    assert ("lte", ("start_date", "2024-02-29T23:59:59")) in client.calls
+    assert ("gte", ("end_date", "2024-02-01T00:00:00")) in client.calls
+    assert ("eq", ("channel_id", 7)) in client.calls
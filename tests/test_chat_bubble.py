@@ -0,0 +1,39 @@
+from views.components import chat_bubble
+from views.components.chat_bubble import BubbleFactory
+
+
+def _msg(i, user="u1", **extra):
+    return {"id": i, "user_id": user, "content": f"m{i}", "created_at": "2024-05-01T14:05:00+09:00", **extra}
+
+
+def test_factory_reuses_bubbles_and_toggles_selection_in_place():
+    factory = BubbleFactory("u1")
+    msg = _msg(1)
+    bubble = factory.get(msg)
+    assert not bubble.selection_ctrl.visible and bubble.gesture.on_tap is None
+
+    selecting = factory.get(dict(msg), selection_mode=True)  # Refetched row, same content
+    assert selecting is bubble
+    assert bubble.selection_ctrl.visible and bubble.gesture.on_tap is not None
+    assert bubble.text_ctrl.selectable is False
+
+    assert factory.get(msg, selection_mode=False) is bubble and not bubble.selection_ctrl.visible
+    assert factory.get(_msg(1, content="edited")) is not bubble  # Changed row is rebuilt
+
+
+def test_factory_is_lru_bounded():
+    factory = BubbleFactory("u1", maxsize=2)
+    first = factory.get(_msg(1))
+    factory.get(_msg(2))
+    factory.get(_msg(3))
+    assert factory.get(_msg(1)) is not first
+
+
+def test_time_and_media_kind_are_memoized():
+    chat_bubble.format_time.cache_clear()
+    assert chat_bubble.format_time("2024-05-01T00:30:00") == "오전 9:30"
+    chat_bubble.format_time("2024-05-01T00:30:00")
+    assert chat_bubble.format_time.cache_info().hits == 1
+    assert chat_bubble.media_kind("https://cdn/a.JPG?token=1") == "image"
+    assert chat_bubble.media_kind("https://cdn/clip.mp4") == "video"
+    assert chat_bubble.media_kind(None) is None
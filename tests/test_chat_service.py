@@ -0,0 +1,106 @@
+from unittest.mock import patch
+
+from config import config
+from services import chat_service
+
+
+def test_unread_counts_use_single_rpc():
+    topics = [{"id": 1}, {"id": 2}, {"id": 3}]
+    rows = [
+        {"topic_id": 1, "unread_count": 4},
+        {"topic_id": 3, "unread_count": config.UNREAD_COUNT_CAP},
+        {"topic_id": 9, "unread_count": 2},  # Not in the visible topic list
+    ]
+    with patch.object(chat_service.ChatRepository, "get_unread_counts_rpc", return_value=rows) as rpc, \
+         patch.object(chat_service.ChatRepository, "get_message_count_for_topic") as fallback:
+        counts = chat_service.get_unread_counts("user-a", topics)
+
+    rpc.assert_called_once_with("user-a", config.UNREAD_COUNT_CAP)
+    fallback.assert_not_called()
+    assert counts == {"1": 4, "3": config.UNREAD_COUNT_CAP}
+
+
+def test_update_last_read_is_a_single_read_marker_write():
+    # The unread counter is reset by a trigger on chat_user_reading, in the same transaction
+    with patch.object(chat_service.ChatRepository, "upsert_read_status") as upsert:
+        chat_service.update_last_read("42", "user-a")
+
+    upsert.assert_called_once()
+    assert upsert.call_args[0][0]["topic_id"] == "42"
+    assert not hasattr(chat_service.ChatRepository, "reset_unread_counter")
+
+
+def test_get_messages_passes_keyset_cursor_and_returns_oldest_first():
+    page = [{"id": 9, "created_at": "2026-01-02"}, {"id": 8, "created_at": "2026-01-01"}]
+    with patch.object(chat_service.ChatRepository, "get_messages", return_value=page) as repo:
+        msgs = chat_service.get_messages("42", 30, before_id=10, before_created_at="2026-01-03")
+
+    repo.assert_called_once_with("42", 30, 10, "2026-01-03")
+    assert [m["id"] for m in msgs] == [8, 9]
+
+
+def test_delete_topics_batch_checks_permissions_in_two_queries():
+    topics = {
+        "1": {"id": 1, "created_by": "user-a", "channel_id": 7},   # Own topic
+        "2": {"id": 2, "created_by": "user-b", "channel_id": 7},   # Manager of channel 7
+        "3": {"id": 3, "created_by": "user-b", "channel_id": 8},   # Staff in channel 8
+    }
+    with patch.object(chat_service.ChatRepository, "get_topics_meta", return_value=topics) as meta, \
+         patch.object(chat_service.ChatRepository, "get_channel_member_roles",
+                      return_value={"7": "manager", "8": "staff"}) as roles, \
+         patch.object(chat_service.ChatRepository, "delete_topics_batch") as delete:
+        chat_service.delete_topics_batch([1, 2, 3, 4], "user-a")
+
+    meta.assert_called_once_with([1, 2, 3, 4])
+    assert roles.call_count == 1
+    assert sorted(roles.call_args[0][0]) == ["7", "8"]
+    delete.assert_called_once_with([1, 2])
+
+
+def test_send_message_records_image_derivatives():
+    with patch.object(chat_service.ChatRepository, "insert_message") as insert:
+        chat_service.send_message("42", None, "https://x/a.jpg", "user-a", "https://x/a_thumb.webp", "https://x/a_preview.webp")
+
+    row = insert.call_args[0][0]
+    assert row["content"] == "[이미지]"
+    assert row["thumb_url"] == "https://x/a_thumb.webp" and row["preview_url"] == "https://x/a_preview.webp"
+
+
+def test_reconcile_loaded_messages_reports_deleted_and_missing_rows():
+    with patch.object(chat_service.ChatRepository, "get_message_ids_between", return_value=[10, 12]) as repo:
+        diff = chat_service.reconcile_loaded_messages("42", [10, 11, 12])
+    repo.assert_called_once_with("42", 10, 12, 3 + config.MAX_MESSAGE_LIMIT)
+    assert diff == {"removed": {"11"}, "missing": False}
+
+    with patch.object(chat_service.ChatRepository, "get_message_ids_between", return_value=[10, 11, 12]):
+        assert chat_service.reconcile_loaded_messages("42", [10, 12])["missing"] is True
+
+
+def test_sync_fingerprints_are_session_independent():
+    rows = [{"topic_id": 3, "unread_count": 2}, {"topic_id": 1, "unread_count": 5}]
+    with patch.object(chat_service.ChatRepository, "get_topic_member_ids", return_value=[3, 1]), \
+         patch.object(chat_service.ChatRepository, "get_unread_counts_rpc", return_value=rows):
+        assert chat_service.get_user_sync_fingerprint("user-a") == (("1", "3"), (("1", 5), ("3", 2)))
+
+    with patch.object(chat_service.ChatRepository, "get_room_fingerprint", return_value=(12, 40)) as repo:
+        assert chat_service.get_room_fingerprint("42") == (12, 40)
+    repo.assert_called_once_with("42")
+
+
+def test_sign_message_attachments_signs_a_page_in_one_call_per_bucket():
+    pub = "https://p.supabase.co/storage/v1/object/public/uploads"
+    messages = [
+        {"id": 1, "image_url": f"{pub}/a.jpg", "thumb_url": f"{pub}/a_thumb.webp"},
+        {"id": 2, "content": "hi"},
+        {"id": 3, "image_url": f"{pub}/b.jpg", "preview_url": f"{pub}/b_preview.webp"},
+    ]
+    with patch("repositories.storage_repository.StorageRepository.create_signed_urls",
+               side_effect=lambda bucket, paths, expires: {p: f"signed:{p}" for p in paths}) as sign:
+        signed = chat_service.sign_message_attachments(messages)
+
+    sign.assert_called_once()
+    assert sign.call_args[0][0] == "uploads"
+    assert sorted(sign.call_args[0][1]) == ["a.jpg", "a_thumb.webp", "b.jpg", "b_preview.webp"]
+    assert signed[0]["image_url"] == "signed:a.jpg" and signed[0]["thumb_url"] == "signed:a_thumb.webp"
+    assert signed[1] is messages[1]
+    assert messages[0]["image_url"] == f"{pub}/a.jpg"  # Stored rows are not mutated
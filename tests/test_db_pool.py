@@ -0,0 +1,104 @@
+import asyncio
+import threading
+import weakref
+
+import httpx
+import pytest
+import db
+
+
+@pytest.fixture
+def mock_pool():
+    """Route the shared transport through a MockTransport that records requests."""
+    seen = []
+
+    def handler(request):
+        seen.append(request)
+        return httpx.Response(200, json=[])
+
+    transport = db.get_shared_transport()
+    original = transport._inner
+    transport._inner = httpx.MockTransport(handler)
+    yield seen
+    transport._inner = original
+
+
+def test_user_client_layers_jwt_per_request(mock_pool):
+    client = db.SupabaseClient("https://example.supabase.co", "anon-key")
+    user = client.get_user_client({"Authorization": "Bearer user-jwt", "apikey": "anon-key"})
+
+    user.table("labor_contracts").select("*").eq("channel_id", 1).execute()
+    client.table("labor_contracts").select("*").execute()
+
+    assert str(mock_pool[0].url).startswith("https://example.supabase.co/rest/v1/labor_contracts")
+    assert mock_pool[0].headers["authorization"] == "Bearer user-jwt"
+    # The shared session keeps its own key; user headers never leak into it
+    assert mock_pool[1].headers["authorization"] == "Bearer anon-key"
+
+
+def test_closing_a_client_keeps_the_pool_alive(mock_pool):
+    client = db.SupabaseClient("https://example.supabase.co", "anon-key")
+    client.get_user_client({"Authorization": "Bearer x"}).aclose()
+    client._http_client.close()
+
+    other = db.SupabaseClient("https://example.supabase.co", "anon-key")
+    other.table("profiles").select("id").execute()
+    assert len(mock_pool) == 1
+
+
+@pytest.mark.asyncio
+async def test_async_client_awaits_over_shared_pool(monkeypatch):
+    seen = []
+
+    def handler(request):
+        seen.append(request)
+        return httpx.Response(200, json=[{"id": 1}])
+
+    monkeypatch.setattr(db, "_build_async_transport", lambda: httpx.MockTransport(handler))
+    monkeypatch.setattr(db.get_shared_async_transport(), "_pools", weakref.WeakKeyDictionary())
+
+    client = db.AsyncSupabaseClient("https://example.supabase.co", "service-key")
+    res = await client.table("handovers").select("*").eq("channel_id", 3).execute()
+    user = client.get_user_client({"Authorization": "Bearer user-jwt"})
+    await user.table("calendar_events").select("id").execute()
+
+    assert res.data == [{"id": 1}]
+    assert seen[0].headers["authorization"] == "Bearer service-key"
+    assert seen[1].headers["authorization"] == "Bearer user-jwt"
+
+
+def test_async_pool_per_loop_survives_concurrent_loops(monkeypatch):
+    built = []
+
+    class Pool(httpx.MockTransport):
+        closed = False
+
+        async def aclose(self):
+            self.closed = True
+
+    async def handler(request):
+        await asyncio.sleep(0.01)  # Keep requests in flight while the other loop works
+        assert not pool_of_this_loop().closed
+        return httpx.Response(200, json=[])
+
+    def build():
+        built.append(Pool(handler))
+        return built[-1]
+
+    shared = db.AsyncSharedTransport()
+    pool_of_this_loop = lambda: shared._pools[asyncio.get_running_loop()]
+    monkeypatch.setattr(db, "_build_async_transport", build)
+
+    async def burst():
+        async with httpx.AsyncClient(transport=shared) as client:
+            for _ in range(5):
+                assert (await client.get("https://example.supabase.co/rest/v1/x")).status_code == 200
+
+    worker = threading.Thread(target=lambda: asyncio.run(burst()))
+    worker.start()
+    asyncio.run(burst())
+    worker.join()
+
+    assert len(built) == 2  # One pool per loop, never rebuilt while both loops were active
+    asyncio.run(burst())    # Both earlier loops are closed now: their pools are released
+    assert len(built) == 3 and built[0].closed and built[1].closed and not built[2].closed
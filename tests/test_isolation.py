@@ -20,7 +20,7 @@ async def test_voice_service_query_building():
     service = VoiceService()
     
     # We really want to verify that when we call the DB, we pass the right args.
-    with patch('services.voice_service.service_supabase') as mock_db:
+    with patch('services.voice_service.async_service_supabase') as mock_db:
         # User A, Channel 100
         await service.get_memos("user-a", 100)
         
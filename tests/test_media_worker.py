@@ -0,0 +1,105 @@
+import asyncio
+import threading
+from concurrent.futures import CancelledError
+from unittest.mock import patch
+
+import pytest
+
+from services.media_worker import MediaWorkerPool
+
+
+def test_jobs_respect_concurrency_limit_and_report_progress():
+    pool = MediaWorkerPool(max_workers=1, default_timeout=30)
+    running, peak = [0], [0]
+    lock = threading.Lock()
+
+    def fake_compress(path, progress_callback=None, cancel_event=None, timeout=None):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        progress_callback(0.5)
+        with lock:
+            running[0] -= 1
+        return f"{path}.out"
+
+    progress = []
+    with patch("services.media_worker.compression_service.compress_file", side_effect=fake_compress):
+        jobs = [pool.submit(f"f{i}", progress_callback=progress.append) for i in range(3)]
+        results = [job.result(timeout=5) for job in jobs]
+
+    assert results == ["f0.out", "f1.out", "f2.out"]
+    assert peak[0] == 1
+    assert progress.count(1.0) == 3 and 0.5 in progress
+
+
+def test_cancelled_queued_job_never_runs():
+    pool = MediaWorkerPool(max_workers=1, default_timeout=30)
+    release = threading.Event()
+    calls = []
+
+    def fake_compress(path, progress_callback=None, cancel_event=None, timeout=None):
+        calls.append(path)
+        release.wait(5)
+        return path
+
+    with patch("services.media_worker.compression_service.compress_file", side_effect=fake_compress):
+        first = pool.submit("busy")
+        queued = pool.submit("queued")
+        queued.cancel()
+        release.set()
+        first.result(timeout=5)
+        with pytest.raises(CancelledError):
+            queued.result(timeout=5)
+
+    assert calls == ["busy"]
+
+
+def test_cancelling_awaiting_task_cancels_running_job():
+    pool = MediaWorkerPool(max_workers=1, default_timeout=30)
+    started = threading.Event()
+    seen = {}
+
+    def fake_compress(path, progress_callback=None, cancel_event=None, timeout=None):
+        seen["timeout"] = timeout
+        started.set()
+        seen["cancelled"] = cancel_event.wait(5)  # ffmpeg would be killed here
+        return path
+
+    async def scenario():
+        job = pool.submit("video.mp4")
+        task = asyncio.create_task(job.wait())
+        await asyncio.to_thread(started.wait, 5)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return job
+
+    with patch("services.media_worker.compression_service.compress_file", side_effect=fake_compress):
+        job = asyncio.run(scenario())
+        with pytest.raises(CancelledError):
+            job.result(timeout=5)
+
+    assert seen == {"timeout": 30, "cancelled": True}
+    assert job.status == "cancelled"
+
+
+def test_stuck_image_job_resolves_to_original_at_deadline():
+    pool = MediaWorkerPool(max_workers=1, default_timeout=0.2)
+    release = threading.Event()
+    discarded = []
+
+    def stuck_compress(path, progress_callback=None, cancel_event=None, timeout=None):
+        release.wait(5)  # Pillow work ignores cancel_event
+        return "comp.jpg"
+
+    with patch("services.media_worker.compression_service.compress_file", side_effect=stuck_compress), \
+         patch("services.media_worker.compression_service.make_image_derivatives", return_value={"thumb": "t.webp"}), \
+         patch("services.media_worker.compression_service.discard_temp",
+               side_effect=lambda p, original: discarded.append(p)):
+        job = pool.submit("photo.jpg", derivatives=True)
+        assert job.result(timeout=5) == "photo.jpg"
+        assert job.status == "timed_out" and job.derivatives == {}
+        release.set()
+        pool._executor.shutdown(wait=True)
+
+    assert "comp.jpg" in discarded  # Late output is not leaked
@@ -30,3 +30,184 @@ def test_payroll_performance():
         calculate_salary(10000, 8, 20)
     end = time.time()
     assert (end - start) < 0.5
+
+
+def test_payroll_engine_standard_and_actual():
+    from services.payroll_engine import compute_payroll
+    contracts = [
+        {"id": 1, "employee_name": "김철수", "created_at": "2024-01-01", "wage_type": "hourly",
+         "hourly_wage": 10000, "daily_work_hours": 8, "work_days": [0, 1, 2, 3, 4]},
+        {"id": 2, "employee_name": "이영희", "created_at": "2024-01-01", "wage_type": "monthly",
+         "monthly_wage": 2000000, "daily_work_hours": 8, "work_days": [5, 6]},
+    ]
+    overrides = [
+        # Monday shift shortened to 4.5h at a raised wage; an overnight Saturday extra shift (4h)
+        {"employee_id": 1, "start_date": "2024-02-05T09:00:00", "end_date": "2024-02-05T13:30:00", "hourly_wage": 12000},
+        {"employee_id": 1, "start_date": "2024-02-10T22:00:00", "end_date": "2024-02-10T02:00:00"},
+        # Unregistered substitute identified by title only
+        {"title": "🟢 박민수(대타)", "start_date": "2024-02-12T10:00:00", "end_date": "2024-02-12T15:00:00"},
+    ]
+
+    result = compute_payroll(contracts, overrides, 2024, 2)
+    by_name = {e["name"]: e for e in result["employees"]}
+
+    assert [e["name"] for e in result["employees"]] == ["김철수", "박민수", "이영희"]
+    kim = by_name["김철수"]
+    assert (kim["std_days"], kim["std_pay"]) == (21, 1680000)   # Feb 2024 has 21 weekdays
+    assert (kim["act_days"], kim["act_hours"], kim["act_pay"]) == (22, 168.5, 2022000.0)
+    assert by_name["박민수"]["act_pay"] is None and by_name["박민수"]["is_incomplete"]
+    assert by_name["이영희"]["act_pay"] == 2000000 and by_name["이영희"]["std_days"] == 8
+    assert result["summary"] == {"total_std": 3680000, "total_act": 4022000.0, "diff": 342000.0, "has_incomplete": True}
+
+
+def test_resigned_contract_has_no_standard_schedule():
+    from services.payroll_engine import compute_payroll
+    contracts = [{"id": 1, "employee_name": "A", "hourly_wage": 10000, "daily_work_hours": 8,
+                  "work_days": [0, 1, 2, 3, 4], "contract_end_date": "2024-01-31"}]
+    emp = compute_payroll(contracts, [], 2024, 2)["employees"][0]
+    assert (emp["std_days"], emp["act_days"], emp["h_wage"], emp["act_pay"]) == (0, 0, None, None)
+
+
+def test_payroll_range_fetches_once_and_partitions_by_store_month():
+    import asyncio
+    from unittest.mock import patch, AsyncMock
+    from repositories.channel_repository import ChannelRepository
+    from services.payroll_service import PayrollService, month_range
+    from services.schedule_service import ScheduleService
+
+    contracts = [
+        {"id": 1, "channel_id": 7, "employee_name": "A", "hourly_wage": 10000, "daily_work_hours": 8, "work_days": [0]},
+        {"id": 2, "channel_id": 8, "employee_name": "B", "hourly_wage": 10000, "daily_work_hours": 8, "work_days": [1]},
+    ]
+    events = [
+        {"id": 10, "channel_id": 7, "employee_id": 1, "start_date": "2024-12-30T09:00:00", "end_date": "2024-12-30T12:00:00"},
+        {"id": 11, "channel_id": 7, "employee_id": 1, "start_date": "2025-01-06T09:00:00", "end_date": "2025-01-06T10:00:00"},
+    ]
+    service = PayrollService()
+    with patch.object(ScheduleService, "_fetch_versions", new=AsyncMock(return_value=None)), \
+         patch.object(ChannelRepository, "get_member_role", return_value="owner"), \
+         patch.object(ScheduleService, "_fetch_all", side_effect=[contracts, events]) as fetch:
+        results = asyncio.run(service.calculate_payroll_range([7, 8], "2024-12", (2025, 1), "owner-1"))
+
+    assert fetch.call_count == 2  # One query per table for 2 stores x 2 months
+    assert month_range("2024-12", "2025-01") == [(2024, 12), (2025, 1)]
+    assert set(results[7]) == set(results[8]) == {(2024, 12), (2025, 1)}
+    a_dec = results[7][(2024, 12)]["employees"][0]
+    assert (a_dec["name"], a_dec["act_hours"]) == ("A", 3 + 8 * 4)     # Override on Mon 12/30 + 4 other Mondays
+    assert results[7][(2025, 1)]["employees"][0]["events"] == [events[1]]
+    assert [e["name"] for e in results[8][(2025, 1)]["employees"]] == ["B"]
+
+
+def test_payroll_range_serves_unchanged_versions_from_cache():
+    import asyncio
+    from unittest.mock import patch, AsyncMock
+    from repositories.channel_repository import ChannelRepository
+    from services.payroll_service import PayrollService
+    from services.schedule_service import ScheduleService
+    from utils.cache import schedule_cache
+
+    schedule_cache.clear()
+    contracts = [{"id": 1, "channel_id": 7, "employee_name": "A", "hourly_wage": 10000, "daily_work_hours": 8, "work_days": [0]}]
+    versions = {("7", "contracts"): 3, ("7", "2025-01"): 1}
+    service = PayrollService()
+    with patch.object(ChannelRepository, "get_member_role", return_value="owner"), \
+         patch.object(ScheduleService, "_fetch_versions", new=AsyncMock(side_effect=lambda *a: dict(versions))), \
+         patch.object(ScheduleService, "_fetch_all", side_effect=[contracts, [], contracts, []]) as fetch:
+        first = asyncio.run(service.calculate_payroll("owner-1", 7, 2025, 1))
+        again = asyncio.run(service.calculate_payroll("owner-1", 7, 2025, 1))
+        assert fetch.call_count == 2 and again is first  # Same versions -> no data read
+
+        versions[("7", "2025-01")] = 2  # A schedule write bumped the month
+        asyncio.run(service.calculate_payroll("owner-1", 7, 2025, 1))
+        assert fetch.call_count == 4
+    schedule_cache.clear()
+
+
+def test_staff_calendar_and_payroll_share_one_roster():
+    import asyncio
+    from unittest.mock import patch, AsyncMock
+    from services.payroll_service import PayrollService
+    from services.schedule_engine import staff_events
+    from repositories.channel_repository import ChannelRepository
+    from services.schedule_service import ScheduleService, schedule_service
+    from utils.cache import schedule_cache
+
+    schedule_cache.clear()
+    contracts = [
+        {"id": 1, "channel_id": 7, "employee_name": "A", "created_at": "2024-01-01", "contract_end_date": "2025-01-15",
+         "work_days": [0], "daily_work_hours": 8, "work_schedule": {"0": {"start": "09:00", "end": "17:00"}}},
+    ]
+    events = [{"id": 10, "channel_id": 7, "employee_id": 1, "title": "⭐ A (10:00~12:00)",
+               "start_date": "2025-01-07T10:00:00", "end_date": "2025-01-07T12:00:00"}]
+    with patch.object(ChannelRepository, "get_member_role", return_value="owner"), \
+         patch.object(ScheduleService, "_fetch_versions", new=AsyncMock(return_value={("7", "contracts"): 1})), \
+         patch.object(ScheduleService, "_fetch_all", side_effect=[contracts, events]) as fetch:
+        payroll = asyncio.run(PayrollService().calculate_payroll("owner-1", 7, 2025, 1))
+        roster = asyncio.run(schedule_service.get_roster(7, 2025, 1, "owner-1"))
+        cal = roster.derive("staff_events", staff_events)
+    schedule_cache.clear()
+
+    assert fetch.call_count == 2  # The calendar reused the payroll's roster
+    assert roster.derive("staff_events", staff_events) is cal
+    # Contract ends 1/15: baselines on Mondays 6 and 13 only; the Tuesday record is off-contract (blue)
+    assert [e["start_date"][:10] for e in cal if e["is_virtual"]] == ["2025-01-06", "2025-01-13"]
+    assert [e["color"] for e in cal if not e["is_virtual"]] == ["blue"]
+    assert payroll["employees"][0]["act_hours"] == 2 + 8 * 4  # Payroll only drops contracts ended before the month
+
+
+def test_cached_payroll_is_scoped_to_the_caller():
+    import asyncio
+    from unittest.mock import patch, AsyncMock
+    from repositories.channel_repository import ChannelRepository
+    from services.payroll_service import PayrollService
+    from services.schedule_service import ScheduleService
+    from utils.cache import schedule_cache
+
+    schedule_cache.clear()
+    contracts = [
+        {"id": 1, "channel_id": 7, "user_id": "staff-a", "employee_name": "A", "hourly_wage": 10000, "daily_work_hours": 8, "work_days": [0]},
+        {"id": 2, "channel_id": 7, "user_id": "staff-b", "employee_name": "B", "hourly_wage": 20000, "daily_work_hours": 8, "work_days": [1]},
+    ]
+    roles = {"owner-1": "owner", "staff-a": "staff", "outsider": None}
+    service = PayrollService()
+    with patch.object(ChannelRepository, "get_member_role", side_effect=lambda cid, uid: roles[uid]), \
+         patch.object(ScheduleService, "_fetch_versions", new=AsyncMock(return_value={("7", "contracts"): 1})), \
+         patch.object(ScheduleService, "_fetch_all", side_effect=[contracts, []]) as fetch:
+        owner = asyncio.run(service.calculate_payroll("owner-1", 7, 2025, 1))
+        staff = asyncio.run(service.calculate_payroll("staff-a", 7, 2025, 1))
+        outsider = asyncio.run(service.calculate_payroll("outsider", 7, 2025, 1))
+    schedule_cache.clear()
+
+    assert fetch.call_count == 2  # One store read (service client) serves every caller
+    assert [e["name"] for e in owner["employees"]] == ["A", "B"]
+    assert [e["name"] for e in staff["employees"]] == ["A"]  # Own contract only, as the RLS policy allows
+    assert outsider["employees"] == []
+
+
+def test_staff_calendar_rosters_are_not_shared_between_callers():
+    import asyncio
+    from unittest.mock import patch, AsyncMock
+    from repositories.channel_repository import ChannelRepository
+    from services.schedule_engine import staff_events
+    from services.schedule_service import ScheduleService, schedule_service
+    from utils.cache import schedule_cache
+
+    schedule_cache.clear()
+    schedule = {"0": {"start": "09:00", "end": "17:00"}}
+    contracts = [
+        {"id": 1, "channel_id": 7, "user_id": "staff-a", "employee_name": "A", "work_schedule": schedule},
+        {"id": 2, "channel_id": 7, "user_id": "staff-b", "employee_name": "B", "work_schedule": schedule},
+    ]
+    roles = {"staff-a": "staff", "owner-1": "owner"}
+    with patch.object(ChannelRepository, "get_member_role", side_effect=lambda cid, uid: roles[uid]), \
+         patch.object(ScheduleService, "_fetch_versions", new=AsyncMock(return_value={("7", "contracts"): 1})), \
+         patch.object(ScheduleService, "_fetch_all", side_effect=[contracts, []]):
+        # Staff opens the calendar first; the owner must still see every contract afterwards
+        staff = asyncio.run(schedule_service.get_roster(7, 2025, 1, "staff-a")).derive("staff_events", staff_events)
+        owner = asyncio.run(schedule_service.get_roster(7, 2025, 1, "owner-1")).derive("staff_events", staff_events)
+        again = asyncio.run(schedule_service.get_roster(7, 2025, 1, "staff-a")).derive("staff_events", staff_events)
+    schedule_cache.clear()
+
+    assert {e["employee_name"] for e in staff} == {"A"}
+    assert {e["employee_name"] for e in owner} == {"A", "B"}
+    assert again is staff  # The staff view is cached per caller
@@ -0,0 +1,91 @@
+import asyncio
+import pytest
+
+from services.poll_scheduler import PollScheduler
+
+
+@pytest.mark.asyncio
+async def test_identical_keys_share_one_fetch_and_owner_cancel_stops_job():
+    scheduler = PollScheduler()
+    calls = []
+    seen_a, seen_b = [], []
+    page_a, page_b = object(), object()
+
+    async def fetch():
+        calls.append(1)
+        return len(calls)
+
+    scheduler.register("handover:1", fetch, seen_a.append, owner=page_a, interval=0.01)
+    scheduler.register("handover:1", fetch, seen_b.append, owner=page_b, interval=0.01)
+    await asyncio.sleep(0.05)
+
+    assert scheduler.active_jobs() == 1
+    assert seen_a == seen_b and seen_a  # Both sessions got the same results from one loop
+
+    scheduler.cancel_owner(page_a)
+    assert scheduler.active_jobs() == 1
+    scheduler.cancel_owner(page_b)
+    assert scheduler.active_jobs() == 0
+
+
+@pytest.mark.asyncio
+async def test_unchanged_results_back_off_until_poked():
+    scheduler = PollScheduler()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        return "same"
+
+    token = scheduler.register("calendar:1", fetch, interval=0.01, max_interval=10, backoff=20)
+    await asyncio.sleep(0.1)
+    assert len(calls) == 2  # 0.01s, then 0.2s -> capped back-off keeps it quiet
+
+    scheduler.poke("calendar:1")
+    await asyncio.sleep(0.01)
+    assert len(calls) == 3
+    scheduler.unregister(token)
+
+
+@pytest.mark.asyncio
+async def test_failing_subscriber_is_dropped_and_last_one_stops_the_job():
+    scheduler = PollScheduler()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        return len(calls)  # Changes every tick
+
+    def dead_control(result):
+        raise RuntimeError("Control must be added to the page first")
+
+    scheduler.register("clock", fetch, dead_control, owner=object(), interval=0.01, backoff=1.0)
+    await asyncio.sleep(0.1)
+
+    assert scheduler.active_jobs() == 0  # Dropped after MAX_SUBSCRIBER_FAILURES; no subscriber left
+    ticks = len(calls)
+    await asyncio.sleep(0.05)
+    assert len(calls) == ticks
+
+
+@pytest.mark.asyncio
+async def test_healthy_subscribers_survive_a_failing_one():
+    scheduler = PollScheduler()
+    seen, failures = [], []
+    flaky = iter([True, False, True, True, False])  # Failures that are not consecutive keep the subscriber
+
+    async def fetch():
+        return object()
+
+    def sometimes_fails(result):
+        if next(flaky, False):
+            failures.append(result)
+            raise RuntimeError("transient")
+
+    scheduler.register("handover:1", fetch, seen.append, owner=object(), interval=0.01, backoff=1.0)
+    token = scheduler.register("handover:1", fetch, sometimes_fails, owner=object())
+    await asyncio.sleep(0.1)
+
+    assert len(failures) == 3 and token in scheduler._token_keys
+    assert len(seen) >= 5
+    scheduler.unregister(token)
@@ -0,0 +1,133 @@
+import pytest
+
+from services import realtime_hub as hub_module
+from services.realtime_hub import RealtimeHub
+
+
+class FakeChannel:
+    def __init__(self, name):
+        self.name = name
+        self.bindings = []
+
+    def on_postgres_changes(self, **kwargs):
+        self.bindings.append(kwargs)
+        return self
+
+    async def subscribe(self):
+        return self
+
+
+class FakeRealtime:
+    def __init__(self):
+        self.channels = []
+        self.removed = []
+        self.closed = False
+
+    async def connect(self):
+        pass
+
+    def channel(self, name):
+        ch = FakeChannel(name)
+        self.channels.append(ch)
+        return ch
+
+    async def remove_channel(self, channel):
+        self.removed.append(channel)
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeSupabase:
+    def __init__(self):
+        self.clients = []
+
+    def get_realtime_client(self):
+        client = FakeRealtime()
+        self.clients.append(client)
+        return client
+
+
+@pytest.mark.asyncio
+async def test_hub_shares_one_filtered_channel_and_fans_out(monkeypatch):
+    fake = FakeSupabase()
+    monkeypatch.setattr(hub_module, "supabase", fake)
+    hub = RealtimeHub()
+    got_a, got_b = [], []
+
+    t1 = await hub.subscribe("chat_messages", "topic_id", 7, got_a.append, event="INSERT")
+    t2 = await hub.subscribe("chat_messages", "topic_id", 7, got_b.append, event="INSERT")
+
+    assert len(fake.clients) == 1
+    client = fake.clients[0]
+    assert len(client.channels) == 1
+    binding = client.channels[0].bindings[0]
+    assert binding["filter"] == "topic_id=eq.7"
+
+    binding["callback"]({"data": {"record": {"id": 1}}})
+    assert got_a == got_b == [{"data": {"record": {"id": 1}}}]
+
+    await hub.unsubscribe(t1)
+    assert client.removed == []
+    await hub.unsubscribe(t2)
+    assert client.removed == client.channels
+    assert client.closed
+    assert hub.listener_count() == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_subscribe_stays_pending_and_is_retried(monkeypatch):
+    class FlakySupabase(FakeSupabase):
+        """First connect fails (socket down); later ones succeed."""
+        def get_realtime_client(self):
+            client = super().get_realtime_client()
+            if len(self.clients) == 1:
+                async def fail():
+                    raise ConnectionError("socket down")
+                client.connect = fail
+            return client
+
+    fake = FlakySupabase()
+    monkeypatch.setattr(hub_module, "supabase", fake)
+    monkeypatch.setattr(hub_module.config, "REALTIME_RETRY_MIN", 60)  # Only the next subscribe retries here
+    hub = RealtimeHub()
+    got = []
+
+    await hub.subscribe("handovers", "channel_id", 3, got.append)
+    assert hub.listener_count() == 1 and not hub._channels  # Registered, but no channel yet
+
+    await hub.subscribe("chat_messages", "topic_id", 7, lambda p: None)
+    client = fake.clients[-1]
+    assert sorted(ch.name for ch in client.channels) == ["hub:chat_messages:topic_id=7:*", "hub:handovers:channel_id=3:*"]
+    binding = next(ch for ch in client.channels if "handovers" in ch.name).bindings[0]
+    binding["callback"]({"data": {"record": {"id": 1}}})
+    assert got == [{"data": {"record": {"id": 1}}}]
+    hub._retry_task.cancel()
+
+
+@pytest.mark.asyncio
+async def test_failed_channel_join_is_retried_with_backoff(monkeypatch):
+    import asyncio
+
+    fake = FakeSupabase()
+    monkeypatch.setattr(hub_module, "supabase", fake)
+    monkeypatch.setattr(hub_module.config, "REALTIME_RETRY_MIN", 0.01)
+    attempts = []
+
+    async def flaky_subscribe(self):
+        attempts.append(self.name)
+        if len(attempts) < 3:
+            raise TimeoutError("join timed out")
+        return self
+
+    monkeypatch.setattr(FakeChannel, "subscribe", flaky_subscribe)
+    hub = RealtimeHub()
+    await hub.subscribe("handovers", "channel_id", 3, lambda p: None)
+    for _ in range(50):
+        if hub._channels:
+            break
+        await asyncio.sleep(0.01)
+
+    assert list(hub._channels) == ["handovers:channel_id=3:*"] and len(attempts) == 3
+    assert len(fake.clients[0].removed) == 2  # Failed channels were dropped, not left half-joined
+    assert not hub._pending
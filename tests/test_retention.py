@@ -4,7 +4,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import pytest
 from datetime import datetime, timedelta
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 from services.voice_service import VoiceService
 
 @pytest.mark.asyncio
@@ -12,12 +12,14 @@ async def test_retention_dates():
     service = VoiceService()
     
     # Mock DB Fetch for Tier
-    with patch('services.voice_service.service_supabase') as mock_db:
+    with patch('services.voice_service.async_service_supabase') as mock_db:
         # 1. Test FREE Tier
-        # Mock: .table()...single().execute() -> data={"subscription_tier": "free"}
-        mock_query = MagicMock()
-        mock_query.execute.return_value.data = {"subscription_tier": "free"}
-        mock_db.table.return_value.select.return_value.eq.return_value.single.return_value = mock_query
+        # Mock: .table()...eq().execute() -> data=[{"subscription_tier": "free"}]
+        # The client is async: execute() must be awaitable
+        mock_db.table.return_value.select.return_value.eq.return_value.execute = AsyncMock(
+            return_value=MagicMock(data=[{"subscription_tier": "free"}]))
+        mock_db.table.return_value.insert.return_value.execute = AsyncMock(
+            return_value=MagicMock(data=[{"id": 1}]))
         
         # Test creation logic (we can't easily test internal var without refactoring, 
         # but we can check what strictly gets passed to insert)
@@ -0,0 +1,42 @@
+from unittest.mock import patch
+
+from services import storage_gc
+
+OLD = "2020-01-01T00:00:00.000Z"
+BASE = "https://proj.supabase.co/storage/v1/object"
+
+
+def _obj(path, size, created=OLD):
+    return {"path": path, "created_at": created, "metadata": {"size": size}}
+
+
+def test_path_from_url_handles_public_and_signed_urls():
+    assert storage_gc.path_from_url(f"{BASE}/public/uploads/a%20b.jpg") == ("uploads", "a b.jpg")
+    assert storage_gc.path_from_url(f"{BASE}/sign/chat-uploads/voice/v.wav?token=x") == ("chat-uploads", "voice/v.wav")
+    assert storage_gc.path_from_url("/tmp/local.jpg") is None
+
+
+def test_sweep_deletes_only_old_unreferenced_objects_in_batches():
+    objects = [_obj("keep.jpg", 10), _obj("o1.jpg", 100), _obj("o2.jpg", 200), _obj("o3.jpg", 300),
+               _obj("fresh.jpg", 50, created="2999-01-01T00:00:00Z")]
+    repo = storage_gc.StorageRepository
+
+    with patch.object(repo, "iter_objects", return_value=iter(objects)), \
+         patch.object(repo, "forget_paths") as forget, \
+         patch.object(repo, "get_public_url", side_effect=lambda b, p: f"{BASE}/public/{b}/{p}"), \
+         patch.object(repo, "find_referencing_values",
+                      side_effect=lambda t, c, urls: {u for u in urls if u.endswith("o3.jpg") and c == "image_url"}), \
+         patch.object(repo, "remove_files") as remove:
+        report = storage_gc.sweep_bucket("uploads", {"keep.jpg"}, batch_size=2)
+
+    assert [c.args[1] for c in remove.call_args_list] == [["o1.jpg", "o2.jpg"]]  # o3 reused since mark
+    assert forget.call_count == 2
+    assert report == {"bucket": "uploads", "scanned": 5, "orphans": 3, "deleted": 2,
+                      "reclaimed_bytes": 300, "errors": 0}
+
+
+def test_failed_mark_phase_deletes_nothing():
+    with patch.object(storage_gc.StorageRepository, "iter_column_values", side_effect=RuntimeError("db down")), \
+         patch.object(storage_gc.StorageRepository, "remove_files") as remove:
+        assert storage_gc.collect_garbage() == []
+    remove.assert_not_called()
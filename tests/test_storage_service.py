@@ -0,0 +1,116 @@
+from concurrent.futures import Future
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from services import storage_service
+
+
+def _finished_job(path, derivatives):
+    fut = Future()
+    fut.set_result(path)
+    return SimpleNamespace(result=fut.result, source_path="src.jpg", derivatives=derivatives)
+
+
+def test_upload_processed_stores_original_and_webp_derivatives():
+    job = _finished_job("comp.jpg", {"thumb": "t.webp", "preview": "p.webp"})
+    with patch.object(storage_service.StorageRepository, "upload_local_file") as upload, \
+         patch.object(storage_service.StorageRepository, "get_public_url", side_effect=lambda b, n: f"https://cdn/{n}"), \
+         patch.object(storage_service, "discard_temp") as discard:
+        media = storage_service._upload_processed(job, "abc.jpg")
+
+    assert media == {
+        "public_url": "https://cdn/abc.jpg",
+        "thumb_url": "https://cdn/abc_thumb.webp",
+        "preview_url": "https://cdn/abc_preview.webp",
+    }
+    uploaded = [c.args[1] for c in upload.call_args_list]
+    assert uploaded == ["abc.jpg", "abc_thumb.webp", "abc_preview.webp"]
+    assert discard.call_count == 3  # Temp renditions never outlive the upload
+
+
+def test_failed_derivative_upload_falls_back_to_original():
+    job = _finished_job("comp.jpg", {"thumb": "t.webp"})
+
+    def upload(bucket, name, path, *args, **kwargs):
+        if name.endswith("_thumb.webp"):
+            raise RuntimeError("network")
+
+    with patch.object(storage_service.StorageRepository, "upload_local_file", side_effect=upload), \
+         patch.object(storage_service.StorageRepository, "get_public_url", side_effect=lambda b, n: f"https://cdn/{n}"), \
+         patch.object(storage_service, "discard_temp"):
+        media = storage_service._upload_processed(job, "abc.jpg")
+
+    assert media["public_url"] == "https://cdn/abc.jpg" and media["thumb_url"] is None
+
+
+def test_duplicate_content_skips_compression_and_transfer(tmp_path):
+    import asyncio
+    src = tmp_path / "photo.jpg"
+    src.write_bytes(b"same bytes")
+    stored = {"path": "old.jpg", "public_url": "https://cdn/old.jpg", "thumb_url": "https://cdn/old_thumb.webp", "preview_url": None}
+
+    with patch.object(storage_service.StorageRepository, "find_by_digest", return_value=stored) as find, \
+         patch.object(storage_service.media_worker, "submit") as submit, \
+         patch.object(storage_service.StorageRepository, "upload_local_file") as upload:
+        media = asyncio.run(storage_service.process_and_upload(str(src), "new.jpg"))
+
+    assert find.call_args[0] == ("uploads", storage_service.file_digest(str(src)))
+    submit.assert_not_called()
+    upload.assert_not_called()
+    assert media["public_url"] == "https://cdn/old.jpg" and media["thumb_url"] == "https://cdn/old_thumb.webp"
+
+
+def test_native_duplicate_reports_the_stored_object_path(tmp_path):
+    src = tmp_path / "photo.jpg"
+    src.write_bytes(b"same bytes")
+    stored = {"path": "old.jpg", "public_url": "https://cdn/old.jpg", "thumb_url": None, "preview_url": None}
+
+    with patch.object(storage_service.StorageRepository, "find_by_digest", return_value=stored), \
+         patch.object(storage_service.media_worker, "submit") as submit:
+        out = storage_service.handle_file_upload(False, SimpleNamespace(name="photo.jpg", path=str(src)))
+
+    submit.assert_not_called()
+    assert out["type"] == "native_url"
+    assert out["storage_name"] == "old.jpg" and out["public_url"] == "https://cdn/old.jpg"
+
+
+def test_new_content_is_indexed_after_upload(tmp_path):
+    src = tmp_path / "clip.mp4"
+    src.write_bytes(b"video")
+    media = {"public_url": "https://cdn/n.mp4", "thumb_url": None, "preview_url": None}
+
+    with patch.object(storage_service.StorageRepository, "find_by_digest", return_value=None), \
+         patch.object(storage_service.media_worker, "submit") as submit, \
+         patch.object(storage_service, "_upload_processed", return_value=media), \
+         patch.object(storage_service.StorageRepository, "record_digest") as record:
+        out = storage_service.handle_file_upload(False, SimpleNamespace(name="clip.mp4", path=str(src)))
+
+    submit.assert_called_once()
+    assert out["public_url"] == "https://cdn/n.mp4"
+    record.assert_called_once_with("uploads", storage_service.file_digest(str(src)), out["storage_name"], 5, media)
+
+
+def _web_picker():
+    return SimpleNamespace(upload=lambda files: _web_picker.sent.extend(files),
+                           page=SimpleNamespace(get_upload_url=lambda name, ttl: f"http://app/upload/{name}?t=1"))
+
+
+def test_large_web_upload_goes_direct_to_storage(monkeypatch):
+    monkeypatch.setattr(storage_service.config, "DIRECT_UPLOAD_ENABLED", True)
+    monkeypatch.setattr(storage_service.config, "DIRECT_UPLOAD_MIN_BYTES", 100)
+    _web_picker.sent = []
+    big = SimpleNamespace(name="clip.mp4", size=500, path=None)
+    small = SimpleNamespace(name="a.jpg", size=50, path=None)
+
+    with patch.object(storage_service.StorageRepository, "create_signed_upload_url",
+                      side_effect=lambda b, n, ttl: f"https://proj.supabase.co/storage/v1/object/upload/sign/{b}/{n}?token=x"), \
+         patch.object(storage_service.StorageRepository, "get_public_url", side_effect=lambda b, n: f"https://cdn/{n}"):
+        direct = storage_service.handle_file_upload(True, big, picker_ref=_web_picker(), allow_direct=True)
+        proxied = storage_service.handle_file_upload(True, small, picker_ref=_web_picker(), allow_direct=True)
+        opted_out = storage_service.handle_file_upload(True, big, picker_ref=_web_picker())
+
+    assert direct["type"] == "direct_upload_triggered"
+    assert direct["public_url"] == f"https://cdn/{direct['storage_name']}"
+    assert _web_picker.sent[0].upload_url.startswith("https://proj.supabase.co/storage/v1/object/upload/sign/uploads/")
+    assert proxied["type"] == opted_out["type"] == "proxy_upload_triggered"
+    assert [f.upload_url.startswith("/upload/") for f in _web_picker.sent[1:]] == [True, True]
@@ -0,0 +1,188 @@
+import io
+import json
+import time
+
+import httpx
+
+import db
+from db import ManualBucket
+
+BASE = "https://proj.supabase.co/storage/v1"
+HEADERS = {"apikey": "k", "Authorization": "Bearer k", "Content-Type": "application/json"}
+
+
+def _bucket(handler):
+    return ManualBucket(BASE, HEADERS, "uploads", httpx.Client(transport=httpx.MockTransport(handler)))
+
+
+def test_file_objects_are_streamed_in_chunks(monkeypatch):
+    monkeypatch.setattr(db.config, "STORAGE_UPLOAD_CHUNK_SIZE", 100)
+    seen = {}
+    reads = []
+
+    class TrackingFile(io.BytesIO):
+        def read(self, size=-1):
+            reads.append(size)
+            return super().read(size)
+
+    def handler(request):
+        seen["headers"] = request.headers
+        seen["body"] = request.read()
+        return httpx.Response(200, json={"Key": "uploads/a.jpg"})
+
+    _bucket(handler).upload("a.jpg", TrackingFile(b"x" * 1000))
+
+    assert seen["body"] == b"x" * 1000
+    assert reads and all(0 < size <= 100 for size in reads)  # Never a whole-file read()
+    assert seen["headers"]["content-type"] == "image/jpeg"
+
+
+def test_resumable_upload_resumes_from_server_offset(monkeypatch):
+    monkeypatch.setattr(db.config, "STORAGE_UPLOAD_CHUNK_SIZE", 4)
+    data = b"abcdefghij"
+    stored = bytearray()
+    calls = {"patch": 0}
+
+    def handler(request):
+        if request.method == "POST":
+            assert request.headers["upload-length"] == str(len(data))
+            return httpx.Response(201, headers={"Location": "/storage/v1/upload/resumable/abc"})
+        if request.method == "HEAD":
+            return httpx.Response(200, headers={"Upload-Offset": str(len(stored))})
+        calls["patch"] += 1
+        if calls["patch"] == 2:
+            return httpx.Response(500)  # Transient failure on the second chunk
+        assert int(request.headers["upload-offset"]) == len(stored)
+        stored.extend(request.read())
+        return httpx.Response(204, headers={"Upload-Offset": str(len(stored))})
+
+    progress = []
+    _bucket(handler).upload_resumable("big.mp4", io.BytesIO(data), len(data),
+                                      progress_callback=lambda sent, total: progress.append(sent))
+
+    assert bytes(stored) == data
+    assert progress[-1] == len(data)
+
+
+def test_download_urls_are_cached_but_upload_urls_are_not(monkeypatch):
+    from utils.cache import SignedUrlCache
+    monkeypatch.setattr(db, "signed_url_cache", SignedUrlCache())
+    posts = []
+
+    def handler(request):
+        posts.append(request.url.path)
+        if "/object/upload/sign/" in request.url.path:
+            return httpx.Response(200, json={"url": f"/object/upload/sign/uploads/up.jpg?token={len(posts)}"})
+        return httpx.Response(200, json={"signedURL": "/object/sign/uploads/a.jpg?token=1"})
+
+    bucket = _bucket(handler)
+    first = bucket.create_signed_url("a.jpg", 3600)
+    again = bucket.create_signed_url("a.jpg", 3600)
+    assert first == again and len(posts) == 1
+    assert first["signedURL"].startswith(BASE)
+
+    # Upload URLs carry a single-use token: every call signs a fresh one
+    up1 = bucket.create_signed_upload_url("up.jpg", 3600)
+    up2 = bucket.create_signed_upload_url("up.jpg", 3600)
+    assert up1 != up2 and len(posts) == 3
+
+
+def _batch_sign_handler(posts):
+    def handler(request):
+        body = json.loads(request.read())
+        posts.append((request.url.path, body))
+        if "paths" not in body:  # Single-object sign
+            return httpx.Response(200, json={"signedURL": request.url.path.split("/v1", 1)[1] + "?token=t"})
+        return httpx.Response(200, json=[
+            {"path": p, "signedURL": f"/object/sign/uploads/{p}?token=t", "error": None} for p in body["paths"]
+        ])
+    return handler
+
+
+def test_signed_urls_for_many_paths_cost_one_request(monkeypatch):
+    from utils.cache import SignedUrlCache
+    monkeypatch.setattr(db, "signed_url_cache", SignedUrlCache())
+    posts = []
+    bucket = _bucket(_batch_sign_handler(posts))
+
+    bucket.create_signed_url("a.jpg", 3600)  # Already cached: not re-signed in the batch
+    posts.clear()
+    rows = bucket.create_signed_urls(["a.jpg", "b.jpg", "c.jpg", "b.jpg"], 3600)
+
+    assert len(posts) == 1
+    assert posts[0] == ("/storage/v1/object/sign/uploads", {"expiresIn": 3600, "paths": ["b.jpg", "c.jpg"]})
+    assert [r["path"] for r in rows] == ["a.jpg", "b.jpg", "c.jpg", "b.jpg"]
+    assert all(r["signedURL"].startswith(BASE) for r in rows)
+
+    bucket.create_signed_urls(["a.jpg", "b.jpg", "c.jpg"], 3600)
+    assert len(posts) == 1  # Served from the cache
+
+
+def test_async_signed_urls_batch_shares_the_cache(monkeypatch):
+    import asyncio
+    from db import AsyncManualBucket
+    from utils.cache import SignedUrlCache
+    monkeypatch.setattr(db, "signed_url_cache", SignedUrlCache())
+    posts = []
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(_batch_sign_handler(posts))) as client:
+            bucket = AsyncManualBucket(BASE, HEADERS, "uploads", client)
+            first = await bucket.create_signed_urls(["a.jpg", "b.jpg"], 60)
+            again = await bucket.create_signed_urls(["a.jpg", "b.jpg"], 60)
+            return first, again
+
+    first, again = asyncio.run(run())
+    assert first == again and len(posts) == 1
+    assert _bucket(_batch_sign_handler(posts)).create_signed_url("a.jpg", 60)["signedURL"] == first[0]["signedURL"]
+    assert len(posts) == 1
+
+
+def test_stale_signed_url_is_served_while_refreshing(monkeypatch):
+    from utils.cache import SignedUrlCache
+    cache = SignedUrlCache()
+    monkeypatch.setattr(db, "signed_url_cache", cache)
+    tokens = iter(["old", "new"])
+
+    def handler(request):
+        return httpx.Response(200, json={"signedURL": f"/object/sign/uploads/a.jpg?token={next(tokens)}"})
+
+    bucket = _bucket(handler)
+    bucket.create_signed_url("a.jpg", 100)
+    url, expires_at, _ = cache._data[("uploads", "a.jpg", 100)]
+    cache._data[("uploads", "a.jpg", 100)] = (url, expires_at, 0)   # Force into the refresh window
+
+    assert bucket.create_signed_url("a.jpg", 100)["signedURL"].endswith("token=old")
+    for _ in range(50):  # Background re-sign
+        if cache.lookup(("uploads", "a.jpg", 100))[0].endswith("token=new"):
+            break
+        time.sleep(0.02)
+    assert cache.lookup(("uploads", "a.jpg", 100))[0].endswith("token=new")
+
+
+def test_list_all_paginates_and_recurses_into_folders(monkeypatch):
+    tree = {"": [{"name": "a.jpg", "id": "1"}, {"name": "b.jpg", "id": "2"}, {"name": "voice", "id": None}],
+            "voice": [{"name": "v.wav", "id": "3"}]}
+
+    def handler(request):
+        body = json.loads(request.content)
+        items = tree[body["prefix"]]
+        return httpx.Response(200, json=items[body["offset"]:body["offset"] + body["limit"]])
+
+    paths = [item["path"] for item in _bucket(handler).list_all(page_size=2)]
+    assert paths == ["a.jpg", "b.jpg", "voice/v.wav"]
+
+
+def test_remove_deletes_in_batches(monkeypatch):
+    monkeypatch.setattr(db.config, "STORAGE_REMOVE_BATCH_SIZE", 2)
+    batches = []
+
+    def handler(request):
+        assert request.method == "DELETE"
+        prefixes = json.loads(request.content)["prefixes"]
+        batches.append(prefixes)
+        return httpx.Response(200, json=[{"name": p} for p in prefixes])
+
+    removed = _bucket(handler).remove(["a", "b", "c"])
+    assert batches == [["a", "b"], ["c"]]
+    assert len(removed) == 3
@@ -0,0 +1,49 @@
+import asyncio
+from unittest.mock import patch
+
+from services.upload_pipeline import UploadPipeline
+
+
+def test_upload_event_resolves_waiter_once_file_is_complete(tmp_path):
+    pipeline = UploadPipeline(str(tmp_path), workers=1)
+    target = tmp_path / "abc.jpg"
+    calls = []
+
+    def fake_upload(name):
+        calls.append(name)
+        return {"public_url": f"https://cdn/{name}"}
+
+    async def scenario():
+        with patch("services.upload_pipeline.awatch", None), \
+             patch("services.upload_pipeline.storage_service.upload_proxy_file_to_supabase", side_effect=fake_upload):
+            future = pipeline.expect("abc.jpg", size=4)
+            target.write_bytes(b"ab")               # Partial write: not complete yet
+            pipeline.notify_uploaded("abc.jpg")
+            await asyncio.sleep(0.05)
+            assert not future.done()
+
+            target.write_bytes(b"abcd")
+            pipeline.notify_uploaded("abc.jpg")
+            pipeline.notify_uploaded("abc.jpg")     # Duplicate completion signal
+            media = await asyncio.wait_for(future, 2)
+            await asyncio.sleep(0.05)
+            return media
+
+    media = asyncio.run(scenario())
+    assert media == {"public_url": "https://cdn/abc.jpg"}
+    assert calls == ["abc.jpg"]
+    assert pipeline.pending() == 0
+
+
+def test_filesystem_notification_completes_without_upload_event(tmp_path):
+    pipeline = UploadPipeline(str(tmp_path), workers=1)
+
+    async def scenario():
+        with patch("services.upload_pipeline.storage_service.upload_proxy_file_to_supabase",
+                   side_effect=lambda name: {"public_url": name}):
+            future = pipeline.expect("clip.mp4", size=3)
+            await asyncio.sleep(0.2)                # Let the watcher start
+            (tmp_path / "clip.mp4").write_bytes(b"xyz")
+            return await asyncio.wait_for(future, 10)
+
+    assert asyncio.run(scenario()) == {"public_url": "clip.mp4"}
@@ -0,0 +1,59 @@
+import asyncio
+from types import SimpleNamespace
+
+import flet as ft
+
+from views.components.virtual_message_list import VirtualMessageList
+
+
+def _list(built):
+    def build(m):
+        built.append(m["id"])
+        return ft.Text(str(m["id"]))
+    return VirtualMessageList(build, window_size=20, overscan=5, spacing=5)
+
+
+def _scroll(view, pixels, viewport=600):
+    asyncio.run(view._handle_scroll(SimpleNamespace(pixels=pixels, viewport_dimension=viewport)))
+
+
+def _ids(view):
+    return [int(c.value) for c in view.controls[1:-1]]
+
+
+def test_only_newest_window_is_built():
+    built = []
+    view = _list(built)
+    view.set_messages([{"id": i, "content": "hi"} for i in range(500)])
+
+    assert _ids(view) == list(range(480, 500))
+    assert len(built) == 20
+    assert view.controls[0].height > 0 and view.controls[-1].height == 0  # Spacer stands in for 480 rows
+
+
+def test_scrolling_moves_window_and_reuses_bubbles():
+    built = []
+    view = _list(built)
+    view.set_messages([{"id": i, "content": "hi"} for i in range(500)])
+    kept = {int(c.value): c for c in view.controls[1:-1]}
+
+    row = view.controls[0].height / 480
+    _scroll(view, row * 470)  # A few rows above the window
+    ids = _ids(view)
+    assert ids[0] <= 470 <= ids[-1] and len(view.controls) <= 2 + view._window_size
+    assert all(kept[i] is c for i, c in zip(ids, view.controls[1:-1]) if i in kept)  # Recycled, not rebuilt
+    assert len(built) < 20 + len(ids)
+
+
+def test_offscreen_append_only_grows_spacer():
+    built = []
+    view = _list(built)
+    view.set_messages([{"id": i, "content": "hi"} for i in range(100)])
+    _scroll(view, 0)
+    before = list(built)
+
+    view.append([{"id": 100, "content": "new"}])
+    assert built == before and view.controls[-1].height > 0
+
+    view.append([{"id": 101, "content": "mine"}], follow=True)
+    assert _ids(view)[-1] == 101
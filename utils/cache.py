@@ -0,0 +1,220 @@
+"""
+Process-level read-through caches (TTL + LRU).
+Shared by every Flet session in the server process. Write paths invalidate
+the keys they touch; realtime changes are applied through invalidate_for_change().
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable
+
+from config import config
+
+MISSING = object()  # sentinel: "not cached" (None is a valid cached value)
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire `ttl` seconds after being stored."""
+
+    def __init__(self, name: str, ttl: float, maxsize: int = 1024):
+        self.name = name
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = MISSING) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """Return the cached value or call loader() and cache its result (exceptions are not cached)."""
+        value = self.get(key)
+        if value is MISSING:
+            value = loader()
+            self.set(key, value)
+        return value
+
+    def contains(self, key: Hashable) -> bool:
+        return self.get(key) is not MISSING
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def invalidate_where(self, predicate: Callable[[Hashable], bool]):
+        with self._lock:
+            for key in [k for k in self._data if predicate(k)]:
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            }
+
+
+class SignedUrlCache:
+    """
+    Signed Storage URLs keyed by (bucket, path, expires_in).
+    A URL is served until it is within refresh_margin of expiry ("stale": still valid, caller
+    should re-sign in the background) and dropped once it is within hard_margin of expiry.
+    """
+
+    def __init__(self, maxsize: int = 2048, refresh_fraction: float = 0.2, hard_margin: float = 5.0):
+        self.maxsize = maxsize
+        self.refresh_fraction = refresh_fraction
+        self.hard_margin = hard_margin
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key -> (url, expires_at, refresh_at)
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, key: Hashable):
+        """(url, stale) for a usable entry, or (None, False)."""
+        now = time.time()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                url, expires_at, refresh_at = entry
+                if now < expires_at - self.hard_margin:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return url, now >= refresh_at
+                del self._data[key]
+            self.misses += 1
+            return None, False
+
+    def put(self, key: Hashable, url: str, expires_in: float):
+        now = time.time()
+        margin = max(self.hard_margin * 2, expires_in * self.refresh_fraction)
+        with self._lock:
+            self._data[key] = (url, now + expires_in, now + expires_in - margin)
+            self._data.move_to_end(key)
+            self._refreshing.discard(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def claim_refresh(self, key: Hashable) -> bool:
+        """True for exactly one caller per stale key, so a burst of reads triggers one re-sign."""
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            return True
+
+    def release_refresh(self, key: Hashable):
+        with self._lock:
+            self._refreshing.discard(key)
+
+    def invalidate_path(self, bucket: str, path: str):
+        with self._lock:
+            for key in [k for k in self._data if k[0] == bucket and k[1] == path]:
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"size": len(self._data), "hits": self.hits, "misses": self.misses}
+
+
+def role_key(channel_id, user_id):
+    # Callers pass channel ids as int or str; normalise so both hit the same entry
+    return (str(channel_id), str(user_id))
+
+
+# role_key(channel_id, user_id) -> role or None (not a member)
+role_cache = TTLCache("channel_roles", ttl=config.ROLE_CACHE_TTL, maxsize=4096)
+# str(channel_id) -> chat_categories rows
+category_cache = TTLCache("chat_categories", ttl=config.CATEGORY_CACHE_TTL, maxsize=512)
+# str(channel_id) -> [{id, full_name}] of channel members
+profile_cache = TTLCache("channel_profiles", ttl=config.PROFILE_CACHE_TTL, maxsize=512)
+# str(topic_id) -> {id, created_by, channel_id}
+topic_meta_cache = TTLCache("topic_meta", ttl=config.CATEGORY_CACHE_TTL, maxsize=4096)
+# (str(channel_id), year, month, data version) -> store Roster (services/schedule_service.py), and
+# + ("member" | "none", user_id) -> that caller's scoped Roster; payroll / staff events hang off it
+schedule_cache = TTLCache("schedule", ttl=config.SCHEDULE_CACHE_TTL, maxsize=256)
+
+_ALL_CACHES = [role_cache, category_cache, profile_cache, topic_meta_cache, schedule_cache]
+
+# (bucket, path, expires_in) -> signed download URL (upload URLs are single-use and never cached)
+signed_url_cache = SignedUrlCache()
+
+
+def invalidate_channel_members(channel_id, user_id=None):
+    """Membership / role change: drop the role entry (or the whole channel) and the member profile list."""
+    if user_id is not None:
+        role_cache.invalidate(role_key(channel_id, user_id))
+    else:
+        role_cache.invalidate_where(lambda k: k[0] == str(channel_id))
+    profile_cache.invalidate(str(channel_id))
+
+
+def invalidate_schedule(channel_id=None):
+    """Contracts / work schedules changed in this process: drop the channel's rosters (all if None)."""
+    if channel_id is None:
+        schedule_cache.clear()
+    else:
+        schedule_cache.invalidate_where(lambda k: k[0] == str(channel_id))
+
+
+def invalidate_for_change(payload: Dict[str, Any]):
+    """Apply a realtime postgres_changes payload (see services/realtime_hub.py) to the caches."""
+    data = (payload or {}).get("data") or {}
+    table = data.get("table")
+    row = data.get("record") or data.get("old_record") or {}
+
+    if table == "channel_members":
+        if row.get("channel_id") is not None:
+            invalidate_channel_members(row["channel_id"], row.get("user_id"))
+        else:
+            role_cache.clear()  # DELETE payloads may only carry the primary key
+            profile_cache.clear()
+    elif table == "chat_categories":
+        if row.get("channel_id") is not None:
+            category_cache.invalidate(str(row["channel_id"]))
+        else:
+            category_cache.clear()
+    elif table == "profiles":
+        profile_cache.clear()
+    elif table == "chat_topics" and row.get("id") is not None:
+        topic_meta_cache.invalidate(str(row["id"]))
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    stats = {c.name: c.stats() for c in _ALL_CACHES}
+    stats["signed_urls"] = signed_url_cache.stats()
+    return stats
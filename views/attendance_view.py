@@ -6,10 +6,14 @@ from views.styles import AppColors, AppLayout, AppTextStyles, AppButtons, AppGra
 from views.components.app_header import AppHeader
 from services.attendance_service import attendance_service
 from services.channel_service import channel_service
+from services.poll_scheduler import poll_scheduler
 from db import service_supabase
 import json
 import math
 
+async def _clock_tick():
+    return datetime.now().strftime("%H:%M:%S")
+
 class SelectableCard(ft.Container):
     def __init__(self, label, icon, value, selected=False, on_change=None):
         super().__init__()
@@ -73,9 +77,6 @@ async def get_attendance_controls(page: ft.Page, navigate_to):
     channel_id = page.app_session.get("channel_id")
     user_role = page.app_session.get("role") or "staff"
 
-    # Task tracking for cleanup
-    _running_tasks = []
-
     # Get Channel Settings (auth_mode, location) - Non-blocking
     channel_auth_mode = "location"  # default
     channel_lat, channel_lng = None, None
@@ -211,23 +212,13 @@ async def get_attendance_controls(page: ft.Page, navigate_to):
         except Exception as log_err:
             print(f"Log Update Error: {log_err}")
 
-    # Cancellation flag for background tasks
-    _view_active = {"active": True}
+    # [OPTIMIZATION] One process-wide 1s clock tick shared by every open attendance view.
+    # Released on unmount (and by Router.navigate_to / session close for this page).
+    def update_time(now_str):
+        time_text.value = now_str
+        time_text.update()
 
-    async def update_time():
-        """Update time display - with proper cancellation"""
-        while _view_active["active"]:
-            try:
-                now = datetime.now()
-                time_text.value = now.strftime("%H:%M:%S")
-                time_text.update()
-            except Exception:
-                break  # Control destroyed, exit gracefully
-            await asyncio.sleep(1)
-
-    # Store task references for potential cleanup
-    time_task = asyncio.create_task(update_time())
-    _running_tasks.append(time_task)
+    clock_token = poll_scheduler.register("clock", _clock_tick, update_time, owner=page, interval=1.0, backoff=1.0)
 
     # Load logs using prefetched data
     await update_logs(prefetched_logs=initial_logs)
@@ -558,6 +549,7 @@ async def get_attendance_controls(page: ft.Page, navigate_to):
         )
     ], spacing=0, expand=True)
 
-    return [
-        ft.SafeArea(expand=True, content=content)
-    ]
+    root = ft.SafeArea(expand=True, content=content)
+    root.will_unmount = lambda e=None: poll_scheduler.unregister(clock_token)
+
+    return [root]
@@ -5,6 +5,8 @@ import re
 import urllib.parse
 import asyncio
 from services import calendar_service
+from services.schedule_service import schedule_service
+from services.schedule_engine import staff_events
 from services.chat_service import get_storage_signed_url, get_public_url, upload_file_server_side
 import os
 from utils.logger import log_debug, log_error, log_info
@@ -12,7 +14,10 @@ from views.styles import AppColors, AppLayout, AppTextStyles
 from views.components.app_header import AppHeader
 from views.components.modal_overlay import ModalOverlay
 import threading
-from db import supabase
+from db import service_supabase
+from services.realtime_hub import realtime_hub
+from utils.cache import TTLCache, invalidate_schedule, MISSING
+from config import config
 
 class ThreadSafeState:
     def __init__(self):
@@ -84,203 +89,66 @@ async def get_calendar_controls(page: ft.Page, navigate_to):
     
     # Staff Schedule Generator
     async def generate_staff_events(year, month):
-        client = None
-        try:
-            from postgrest import SyncPostgrestClient
-            import os
-            from services.auth_service import auth_service
+        if not current_user_id: return []
 
-            headers = auth_service.get_auth_headers()
-            if not headers: return []
-            url = os.environ.get("SUPABASE_URL")
-            if not url: return []
+        # [OPTIMIZATION] Shared Roster (services/schedule_service.py): same fetch, parsing and cache as payroll.
+        # The Roster is scoped to this user (owner: all contracts, staff: own), so are its staff events.
+        roster = await asyncio.wait_for(schedule_service.get_roster(channel_id, year, month, current_user_id), timeout=10)
+        return await asyncio.to_thread(roster.derive, "staff_events", staff_events)
 
-            client = SyncPostgrestClient(f"{url}/rest/v1", headers=headers, schema="public", timeout=20)
+    # [RBAC] Get User from Session
+    current_user_id = page.app_session.get("user_id")
 
-            # [OPTIMIZATION] Parallel Fetching
-            contract_task = asyncio.to_thread(lambda: client.from_("labor_contracts").select("*").eq("channel_id", channel_id).execute())
-            
-            start_iso = f"{year}-{month:02d}-01T00:00:00"
-            last_day = calendar.monthrange(year, month)[1]
-            end_iso = f"{year}-{month:02d}-{last_day}T23:59:59"
-            
-            override_task = asyncio.to_thread(lambda: client.from_("calendar_events")
-                                           .select("*")
-                                           .eq("is_work_schedule", True)
-                                           .gte("start_date", start_iso)
-                                           .lte("start_date", end_iso)
-                                           .eq("channel_id", channel_id)
-                                           .execute())
-            
-            # Run both tasks in parallel with 10s timeout
-            c_res, o_res = await asyncio.gather(
-                asyncio.wait_for(contract_task, timeout=10),
-                asyncio.wait_for(override_task, timeout=10),
-                return_exceptions=True
-            )
-            
-            if isinstance(c_res, Exception):
-                log_error(f"Contract Fetch Error: {c_res}")
-                contracts = []
-            else:
-                contracts = c_res.data or []
-                
-            if isinstance(o_res, Exception):
-                log_error(f"Override Fetch Error: {o_res}")
-                overrides = []
-            else:
-                overrides = o_res.data or []
-        except Exception as ex:
-            log_error(f"Calendar Staff Fetch Error: {ex}")
-            return []
-        finally:
-            # [CRITICAL FIX] 리소스 누수 방지 - HTTP 클라이언트 정리
-            if client:
-                try:
-                    client.session.close()
-                except Exception:
-                    pass
-
-        # Map overrides by [employee_id][day]
-        override_map = {}
-        for o in overrides:
-            eid = o.get('employee_id')
-            if not eid: continue
-            try:
-                # Handle ISO string from DB (might be with or without Z/TZ)
-                d_str = o['start_date'].split('T')[0]
-                day = int(d_str.split('-')[-1])
-                if eid not in override_map: override_map[eid] = {}
-                override_map[eid][day] = o
-            except (ValueError, KeyError, IndexError):
-                pass  # Invalid date format
-
-        events = []
-        days_in_month = calendar.monthrange(year, month)[1]
-        
-        # 1. Map contracts by name -> list of contracts (history)
-        name_to_history = {}
-        eid_to_name = {}
-        for c in contracts:
-            name = c.get('employee_name', 'Unknown').strip()
-            eid_to_name[c['id']] = name
-            if name not in name_to_history: name_to_history[name] = []
-            name_to_history[name].append(c)
-
-        for name in name_to_history:
-            name_to_history[name].sort(key=lambda x: x.get('created_at', ''), reverse=True)
-
-        # 2. Map overrides by name -> day -> override
-        # Use name as the key to consolidate overrides from different contract IDs of the same person
-        name_day_overrides = {}
-        for o in overrides:
-            eid = o.get('employee_id')
-            name = eid_to_name.get(eid)
-            if not name:
-                # Fallback: parse name from title if orphaned
-                title = o.get('title', '')
-                # Strictly require an ledger emoji for orphaned entries
-                if '⭐' in title: name = title.split('(')[0].replace('⭐', '').strip()
-                elif '❌' in title: name = title.replace('❌', '').replace('결근', '').strip()
-                elif '🟢' in title: name = title.split('(')[0].replace('🟢', '').strip()
-                elif '🔥' in title: name = title.split('(')[0].replace('🔥', '').strip()
-                else: continue # SKIP Ghost/Legacy data
-            
-            name = name.strip()
-            if name not in name_day_overrides: name_day_overrides[name] = {}
-            try:
-                day = int(o['start_date'].split('T')[0].split('-')[-1])
-                # If multiple overrides for same name/day, keep latest created?
-                # (usually there's only one, but let's be safe)
-                old_o = name_day_overrides[name].get(day)
-                if not old_o or (o.get('created_at', '') > old_o.get('created_at', '')):
-                    name_day_overrides[name][day] = o
-            except (ValueError, KeyError, IndexError):
-                pass  # Invalid date format
-
-        all_names = set(name_to_history.keys()) | set(name_day_overrides.keys())
-
-        for name in all_names:
-            history = name_to_history.get(name, [])
-            
-            for day in range(1, days_in_month + 1):
-                date_obj = datetime(year, month, day)
-                weekday = date_obj.weekday()
-                
-                # A. Check for Override (Actual)
-                o = name_day_overrides.get(name, {}).get(day)
-                if o:
-                    try:
-                        st = o['start_date'].split('T')[1][:5]
-                        et = o['end_date'].split('T')[1][:5]
-                    except: st, et = "??", "??"
-                    
-                    is_absence = (st == et == "00:00")
-                    
-                    # Determine color based on contract presence
-                    valid_c_for_day = None
-                    for h in history:
-                        sd = h.get('contract_start_date')
-                        ed = h.get('contract_end_date')
-                        if sd and datetime.strptime(sd, "%Y-%m-%d") > date_obj: continue
-                        if ed and datetime.strptime(ed, "%Y-%m-%d") < date_obj: continue
-                        # Check if this weekday is in contract schedule
-                        if str(weekday) in h.get('work_schedule', {}):
-                            valid_c_for_day = h
-                            break
-                    
-                    final_color = o.get('color')
-                    if not final_color:
-                        final_color = "green"
-                        if is_absence: final_color = "red"
-                        elif not valid_c_for_day: final_color = "blue"
-
-                    events.append({
-                        "id": o['id'],
-                        "title": o.get('title', f"⭐ {name} ({st}~{et})"),
-                        "start_date": o['start_date'],
-                        "end_date": o['end_date'],
-                        "color": final_color,
-                        "is_virtual": False,
-                        "employee_id": o['employee_id'], # Keep original eid link
-                        "employee_name": name,
-                        "memo": o.get('memo')
-                    })
-
-                # B. Check for Contract Default (Baseline)
-                # Only show baseline if it's currently valid for the date
-                valid_c = None
-                for h in history:
-                    sd = h.get('contract_start_date')
-                    ed = h.get('contract_end_date')
-                    if sd and datetime.strptime(sd, "%Y-%m-%d") > date_obj: continue
-                    if ed and datetime.strptime(ed, "%Y-%m-%d") < date_obj: continue
-                    valid_c = h
-                    break
-                
-                if valid_c:
-                    ws = valid_c.get('work_schedule', {})
-                    if str(weekday) in ws:
-                        times = ws[str(weekday)]
-                        start_t = times.get('start', '09:00')
-                        end_t = times.get('end', '18:00')
-                        events.append({
-                            "id": f"virtual_{valid_c['id']}_{day}",
-                            "title": f"{name} ({start_t}~{end_t})",
-                            "start_date": f"{year}-{month:02d}-{day:02d}T{start_t}:00",
-                            "end_date": f"{year}-{month:02d}-{day:02d}T{end_t}:00",
-                            "color": "orange",
-                            "is_virtual": True,
-                            "employee_id": valid_c['id'],
-                            "employee_name": name
-                        })
+    # [OPTIMIZATION] Store calendar month buckets: (year, month) -> events, LRU-bounded; neighbours are prefetched.
+    # Staff months come from the version-checked roster cache (schedule_service), which the prefetch warms.
+    month_buckets = TTLCache("calendar_months", ttl=config.CALENDAR_MONTH_CACHE_TTL, maxsize=config.CALENDAR_MONTH_BUCKETS)
+    month_fetches = {}  # Same key -> in-flight fetch task (a swipe awaits the prefetch instead of refetching)
+    state["month_gen"] = 0  # Bumped on invalidation; fetches started before it are not stored
+
+    async def fetch_into_bucket(key):
+        gen = state["month_gen"]
+        # [TIMEOUT SAFETY] 10s limit
+        events = await asyncio.wait_for(calendar_service.get_month_events(current_user_id, channel_id, *key), timeout=10)
+        if gen == state["month_gen"]:  # Not invalidated while fetching
+            month_buckets.set(key, events)
         return events
 
-    # [RBAC] Get User from Session
-    current_user_id = page.app_session.get("user_id")
+    async def get_month(cal_type, year, month):
+        if cal_type == "staff":
+            return await generate_staff_events(year, month)
+        key = (year, month)
+        cached = month_buckets.get(key)
+        if cached is not MISSING:
+            return cached
+        task = month_fetches.get(key)
+        if task is None:
+            task = asyncio.create_task(fetch_into_bucket(key))
+            month_fetches[key] = task
+            task.add_done_callback(lambda t, k=key: month_fetches.pop(k, None) if month_fetches.get(k) is t else None)
+        return await task
+
+    def shift_month(year, month, delta):
+        month += delta
+        return year + (month - 1) // 12, (month - 1) % 12 + 1
+
+    async def prefetch_neighbours(cal_type, year, month):
+        months = [shift_month(year, month, delta) for delta in (1, -1)]
+        results = await asyncio.gather(*[get_month(cal_type, y, m) for y, m in months], return_exceptions=True)
+        for (y, m), res in zip(months, results):
+            if isinstance(res, Exception):
+                log_debug(f"Calendar prefetch {y}-{m:02d} skipped: {res}")
+
+    def invalidate_months():
+        state["month_gen"] = state["month_gen"] + 1
+        month_buckets.clear()
+        month_fetches.clear()
+
     # For robust MVP, allow view but require login
-    async def load(e=None):
+    async def load(e=None, refresh=True):
+        """refresh=True (edits, refresh button) drops cached months; navigation reuses them."""
         log_debug("load() called - scheduling load_async")
+        if refresh:
+            invalidate_months()
         await load_async()
         
     async def load_async():
@@ -289,16 +157,17 @@ async def get_calendar_controls(page: ft.Page, navigate_to):
             log_debug("No current_user_id")
             return
             
+        stale = False
         try:
-            if current_cal_type == "store":
-                log_debug("Fetching store events...")
-                # [TIMEOUT SAFETY] 10s limit
-                view_state["events"] = await asyncio.wait_for(calendar_service.get_all_events(current_user_id, channel_id), timeout=10)
-                log_debug(f"Store events fetched: {len(view_state['events'])}")
-            elif current_cal_type == "staff":
-                log_debug("Fetching staff events...")
-                view_state["events"] = await generate_staff_events(view_state["year"], view_state["month"])
-                log_debug(f"Staff events fetched: {len(view_state['events'])}")
+            cal_type, y, m = current_cal_type, view_state["year"], view_state["month"]
+            log_debug(f"Fetching {cal_type} events for {y}-{m:02d}...")
+            events = await get_month(cal_type, y, m)
+            if (cal_type, y, m) != (current_cal_type, view_state["year"], view_state["month"]):
+                stale = True  # Navigated away meanwhile; the newer load renders
+                return
+            view_state["events"] = events
+            log_debug(f"{cal_type} events fetched: {len(events)}")
+            asyncio.create_task(prefetch_neighbours(cal_type, y, m))
             
             log_debug("Fetch complete. Success.")
         except asyncio.TimeoutError:
@@ -314,9 +183,10 @@ async def get_calendar_controls(page: ft.Page, navigate_to):
                 page.update()
             except: pass
         finally:
-            log_debug("Calling build() and update_page() in finally block")
-            await build()
-            update_page()
+            if not stale:
+                log_debug("Calling build() and update_page() in finally block")
+                await build()
+                update_page()
             log_debug("load_async exit")
 
     # Removed dialog_manager setup
@@ -571,7 +441,7 @@ async def get_calendar_controls(page: ft.Page, navigate_to):
                     await calendar_service.delete_event(ev['id'], current_user_id)
                     page.open(ft.SnackBar(ft.Text("삭제되었습니다."), bgcolor="green"))
                     overlay.close()
-                    load()
+                    await load()
                     update_page()
                 except Exception as ex:
                     page.open(ft.SnackBar(ft.Text(f"삭제 실패: {ex}"), bgcolor="red")); update_page()
@@ -644,22 +514,13 @@ async def get_calendar_controls(page: ft.Page, navigate_to):
 
     async def delete_staff_event(ev_id):
         from services.auth_service import auth_service
-        from postgrest import SyncPostgrestClient
-        client = None
-        try:
-            headers = auth_service.get_auth_headers()
-            if not headers: return
-            if "apikey" not in headers: headers["apikey"] = os.environ.get("SUPABASE_KEY")
-            url = os.environ.get("SUPABASE_URL")
-            if not url: return
-            client = SyncPostgrestClient(f"{url}/rest/v1", headers=headers, schema="public", timeout=20)
-            await asyncio.to_thread(lambda: client.from_("calendar_events").delete().eq("id", ev_id).execute())
-        finally:
-            if client:
-                try:
-                    client.session.close()
-                except Exception:
-                    pass
+        headers = auth_service.get_auth_headers()
+        if not headers: return
+        if "apikey" not in headers: headers["apikey"] = os.environ.get("SUPABASE_KEY")
+        client = service_supabase.get_user_client(headers)
+        await asyncio.to_thread(lambda: client.from_("calendar_events").delete().eq("id", ev_id).execute())
+        invalidate_schedule(channel_id)
+        invalidate_months()
 
     
     async def open_staff_day_ledger(day):
@@ -787,7 +648,7 @@ async def get_calendar_controls(page: ft.Page, navigate_to):
                     else: await calendar_service.create_event(data)
                     page.open(ft.SnackBar(ft.Text("저장 완료!")))
                     overlay.close()
-                    load()
+                    await load()
                     update_page()
                 except Exception as ex:
                     page.open(ft.SnackBar(ft.Text(f"오류: {ex}"), bgcolor="red")); update_page()
@@ -820,7 +681,7 @@ async def get_calendar_controls(page: ft.Page, navigate_to):
         view_state["month"] += delta
         if view_state["month"] > 12: view_state["month"]=1; view_state["year"]+=1
         elif view_state["month"] < 1: view_state["month"]=12; view_state["year"]-=1
-        await load()
+        await load(refresh=False)  # Prefetched month: no fetch
 
     async def on_swipe(e: ft.DragEndEvent):
         # Velocity-based horizontal swipe detection
@@ -836,7 +697,7 @@ async def get_calendar_controls(page: ft.Page, navigate_to):
         now = datetime.now()
         view_state["year"] = now.year
         view_state["month"] = now.month
-        asyncio.create_task(load())
+        asyncio.create_task(load(refresh=False))
 
     def open_event_dialog():
         open_event_editor_dialog(datetime.now().day)
@@ -861,7 +722,7 @@ async def get_calendar_controls(page: ft.Page, navigate_to):
         
         # 2. Update label and load data
         month_label.value = f"{view_state['year']}년 {view_state['month']}월"
-        await load()
+        await load(refresh=False)
 
     def build_drawer():
         print("DEBUG_CAL: build_drawer start")
@@ -968,73 +829,6 @@ async def get_calendar_controls(page: ft.Page, navigate_to):
             except Exception:
                 pass  # Logging failed
 
-    async def realtime_handler():
-        print(f"DEBUG_CAL: Handler started for CID={channel_id}, UID={current_user_id}")
-        log_info("CALENDAR_SYNC: Handler started.")
-        
-        async def polling_loop():
-            print("DEBUG_CAL: Polling loop started.")
-            log_info("CALENDAR_SYNC: Polling loop started.")
-            while state["is_active"]:
-                try:
-                    await asyncio.sleep(5)
-                    if state["is_active"]:
-                        # print("DEBUG_CAL: Polling tick.")
-                        # [FIX] Disable polling to prevent Event Loop Starvation
-                        # asyncio.create_task(load_async())
-                        pass
-                except Exception as e:
-                    print(f"DEBUG_CAL: Polling error: {e}")
-                    await asyncio.sleep(10)
-
-        async def connection_loop():
-            log_info("CALENDAR_SYNC: Connection loop started.")
-            while state["is_active"]:
-                try:
-                    rt = supabase.get_realtime_client()
-                    if not rt:
-                        log_error("CALENDAR_SYNC: Realtime client not available.")
-                        await asyncio.sleep(60)
-                        continue
-                    
-                    await rt.connect()
-                    # Use a generic channel name for now to ensure connectivity
-                    chan_name = f"cal_realtime_{channel_id}"
-                    channel = rt.channel(chan_name)
-                    
-                    async def on_change(payload):
-                        log_info(f"CALENDAR_SYNC [RT]: {payload.get('eventType')} detected! Reloading UI.")
-                        asyncio.create_task(load_async())
-
-                    channel.on_postgres_changes(
-                        event="*",
-                        schema="public",
-                        table="calendar_events",
-                        # Removing filter temporarily for maximum compatibility
-                        callback=on_change
-                    )
-                    
-                    await channel.subscribe()
-                    print(f"DEBUG_CAL: Subscribed successfully to {chan_name}")
-                    log_info(f"CALENDAR_SYNC [RT]: Subscribed to {chan_name}")
-                    
-                    while state["is_active"]:
-                        if hasattr(page, "is_running") and not page.is_running:
-                            state["is_active"] = False
-                            break
-                        await asyncio.sleep(10)
-                except Exception as e:
-                    print(f"DEBUG_CAL: RT ERROR: {e}")
-                    log_error(f"CALENDAR_SYNC [RT] ERROR: {e}")
-                    await asyncio.sleep(30)
-                finally:
-                    try: 
-                        if rt: await rt.disconnect()
-                    except: pass
-        
-        # Run both for maximum reliability
-        await asyncio.gather(polling_loop(), connection_loop())
-
     def on_nav_away(e):
         log_info("CALENDAR: Navigating away, stopping realtime.")
         state["is_active"] = False
@@ -1043,16 +837,32 @@ async def get_calendar_controls(page: ft.Page, navigate_to):
     # but more simply we rely on the loop check for page.is_running.
 
     asyncio.create_task(initial_load_delayed())
-    # Register the realtime task properly
-    rt_task = asyncio.create_task(realtime_handler())
+    # Changes arrive through realtime_hub (see on_calendar_mount); the old no-op 5s poller is gone.
+
+    # [OPTIMIZATION] One shared socket per process; this view only hears its own channel's events
+    def on_calendar_change(payload):
+        log_info(f"CALENDAR_SYNC [RT]: {(payload.get('data') or {}).get('type')} detected! Reloading UI.")
+        if state["is_active"]:
+            asyncio.create_task(load())
+
+    async def subscribe_realtime():
+        token = await realtime_hub.subscribe("calendar_events", "channel_id", channel_id, on_calendar_change)
+        if not state["is_active"]:
+            await realtime_hub.unsubscribe(token)  # Unmounted while subscribing
+            return
+        state["rt_token"] = token
+
+    def on_calendar_mount(e=None):
+        asyncio.create_task(subscribe_realtime())
 
     # Simple cleanup logic when view is logically destroyed
-    def cleanup():
+    def cleanup(e=None):
         log_info("CALENDAR: Performing cleanup...")
         state["is_active"] = False
-    
-    # We can't easily hook into view destruction in Flet without complex route logic, 
-    # but the loop in realtime_handler checks page.is_running.
+        token = state.get("rt_token")
+        state["rt_token"] = None
+        if token:
+            asyncio.create_task(realtime_hub.unsubscribe(token))
 
     print("DEBUG_CAL: Building main UI layout")
     # [FAUX STACK WRAPPER]
@@ -1082,4 +892,6 @@ async def get_calendar_controls(page: ft.Page, navigate_to):
     ], expand=True, spacing=0)
 
     final_stack = ft.Stack([ft.SafeArea(expand=True, content=main_layout), overlay], expand=True)
+    final_stack.did_mount = on_calendar_mount
+    final_stack.will_unmount = cleanup
     return [final_stack]
@@ -2,16 +2,23 @@
 import datetime
 from datetime import datetime as dt_class, timezone
 import threading
+import time
 import asyncio
 from services import storage_service
 from services import chat_service
-from db import supabase, service_supabase, app_logs, log_info
+from services.realtime_hub import realtime_hub
+from services.poll_scheduler import poll_scheduler
+from services.upload_pipeline import upload_pipeline
+from db import service_supabase, app_logs, log_info
 from views.styles import AppColors, AppTextStyles, AppLayout
 from views.components.app_header import AppHeader
+from config import config
 
 
 from utils.logger import log_info as file_log_info
+from utils.cache import invalidate_for_change
 from views.components.modal_overlay import ModalOverlay
+from views.components.virtual_message_list import VirtualMessageList
 
 class ThreadSafeState:
     """[SECURITY] Thread-safe state management to prevent race conditions."""
@@ -24,6 +31,9 @@ class ThreadSafeState:
             "view_mode": "list",
             "pending_image_url": None,
             "pending_file_name": None,
+            "pending_variants": {},       # {"thumb_url", "preview_url"} of the pending image
+            "pending_upload": None,       # asyncio.Task -> media dict (native background upload)
+            "pending_direct": None,       # {"storage_name", "public_url"} of a browser -> Storage PUT
             "is_active": True,
             "selection_mode": False,
             "selected_ids": set(),
@@ -32,6 +42,9 @@ class ThreadSafeState:
             "scrolled_to_unread": False,
             "topic_id_for_unread": None,
             "last_loaded_msg_id": None,
+            "oldest_loaded_msg": None,
+            "has_more_history": True,
+            "is_loading_older": False,
             "is_loading_messages": False,
             "is_loading_topics": False,
             "selected_topic_ids": set()
@@ -78,7 +91,7 @@ async def get_chat_controls(page: ft.Page, navigate_to):
     
     file_log_info("Entering Chat View (get_chat_controls)")
     # [FIX] Stability: Use Global FilePicker and Robust Lifecycle Management
-    from views.components.chat_bubble import ChatBubble
+    from views.components.chat_bubble import BubbleFactory
 
     # [SECURITY] Thread-safe state management
     state = ThreadSafeState()
@@ -129,7 +142,7 @@ async def get_chat_controls(page: ft.Page, navigate_to):
 
     async def scroll_to_bottom_manual(e):
         try:
-            await message_list_view.scroll_to_async(offset=-1, duration=500) if hasattr(message_list_view, "scroll_to_async") else message_list_view.scroll_to(offset=-1, duration=500)
+            await message_list_view.scroll_to_end(duration=500)
             floating_new_msg_container.visible = False
             floating_new_msg_container.update()
             
@@ -156,13 +169,29 @@ async def get_chat_controls(page: ft.Page, navigate_to):
                     # file_log_info(f"SCROLL: Reached bottom of {tid}. Marking as read.")
                     asyncio.create_task(mark_read_and_refresh(tid, uid))
             
+        # [OPTIMIZATION] Infinite scroll-back: near the top, prepend the next older page
+        if e.pixels < 100 and state.get("scrolled_to_unread") and state.get("has_more_history") and not state.get("is_loading_older"):
+            asyncio.create_task(load_older_messages_async())
+
         # If user reached bottom, hide floating button
         if state["is_near_bottom"] and floating_new_msg_container.visible:
             floating_new_msg_container.visible = False
             if floating_new_msg_container.page:
                 floating_new_msg_container.update()
 
-    message_list_view = ft.ListView(
+    # [OPTIMIZATION] Bubbles are built once per message and reused across list rebuilds
+    bubble_factory = BubbleFactory(
+        current_user_id,
+        on_select=lambda mid, val: on_msg_select(mid, val),
+        on_image_click=lambda src: show_image_viewer(src)
+    )
+
+    def make_bubble(m):
+        return bubble_factory.get(m, bool(state.get("selection_mode")))
+
+    # [OPTIMIZATION] Windowed list: only visible bubbles (+ overscan) are live controls
+    message_list_view = VirtualMessageList(
+        make_bubble,
         expand=True, 
         spacing=5, 
         padding=10, 
@@ -317,7 +346,8 @@ async def get_chat_controls(page: ft.Page, navigate_to):
             
             # [OPTIMIZATION] Fetch unread counts (could also be gathered if we had topics earlier, but they depend on topics)
             unread_counts = await asyncio.wait_for(asyncio.to_thread(chat_service.get_unread_counts, uid, topics), timeout=10)
-            log_info(f"Unreads for {uid}: {sum(unread_counts.values()) if unread_counts else 0}")
+            state["unread_total"] = sum(unread_counts.values()) if unread_counts else 0
+            log_info(f"Unreads for {uid}: {state['unread_total']}")
 
             new_controls = []
             if state["edit_mode"]:
@@ -913,6 +943,150 @@ async def get_chat_controls(page: ft.Page, navigate_to):
             page.update()
     # [FIX] Render ID to prevent race conditions in fast reloads
     render_context = {"last_id": 0}
+    MESSAGE_PAGE_SIZE = 30
+
+    def on_msg_select(mid, val):
+        if val: state.add_selected(mid)
+        else: state.remove_selected(mid)
+
+    def fetch_signed(fetch, *args):
+        """Run a message fetch and sign the page's attachments in one batch (worker thread)."""
+        return chat_service.sign_message_attachments(fetch(*args))
+
+    async def load_older_messages_async():
+        """Prepend the page just older than the oldest loaded message (keyset cursor)."""
+        tid = state.get("current_topic_id")
+        cursor = state.get("oldest_loaded_msg")
+        if not tid or not cursor or state.get("is_loading_older"):
+            return
+        state["is_loading_older"] = True
+        try:
+            older = await asyncio.wait_for(asyncio.to_thread(
+                fetch_signed, chat_service.get_messages, tid, MESSAGE_PAGE_SIZE, cursor["id"], cursor["created_at"]
+            ), timeout=10)
+            if tid != state.get("current_topic_id"):
+                return  # Room changed while loading
+            if len(older) < MESSAGE_PAGE_SIZE:
+                state["has_more_history"] = False
+            if not older:
+                return
+
+            message_list_view.prepend(older)
+            state["oldest_loaded_msg"] = {"id": older[0]["id"], "created_at": older[0]["created_at"]}
+            message_list_view.update()
+        except asyncio.TimeoutError:
+            log_info("DEBUG_CHAT: Timeout loading older messages.")
+        except Exception as ex:
+            log_info(f"DEBUG_CHAT: Older messages error: {ex}")
+        finally:
+            state["is_loading_older"] = False
+
+    async def append_new_messages(new_msgs):
+        """Append rows to the open room (delta fetch or realtime payload), skipping ones already shown."""
+        present = {str(m.get("id")) for m in message_list_view.messages}
+        new_msgs_to_append = [m for m in new_msgs if str(m.get("id")) not in present]
+        if not new_msgs_to_append:
+            return
+
+        # Scroll logic for new messages
+        # If it's my message, scroll. If others, show indicator.
+        is_me = (new_msgs_to_append[-1].get("user_id") == current_user_id)
+        follow = is_me or state.get("is_near_bottom")
+
+        # Optimistic bubbles are replaced by the stored rows
+        if any(str(m.get("user_id")) == str(current_user_id) for m in new_msgs_to_append):
+            message_list_view.remove_where(lambda m: m.get("is_sending"))
+        message_list_view.append(new_msgs_to_append, follow=follow)
+
+        # [FIX] Advance the delta cursor here too, so rows delivered by realtime are not fetched again
+        # (a row realtime skipped is caught by the periodic reconcile in load_messages_async)
+        stored_ids = []
+        for m in new_msgs_to_append:
+            try:
+                stored_ids.append(int(m.get("id")))
+            except (TypeError, ValueError):
+                pass  # Optimistic placeholder
+        cursor = state.get("last_loaded_msg_id")
+        if stored_ids and (cursor is None or max(stored_ids) > int(cursor)):
+            state["last_loaded_msg_id"] = max(stored_ids)
+
+        # [FIX] Update UI first so client has the items to scroll to
+        try:
+            message_list_view.update()
+        except:
+            pass
+
+        if follow:
+            # If user is already reading at bottom, just scroll
+            try:
+                await message_list_view.scroll_to_end(duration=200)
+            except: pass
+        else:
+            floating_new_msg_container.visible = True
+            floating_new_msg_container.update()
+
+    async def apply_realtime_message(record):
+        """
+        [OPTIMIZATION] Apply a realtime INSERT payload directly as an append (no query).
+        Falls back to a delta fetch only when the sender's profile is not on screen yet.
+        """
+        tid = state.get("current_topic_id")
+        if not record or not tid or str(record.get("topic_id")) != str(tid):
+            return  # Other rooms only affect badges (topic refresh)
+        if state.get("last_loaded_msg_id") is None:
+            return  # First page still loading; it will include this row
+
+        profile = next((
+            m.get("profiles") for m in reversed(message_list_view.messages)
+            if not m.get("is_sending") and m.get("profiles")
+            and str(m.get("user_id")) == str(record.get("user_id"))
+        ), None)
+        if not profile:
+            load_messages()
+            return
+        await append_new_messages(await asyncio.to_thread(
+            chat_service.sign_message_attachments, [{**record, "profiles": profile}]
+        ))
+
+    async def on_realtime_insert(payload):
+        # The payload already carries the inserted row
+        file_log_info("REALTIME: New Message Detected!")
+        await apply_realtime_message((payload.get("data") or {}).get("record"))
+
+    async def subscribe_topic_realtime(tid):
+        """[OPTIMIZATION] Listen only to the open room, through the process-wide realtime hub."""
+        await unsubscribe_topic_realtime()
+        token = await realtime_hub.subscribe("chat_messages", "topic_id", tid, on_realtime_insert, event="INSERT")
+        if str(state.get("current_topic_id")) != str(tid) or not state.get("is_active") or state.get("rt_token"):
+            await realtime_hub.unsubscribe(token)  # Room changed while subscribing
+            return
+        state["rt_token"] = token
+
+    async def unsubscribe_topic_realtime():
+        token = state.get("rt_token")
+        state["rt_token"] = None
+        if token:
+            await realtime_hub.unsubscribe(token)
+
+    async def subscribe_cache_invalidation():
+        """Drop cached roles / categories of this channel as soon as they change server-side."""
+        if state.get("cache_rt_tokens") or not current_channel_id:
+            return
+        tokens = [
+            await realtime_hub.subscribe(table, "channel_id", current_channel_id, invalidate_for_change)
+            for table in ("channel_members", "chat_categories")
+        ]
+        if not state.get("is_active") or state.get("cache_rt_tokens"):
+            for token in tokens:
+                await realtime_hub.unsubscribe(token)
+            return
+        state["cache_rt_tokens"] = tokens
+
+    async def unsubscribe_cache_invalidation():
+        tokens = state.get("cache_rt_tokens") or []
+        state["cache_rt_tokens"] = None
+        for token in tokens:
+            await realtime_hub.unsubscribe(token)
 
     async def load_messages_async():
         # [FIX] Circuit Breaker: Reset lock if stuck for > 5 seconds
@@ -943,51 +1117,52 @@ async def get_chat_controls(page: ft.Page, navigate_to):
         # print(f"DEBUG_CHAT: [Thread {my_id}] RenderStart. User={render_user_id}, Topic={tid}", flush=True)
 
         try:
-            # [TIMEOUT SAFETY] 10s limit
-            db_messages = await asyncio.wait_for(asyncio.to_thread(chat_service.get_messages, state["current_topic_id"]), timeout=10)
-            
             # [OPTIMIZATION] Incremental Updates
-            # Compare current controls with DB messages to only add new ones
-            existing_controls = message_list_view.controls
-            existing_count = len(existing_controls) if existing_controls else 0
-            db_count = len(db_messages)
-            
-            def on_msg_select(mid, val):
-                if val: state.add_selected(mid)
-                else: state.remove_selected(mid)
+            # Messages already on screen are kept; only rows newer than last_loaded_msg_id are fetched.
+            loaded = [m for m in message_list_view.messages if not m.get("is_sending")]
+            last_loaded_id = state.get("last_loaded_msg_id")
+
+            db_messages = []
+            should_rebuild = True
+            if last_loaded_id is not None and loaded and \
+                    now_ts - state.get("last_reconcile_ts", 0) >= config.CHAT_RECONCILE_INTERVAL:
+                # [FIX] Periodic id-set check: drop rows deleted server-side (retention, other clients);
+                # rows the window never received (missed realtime) reload the latest page
+                state["last_reconcile_ts"] = now_ts
+                diff = await asyncio.wait_for(asyncio.to_thread(
+                    chat_service.reconcile_loaded_messages, tid, [m.get("id") for m in loaded]), timeout=10)
+                if diff["missing"]:
+                    loaded = []
+                elif diff["removed"]:
+                    removed = diff["removed"]
+                    message_list_view.remove_where(lambda m: str(m.get("id")) in removed)
+                    loaded = [m for m in loaded if str(m.get("id")) not in removed]
+                    try:
+                        message_list_view.update()
+                    except:
+                        pass
 
-            # Rebuild if: empty, smaller than before (deletions), or special mode (select/search)
-            is_special = sel_mode or (existing_count > 0 and not isinstance(existing_controls[0], ChatBubble))
-            should_rebuild = existing_count == 0 or db_count < existing_count or is_special
-            
-            # Rebuild or Append Logic
-            # ... (Existing reconstruction logic kept similar but optimized for focus) ...
+            if last_loaded_id is not None and loaded:
+                # [TIMEOUT SAFETY] 10s limit
+                db_messages = await asyncio.wait_for(asyncio.to_thread(fetch_signed, chat_service.get_messages_since, tid, last_loaded_id), timeout=10)
+                if len(db_messages) >= config.MAX_MESSAGE_LIMIT:
+                    loaded = []  # Too far behind to patch; start over from the latest page
+                else:
+                    # Rebuild (from what we already have) only when the bubble mode changed (select/search)
+                    is_special = any(c.selection_mode != sel_mode for c in message_list_view.live_items())
+                    should_rebuild = is_special
+                    if should_rebuild:
+                        db_messages = loaded + db_messages
+
+            if not loaded:
+                db_messages = await asyncio.wait_for(asyncio.to_thread(fetch_signed, chat_service.get_messages, tid, MESSAGE_PAGE_SIZE), timeout=10)
+                state["has_more_history"] = len(db_messages) >= MESSAGE_PAGE_SIZE
+                state["oldest_loaded_msg"] = {"id": db_messages[0]["id"], "created_at": db_messages[0]["created_at"]} if db_messages else None
             
             if should_rebuild:
-                new_controls = []
-                first_unread_key = None
-                last_read_ts = state.get("last_read_at") # Timestamp string
-                
-                for m in db_messages:
-                    # Logic to find first unread
-                    # Assuming m['created_at'] is comparable to last_read_ts
-                    m_key = f"msg_{m['id']}"
-                    
-                    # Check unread
-                    if not first_unread_key and last_read_ts:
-                         if m.get('created_at', '') > last_read_ts:
-                             first_unread_key = m_key
-                    
-                    new_controls.append(ChatBubble(
-                        m, render_user_id, 
-                        key=m_key, # IMPORTANT: Add Key
-                        selection_mode=sel_mode, 
-                        on_select=on_msg_select, 
-                        on_image_click=show_image_viewer
-                    ))
-                
                 if my_id == render_context["last_id"]:
-                    message_list_view.controls = new_controls
+                    # Only the newest window of bubbles is built; older rows stay data until scrolled to
+                    message_list_view.set_messages(db_messages, rebuild=True)
                     
                     # [FIX] Update UI first so client has the items to scroll to
                     try:
@@ -1007,12 +1182,7 @@ async def get_chat_controls(page: ft.Page, navigate_to):
                             
                             async def safe_scroll_to_bottom(duration=300):
                                 try:
-                                    if hasattr(message_list_view, "scroll_to_async"):
-                                        await message_list_view.scroll_to_async(offset=-1, duration=duration)
-                                    else:
-                                        res = message_list_view.scroll_to(offset=-1, duration=duration)
-                                        if res is not None and hasattr(res, '__await__'):
-                                            await res
+                                    await message_list_view.scroll_to_end(duration=duration)
                                 except Exception as e:
                                     print(f"DEBUG_SCROLL_ERR: {e}")
 
@@ -1042,62 +1212,13 @@ async def get_chat_controls(page: ft.Page, navigate_to):
                              print(f"DEBUG_CHAT: Scroll Error: {scroll_ex}")
                              # Don't fail the whole load
                              pass
-            else:
-                 # Append only new messages
-                last_loaded_id = state.get("last_loaded_msg_id")
-                new_msgs_to_append = []
-                found_last = (last_loaded_id is None)
-                
-                for m in db_messages:
-                    if found_last:
-                        new_msgs_to_append.append(m)
-                    elif str(m.get("id")) == str(last_loaded_id):
-                        found_last = True
-                
-                if new_msgs_to_append and my_id == render_context["last_id"]:
-                    for m in new_msgs_to_append:
-                         m_key = f"msg_{m['id']}"
-                         message_list_view.controls.append(ChatBubble(
-                             m, render_user_id,
-                             key=m_key,
-                             selection_mode=sel_mode, 
-                             on_select=on_msg_select, 
-                             on_image_click=show_image_viewer
-                        ))
-                    
-                    # [FIX] Update UI first so client has the items to scroll to
-                    try:
-                        message_list_view.update()
-                    except:
-                        pass
-
-                    # Scroll logic for new messages
-                    # If it's my message, scroll. If others, show indicator.
-                    is_me = (new_msgs_to_append[-1].get("user_id") == current_user_id)
-                    if is_me:
-                        try:
-                            if hasattr(message_list_view, "scroll_to_async"):
-                                await message_list_view.scroll_to_async(offset=-1, duration=200)
-                            else:
-                                message_list_view.scroll_to(offset=-1, duration=200)
-                        except: pass
-                    else:
-                        div_bottom = 50 # Approximate pixel height of bottom input area
-                        if state.get("is_near_bottom"):
-                             # If user is already reading at bottom, just scroll
-                             try:
-                                if hasattr(message_list_view, "scroll_to_async"):
-                                    await message_list_view.scroll_to_async(offset=-1, duration=200)
-                                else:
-                                    message_list_view.scroll_to(offset=-1, duration=200)
-                             except: pass
-                        else:
-                             floating_new_msg_container.visible = True
-                             floating_new_msg_container.update()
+            elif db_messages and my_id == render_context["last_id"]:
+                # Append only new messages
+                await append_new_messages(db_messages)
             
             # 5. Atomic Update UI (Only if we are the LATEST thread)
             if my_id == render_context["last_id"]:
-                if db_messages:
+                if db_messages and should_rebuild:  # Appends advance the cursor in append_new_messages
                     state["last_loaded_msg_id"] = db_messages[-1].get("id")
                 
                 try: page.update()
@@ -1113,8 +1234,8 @@ async def get_chat_controls(page: ft.Page, navigate_to):
             # [FIX] UI Recovery on Error
             # If we are stuck with the spinner, show error
             if my_id == render_context["last_id"]:
-                 if message_list_view.controls and not isinstance(message_list_view.controls[0], ChatBubble):
-                     message_list_view.controls = [
+                 if not message_list_view.has_messages():
+                     message_list_view.show_placeholder(
                          ft.Container(
                              content=ft.Column([
                                  ft.Icon(ft.Icons.ERROR_OUTLINE, color="red"),
@@ -1124,7 +1245,7 @@ async def get_chat_controls(page: ft.Page, navigate_to):
                              alignment=ft.Alignment(0, 0),
                              padding=50
                          )
-                     ]
+                     )
                      try: page.update()
                      except: pass
 
@@ -1136,6 +1257,9 @@ async def get_chat_controls(page: ft.Page, navigate_to):
         state["current_topic_id"] = tid
         state["scrolled_to_unread"] = False # Reset for new room entry
         state["last_loaded_msg_id"] = None  # [FIX] Clear for ghost scroll guard
+        state["last_reconcile_ts"] = time.time()  # The first page is fresh
+        state["oldest_loaded_msg"] = None
+        state["has_more_history"] = True
         state["last_read_at"] = None        # [FIX] Clear to prevent stale entry scroll
         
         # [PRE-LOAD] Fetch last_read_at before we update it
@@ -1165,21 +1289,28 @@ async def get_chat_controls(page: ft.Page, navigate_to):
         state["view_mode"] = "chat"
         update_layer_view()
         
-        message_list_view.controls = [ft.Container(ft.ProgressRing(color="#2E7D32"), alignment=ft.Alignment(0, 0), padding=50)]
+        message_list_view.show_placeholder(ft.Container(ft.ProgressRing(color="#2E7D32"), alignment=ft.Alignment(0, 0), padding=50))
         page.update()
 
         # [FIX] Explicitly reset loading lock to prevent infinite spinner on room switch
         state["is_loading_messages"] = False
         asyncio.create_task(fetch_read_and_load())
+        asyncio.create_task(subscribe_topic_realtime(tid))
+        register_room_poll(tid)
 
     def load_messages():
         asyncio.create_task(load_messages_async())
 
     async def send_message(content=None, image_url=None):
+        # An attachment still compressing/uploading is sent as a placeholder without preview
+        # (a server-local file path is not loadable by the client)
+        pending_upload = None if (image_url or state.get("pending_image_url")) else state.get("pending_upload")
+        pending_name = (state.get("pending_file_name") or "첨부 파일") if pending_upload else None
         final_image_url = image_url or state.get("pending_image_url")
+        variants = {} if image_url else dict(state.get("pending_variants") or {})
         final_content = content or msg_input.value
         
-        if not final_content and not final_image_url: return
+        if not final_content and not final_image_url and not pending_upload: return
         if not state["current_topic_id"]: return
         
         # [OPTIMISTIC UI] 1. Inject Local Message Immediately
@@ -1192,6 +1323,7 @@ async def get_chat_controls(page: ft.Page, navigate_to):
             "id": f"temp_{time.time()}",
             "content": final_content,
             "image_url": final_image_url,
+            "pending_attachment": pending_name,
             "user_id": current_user_id,
             "created_at": datetime.now().isoformat(),
             "is_sending": True, # Flag for Bubble Opacity/Icon
@@ -1199,22 +1331,32 @@ async def get_chat_controls(page: ft.Page, navigate_to):
         }
         
         # Append to View
-        if not message_list_view.controls:
-            message_list_view.controls = []
-        message_list_view.controls.append(ChatBubble(temp_msg, current_user_id))
+        message_list_view.append([temp_msg], follow=True)
         
         # Clear Inputs Immediately (Instant Feel)
         msg_input.value = ""
         msg_input.focus()
         state["pending_image_url"] = None
+        state["pending_variants"] = {}
+        state["pending_upload"] = None
+        state["pending_file_name"] = None
         pending_container.visible = False
         pending_container.content = ft.Container()
         page.update()
         
         # 2. Background Send
+        topic_id = state["current_topic_id"]
         async def _do_send():
             try:
-                await asyncio.to_thread(chat_service.send_message, state["current_topic_id"], final_content, final_image_url, current_user_id)
+                send_url, send_variants = final_image_url, variants
+                if pending_upload:
+                    # Swap the placeholder for the uploaded URL once the media job finishes
+                    media = await pending_upload
+                    send_url, send_variants = media["public_url"], media
+                await asyncio.to_thread(
+                    chat_service.send_message, topic_id, final_content, send_url, current_user_id,
+                    send_variants.get("thumb_url"), send_variants.get("preview_url")
+                )
                 # Realtime will likely trigger update, but we call load just in case
                 # The load_messages_thread will merge/remove the temp message once DB has it
                 asyncio.create_task(load_messages_async())
@@ -1266,6 +1408,11 @@ async def get_chat_controls(page: ft.Page, navigate_to):
              except Exception:
                  pass  # Error UI display failed
 
+        if not is_web_mode and f.path:
+            # [OPTIMIZATION] Compress + upload on the media worker pool; sending does not wait for it
+            start_background_upload(f)
+            return
+
         try:
             update_snack(f"1/4. '{f.name}' 준비 중...")
             
@@ -1278,13 +1425,28 @@ async def get_chat_controls(page: ft.Page, navigate_to):
             active_picker = e.control
             
             # Synchronous Call triggers Browser Command immediately
-            result = await asyncio.to_thread(storage_service.handle_file_upload, is_web_mode, f, update_snack, picker_ref=active_picker)
+            result = await asyncio.to_thread(storage_service.handle_file_upload, is_web_mode, f, update_snack,
+                                             picker_ref=active_picker, allow_direct=True)
             
-            if result and "public_url" in result:
-                 state["pending_image_url"] = result["public_url"]
+            if result and result.get("public_url") and result.get("type") != "direct_upload_triggered":
+                 set_pending_media(result)
             
             if result:
-                 if result.get("type") == "proxy_upload_triggered":
+                 if result.get("type") == "direct_upload_triggered":
+                      # [OPTIMIZATION] Browser PUTs to the signed Storage URL; completion arrives via on_upload
+                      state["pending_direct"] = result
+                      update_snack("2/4. 저장소로 직접 전송 중...")
+                      pending_container.content = ft.Row([
+                            ft.Container(ft.ProgressRing(stroke_width=2, color="white"), width=40, height=40, alignment=ft.Alignment(0, 0), bgcolor="#424242", border_radius=5),
+                            ft.Column([
+                                ft.Text("업로드 중...", size=12, weight="bold", color="white"),
+                                ft.Text("0%", size=10, color="white70"),
+                            ], spacing=2, tight=True),
+                         ], spacing=10)
+                      pending_container.visible = True
+                      page.update()
+
+                 elif result.get("type") == "proxy_upload_triggered":
                       s_name = result["storage_name"]
                       state["pending_storage_name"] = s_name
                       update_snack("2/4. 서버 전송 시작...")
@@ -1299,78 +1461,32 @@ async def get_chat_controls(page: ft.Page, navigate_to):
                       pending_container.visible = True
                       page.update()
 
-                      # [BACKGROUND WATCHER]
-                      async def watch_server_file_target(target_name):
-                            import time, os, traceback
+                      # [OPTIMIZATION] Event-driven completion: the upload pipeline pushes the file to
+                      # Storage as soon as it lands (on_upload event or filesystem notification)
+                      async def await_proxy_upload(target_name, expected_size):
                             try:
-                                # [SCOPE FIX] Use Argument
-                                current_storage_name = target_name
-                                target_path = os.path.join("uploads", current_storage_name)
-                                log_info(f"Server Watcher Started: {target_path}")
-                                
-                                # [SMART WATCHER] Snapshot existing files
-                                initial_snapshot = set()
-                                if os.path.exists("uploads"):
-                                    initial_snapshot = set(os.listdir("uploads"))
-                                log_info(f"Watcher Snapshot: {len(initial_snapshot)} ignored.")
-
-                                # Wait up to 60 seconds
-                                for i in range(60):
-                                    await asyncio.sleep(1.0)
-                                    if not os.path.exists("uploads"): continue
-
-                                    # Check for Target OR New Files
-                                    found_new = False
-                                    if os.path.exists(target_path):
-                                        found_new = True
-                                    else:
-                                        try:
-                                            # Check Candidates
-                                            current_files = set(os.listdir("uploads"))
-                                            new_candidates = current_files - initial_snapshot
-                                            if new_candidates:
-                                                detected_name = list(new_candidates)[0]
-                                                log_info(f"SMART MATCH: New file detected: {detected_name}")
-                                                current_storage_name = detected_name
-                                                target_path = os.path.join("uploads", current_storage_name)
-                                                found_new = True
-                                        except Exception:
-                                            pass  # File detection failed
-                                    
-                                    if found_new:
-                                        # Stabilize
-                                        try:
-                                            size1 = os.path.getsize(target_path)
-                                            await asyncio.sleep(1.0)
-                                            if os.path.exists(target_path) and os.path.getsize(target_path) == size1:
-                                                 log_info("File Stable. Finalizing.")
-                                                 final_url = await asyncio.to_thread(storage_service.upload_proxy_file_to_supabase, current_storage_name)
-                                                 state["pending_image_url"] = final_url
-                                                 await update_pending_ui(final_url)
-                                                 page.open(ft.SnackBar(ft.Text("🔒 보안 업로드 완료!"), bgcolor="green"))
-                                                 page.update()
-                                                 return
-                                        except Exception as fin_ex:
-                                             log_info(f"Finalize Error: {fin_ex}")
-                                             await show_error_ui(f"업로드 실패: {fin_ex}")
-                                             return
-                                    
-                                    # Feedback (Simplified)
-                                    if i % 3 == 0:
-                                        try:
-                                            # Optional: Update text if container is valid
-                                            pass
-                                        except Exception:
-                                            pass  # UI feedback update failed
-
-                                log_info("Watcher Timeout")
+                                media = await asyncio.wait_for(
+                                    upload_pipeline.expect(target_name, expected_size),
+                                    timeout=config.PROXY_UPLOAD_TIMEOUT
+                                )
+                            except asyncio.TimeoutError:
+                                upload_pipeline.forget(target_name)
+                                log_info(f"Proxy upload timeout: {target_name}")
                                 await show_error_ui("시간 초과: 파일을 찾을 수 없습니다.")
-                            
-                            except Exception as ex:
-                                log_info(f"Watcher Crash: {ex}")
-                                await show_error_ui(f"시스템 오류: {ex}")
+                                return
+                            except asyncio.CancelledError:
+                                return
+                            except Exception as fin_ex:
+                                log_info(f"Finalize Error: {fin_ex}")
+                                await show_error_ui(f"업로드 실패: {fin_ex}")
+                                return
+                            if state.get("pending_storage_name") == target_name:
+                                state["pending_storage_name"] = None
+                            await update_pending_ui(set_pending_media(media))
+                            page.open(ft.SnackBar(ft.Text("🔒 보안 업로드 완료!"), bgcolor="green"))
+                            page.update()
 
-                      asyncio.create_task(watch_server_file_target(s_name))
+                      asyncio.create_task(await_proxy_upload(s_name, f.size))
 
                  elif result.get("type") == "web_upload_triggered":
                       pass
@@ -1393,6 +1509,9 @@ async def get_chat_controls(page: ft.Page, navigate_to):
             log_info(f"CRITICAL: Upload Event Error: {e.error}")
             page.open(ft.SnackBar(ft.Text(f"업로드 실패: {e.error}"), bgcolor="red"))
             page.update()
+            upload_pipeline.forget(state.get("pending_storage_name"))
+            state["pending_storage_name"] = None
+            state["pending_direct"] = None
             pending_container.visible = False
             page.update()
         else:
@@ -1407,26 +1526,16 @@ async def get_chat_controls(page: ft.Page, navigate_to):
 
             if e.progress == 1.0:
                 s_name = state.get("pending_storage_name")
-                if s_name:
-                    # [PROXY FINALIZATION]
-                    state["pending_storage_name"] = None # Reset
-                    
-                    async def finalize_step():
-                        try:
-                             final_url = await asyncio.to_thread(storage_service.upload_proxy_file_to_supabase, s_name)
-                             state["pending_image_url"] = final_url
-                             
-                             # Success UI
-                             asyncio.create_task(update_pending_ui(final_url))
-                             page.open(ft.SnackBar(ft.Text("🔒 보안 업로드 완료!"), bgcolor="green"))
-                             page.update()
-                        except Exception as fin_ex:
-                             print(f"Proxy Finalize Error: {fin_ex}")
-                             page.open(ft.SnackBar(ft.Text(f"처리 실패: {fin_ex}"), bgcolor="red"))
-                             page.update()
-                             
-                    asyncio.create_task(finalize_step())
-                
+                direct = state.get("pending_direct")
+                if direct:
+                    # [DIRECT UPLOAD] The object is already in Storage; only record its URL
+                    state["pending_direct"] = None
+                    await update_pending_ui(set_pending_media({"public_url": direct["public_url"]}))
+                    page.open(ft.SnackBar(ft.Text("업로드 완료!"), bgcolor="green"))
+                    page.update()
+                elif s_name:
+                    # [PROXY FINALIZATION] The pipeline uploads it and resolves await_proxy_upload
+                    upload_pipeline.notify_uploaded(s_name)
                 else:
                     asyncio.create_task(update_pending_ui(state.get("pending_image_url")))
                     page.open(ft.SnackBar(ft.Text("이미지 로드 완료!"), bgcolor="green"))
@@ -1435,6 +1544,7 @@ async def get_chat_controls(page: ft.Page, navigate_to):
     # [Flet 0.80+] Bind Global FilePicker
     if page.chat_file_picker:
         page.chat_file_picker.on_result = lambda e: asyncio.create_task(on_chat_file_result(e))
+        page.chat_file_picker.on_upload = lambda e: asyncio.create_task(on_chat_upload_progress(e))
 
     async def update_pending_ui(public_url):
         if not public_url: return
@@ -1451,7 +1561,7 @@ async def get_chat_controls(page: ft.Page, navigate_to):
         
         if ext in image_exts:
              preview_content = ft.Image(
-                src=public_url, 
+                src=(state.get("pending_variants") or {}).get("thumb_url") or public_url, 
                 fit=ft.BoxFit.COVER,
                 error_content=ft.Icon(ft.Icons.BROKEN_IMAGE, color="white") 
             )
@@ -1482,8 +1592,71 @@ async def get_chat_controls(page: ft.Page, navigate_to):
         pending_container.visible = True
         page.update()
 
+    def set_pending_media(media):
+        """Stage an uploaded attachment (original + WebP derivatives) for the next send."""
+        state["pending_image_url"] = media.get("public_url")
+        state["pending_variants"] = {k: media.get(k) for k in ("thumb_url", "preview_url")}
+        return state["pending_image_url"]
+
+    def set_pending_status(msg):
+        # Called from media worker threads
+        try:
+            pending_container.content.controls[1].controls[1].value = msg
+            pending_container.update()
+        except Exception:
+            pass  # Placeholder already replaced
+
+    def start_background_upload(f):
+        previous = state.get("pending_upload")
+        if previous and not previous.done():
+            previous.cancel()
+        state["pending_image_url"] = None
+        state["pending_file_name"] = f.name
+
+        pending_container.content = ft.Row([
+            ft.Container(ft.ProgressRing(stroke_width=2, color="white"), width=40, height=40, alignment=ft.Alignment(0, 0), bgcolor="#424242", border_radius=5),
+            ft.Column([
+                ft.Text(f.name, size=12, weight="bold", color="white"),
+                ft.Text("최적화 대기 중...", size=10, color="white70"),
+            ], spacing=2, tight=True),
+            ft.IconButton(ft.Icons.CANCEL, icon_color="red", on_click=lambda _: asyncio.create_task(clear_pending()))
+        ], spacing=10)
+        pending_container.visible = True
+        page.update()
+
+        task = asyncio.create_task(
+            storage_service.process_and_upload(f.path, storage_service.new_storage_name(f.name), set_pending_status)
+        )
+        state["pending_upload"] = task
+
+        async def finish():
+            try:
+                media = await task
+            except asyncio.CancelledError:
+                return
+            except Exception as ex:
+                log_info(f"Background upload failed: {ex}")
+                if state.get("pending_upload") is task:
+                    state["pending_upload"] = None
+                    page.open(ft.SnackBar(ft.Text(f"업로드 실패: {ex}"), bgcolor="red"))
+                    pending_container.visible = False
+                    page.update()
+                return
+            if state.get("pending_upload") is task:  # Not yet sent: show the uploaded preview
+                state["pending_upload"] = None
+                await update_pending_ui(set_pending_media(media))
+
+        asyncio.create_task(finish())
+
     async def clear_pending():
+        task = state.get("pending_upload")
+        state["pending_upload"] = None
+        if task and not task.done():
+            task.cancel()  # Cancels the media job too
         state["pending_image_url"] = None
+        state["pending_variants"] = {}
+        state["pending_direct"] = None
+        state["pending_file_name"] = None
         pending_container.visible = False
         page.update()
     
@@ -1977,6 +2150,8 @@ async def get_chat_controls(page: ft.Page, navigate_to):
             tid_snapshot = state.get("current_topic_id")
             state["current_topic_id"] = None
             state["last_loaded_msg_id"] = None
+            asyncio.create_task(unsubscribe_topic_realtime())
+            unregister_room_poll()
             
             # Switch View
             update_layer_view()
@@ -2022,10 +2197,14 @@ async def get_chat_controls(page: ft.Page, navigate_to):
         input_row_container.visible = not active
         page.update()
         
-        # [CRITICAL FIX] Reload messages on BOTH enter and exit to update checkboxes
-        # This prevents cascading re-renders when exiting
-        print(f"DEBUG_CHAT: Reloading messages for selection_mode={state.get('selection_mode')}")
-        await load_messages_async()
+        # [OPTIMIZATION] Flip the checkboxes of the on-screen bubbles in place (no list rebuild);
+        # off-screen bubbles pick up the mode when the window reaches them
+        for bubble in message_list_view.live_items():
+            bubble.set_selection_mode(active)
+        try:
+            message_list_view.update()
+        except Exception:
+            pass  # List not mounted (room closed)
 
 
     list_page_content = ft.Container(
@@ -2376,117 +2555,52 @@ async def get_chat_controls(page: ft.Page, navigate_to):
     msg_input.border_width = 1
 
     # [FIX] Robust Realtime Task
-    async def realtime_handler():
-        file_log_info("REALTIME HANDLER STARTED")
-        
-        # 1. Start Polling Task (Reliable fallback)
-        async def polling_loop():
-            file_log_info("POLLING LOOP STARTED")
-            # Wait a few seconds for UI to settle before even considering auto-cleanup
-            await asyncio.sleep(5)
-            count = 0
-            # [FIX] termination condition: is_active AND exact route match
-            while state["is_active"] and page.route == "chat":
-                # [FIX] Safer page check - only stop if page is explicitly gone AND it was previously there
-                if hasattr(page, "is_running") and not page.is_running:
-                    state["is_active"] = False
-                    break
-                
-                try:
-                    curr_tid = state.get("current_topic_id")
-                    last_id = state.get("last_loaded_msg_id")
-                    view_mode = state.get("view_mode")
-                    
-                    # A. Current Room Check
-                    if curr_tid:
-                        if not state.get("is_loading_messages"):
-                            if chat_service.check_new_messages(curr_tid, last_id):
-                                 file_log_info(f"POLLING: New message detected for {curr_tid}! Reloading.")
-                                 load_messages()
-                    
-                    # B. Background Topic Refresh (Real-time Badges)
-                    # [Iteration 10] Optimize refresh based on view mode
-                    # If in list: Refresh every loop (~3.3s)
-                    # If in chat: Refresh every 6 loops (~20s) - background sync
-                    should_refresh_topics = False
-                    if view_mode == "list":
-                        should_refresh_topics = True
-                    elif count % 6 == 0:
-                        should_refresh_topics = True
-                        
-                    if should_refresh_topics:
-                        do_ui = (view_mode == "list")
-                        # file_log_info(f"POLLING: Triggering topic refresh. UI={do_ui}")
-                        asyncio.create_task(load_topics_async(update_ui=do_ui, show_all=False))
-                    
-                    count += 1
-                except Exception as poll_ex:
-                    file_log_info(f"POLLING ERROR: {repr(poll_ex)}")
-                
-                # Increased interval to 15s to reduce lag, as we have Realtime connection
-                await asyncio.sleep(15.0)
-        
-        # 2. Start Realtime Connection
-        async def connection_loop():
-            file_log_info("CONNECTION LOOP STARTED")
-            while state["is_active"]:
-                try:
-                    rt = supabase.get_realtime_client()
-                    if not rt:
-                        await asyncio.sleep(60)
-                        continue
-                    
-                    await rt.connect()
-                    
-                    # [FIX] Spec change in realtime-py 2.x: use .on_postgres_changes
-                    channel = rt.channel("chat-sync")
-                    
-                    async def on_new_msg(payload):
-                        file_log_info("REALTIME: New Message Detected!")
-                        load_messages()
-
-                    channel.on_postgres_changes(
-                        event="INSERT",
-                        schema="public",
-                        table="chat_messages",
-                        callback=on_new_msg
-                    )
-                    
-                    await channel.subscribe()
-                    file_log_info("REALTIME: Subscribed to chat_messages")
-                    
-                    # Keep alive while active
-                    while state["is_active"] and page.route == "chat":
-                        await asyncio.sleep(10)
-                        
-                except Exception as rt_ex:
-                    file_log_info(f"REALTIME ERROR: {rt_ex}")
-                    await asyncio.sleep(30) # Prevent tight loop on error
-                finally:
-                    try:
-                        await rt.disconnect()
-                    except Exception:
-                        pass  # Realtime disconnect failed
+    # [OPTIMIZATION] Background sync runs as poll_scheduler jobs shared across sessions:
+    # - "chat:<user>"      probes the user's topics + unread counters once for all of their sessions
+    # - "chat-room:<tid>"  probes the open room's (newest id, count) once for everyone in it
+    # Each session applies a change in its own callback; jobs back off while nothing changes and
+    # Router.navigate_to cancels this page's subscriptions when leaving "chat".
+    async def on_user_sync_change(_fingerprint):
+        view_mode = state.get("view_mode")
+        await load_topics_async(update_ui=(view_mode == "list"), show_all=False)
+
+    async def on_room_change(_fingerprint):
+        if state.get("current_topic_id") and not state.get("is_loading_messages"):
+            state["last_reconcile_ts"] = 0  # A count drop means server-side deletes: reconcile now
+            await load_messages_async()
+
+    def register_room_poll(tid):
+        unregister_room_poll()
+        state["room_poll_token"] = poll_scheduler.register(
+            f"chat-room:{tid}", lambda: asyncio.to_thread(chat_service.get_room_fingerprint, tid), on_room_change,
+            owner=page, interval=15.0, max_interval=60.0
+        )
 
-        # Run both
-        await asyncio.gather(polling_loop(), connection_loop())
+    def unregister_room_poll():
+        poll_scheduler.unregister(state.get("room_poll_token"))
+        state["room_poll_token"] = None
 
     def init_chat():
         update_layer_view()
         load_topics(True)
         
-        # [OPTIMIZATION] Prevention of Multiple Realtime initializations
-        if not state.get("realtime_initialized"):
-            state["realtime_initialized"] = True
-            asyncio.create_task(realtime_handler())
-            print("[Chat] Realtime handler started.")
+        # [OPTIMIZATION] Prevention of Multiple Poll registrations
+        if not state.get("poll_token"):
+            state["poll_token"] = poll_scheduler.register(
+                f"chat:{current_user_id}",
+                lambda: asyncio.to_thread(chat_service.get_user_sync_fingerprint, current_user_id),
+                on_user_sync_change,
+                owner=page, interval=15.0, max_interval=60.0
+            )
+            print("[Chat] Background sync registered.")
         else:
-            print("[Chat] Realtime already running. Skipping re-init.")
+            print("[Chat] Background sync already running. Skipping re-init.")
 
     # [FIX] Defer initialization until mounted
     def on_chat_mount(e=None):
         print("[Chat] View mounted. Initializing.")
         init_chat()
+        asyncio.create_task(subscribe_cache_invalidation())
 
     main_stack = ft.Stack([
         ft.SafeArea(root_view, expand=True),
@@ -2494,4 +2608,15 @@ async def get_chat_controls(page: ft.Page, navigate_to):
     ], expand=True)
     main_stack.did_mount = on_chat_mount
 
+    def on_chat_unmount(e=None):
+        print("[Chat] View unmounted. Releasing realtime subscription.")
+        state["is_active"] = False
+        poll_scheduler.unregister(state.get("poll_token"))
+        state["poll_token"] = None
+        unregister_room_poll()
+        asyncio.create_task(unsubscribe_topic_realtime())
+        asyncio.create_task(unsubscribe_cache_invalidation())
+
+    main_stack.will_unmount = on_chat_unmount
+
     return [main_stack]
@@ -1,9 +1,47 @@
 import flet as ft
+from collections import OrderedDict
 from datetime import datetime, timedelta
+from functools import lru_cache
 import asyncio
 from views.styles import AppColors
 from views.components.custom_checkbox import CustomCheckbox
 
+IMAGE_EXTS = ("jpg", "jpeg", "png", "gif", "webp", "ico", "bmp")
+VIDEO_EXTS = ("mp4", "mov", "avi", "wmv", "mkv", "webm")
+
+
+@lru_cache(maxsize=4096)
+def format_time(created_at):
+    """"오전 9:05" style label for an ISO timestamp (memoized: rebuilds re-render the same rows)."""
+    if not created_at:
+        return ""
+    try:
+        dt = datetime.fromisoformat(created_at)
+    except ValueError:
+        return ""  # Invalid date format
+    if dt.tzinfo: dt = dt.astimezone()
+    else:
+       dt = dt + timedelta(hours=9)
+    ampm = "오전" if dt.hour < 12 else "오후"
+    hour = dt.hour if dt.hour <= 12 else dt.hour - 12
+    if hour == 0: hour = 12
+    return f"{ampm} {hour}:{dt.minute:02d}"
+
+
+@lru_cache(maxsize=4096)
+def media_kind(url):
+    """"image" / "video" / "file" from the attachment URL's extension (None without attachment)."""
+    if not url:
+        return None
+    clean_url = url.split("?")[0]
+    ext = clean_url.split(".")[-1].lower() if "." in clean_url else ""
+    if ext in IMAGE_EXTS:
+        return "image"
+    if ext in VIDEO_EXTS:
+        return "video"
+    return "file"
+
+
 class ChatBubble(ft.Container):
     def __init__(self, message, current_user_id, selection_mode=False, on_select=None, on_image_click=None, **kwargs):
         super().__init__(**kwargs)
@@ -33,19 +71,7 @@ class ChatBubble(ft.Container):
         is_me = self.is_me
         
         # Time Formatting
-        time_str = ""
-        if created_at:
-            try:
-                dt = datetime.fromisoformat(created_at)
-                if dt.tzinfo: dt = dt.astimezone()
-                else:
-                   dt = dt + timedelta(hours=9)
-                ampm = "오전" if dt.hour < 12 else "오후"
-                hour = dt.hour if dt.hour <= 12 else dt.hour - 12
-                if hour == 0: hour = 12
-                time_str = f"{ampm} {hour}:{dt.minute:02d}"
-            except ValueError:
-                pass  # Invalid date format
+        time_str = format_time(created_at)
             
         status_indicator = None
         if self.is_sending:
@@ -69,15 +95,17 @@ class ChatBubble(ft.Container):
             text_color = "black"
             border_side = None
         
-        if img_url:
-            clean_url = img_url.split("?")[0]
-            ext = clean_url.split(".")[-1].lower() if "." in clean_url else ""
-            if ext in ["jpg", "jpeg", "png", "gif", "webp", "ico", "bmp"]:
-                img_widget = ft.Image(src=img_url, width=200, height=200, fit=ft.BoxFit.COVER, border_radius=8)
+        kind = media_kind(img_url)
+        if kind:
+            if kind == "image":
+                # [OPTIMIZATION] Bubble shows the small WebP thumbnail, the viewer the preview (original as fallback)
+                thumb_src = msg.get("thumb_url") or img_url
+                viewer_src = msg.get("preview_url") or img_url
+                img_widget = ft.Image(src=thumb_src, width=200, height=200, fit=ft.BoxFit.COVER, border_radius=8)
                 if self.on_image_click:
-                    bubble_items.append(ft.Container(content=img_widget, on_click=lambda e: asyncio.create_task(self.on_image_click(img_url))))
+                    bubble_items.append(ft.Container(content=img_widget, on_click=lambda e: asyncio.create_task(self.on_image_click(viewer_src))))
                 else: bubble_items.append(img_widget)
-            elif ext in ["mp4", "mov", "avi", "wmv", "mkv", "webm"]:
+            elif kind == "video":
                 def play_video(e):
                     try:
                         v = ft.Video(expand=True, playlist=[ft.VideoMedia(img_url)], autoplay=True, show_controls=True)
@@ -88,9 +116,14 @@ class ChatBubble(ft.Container):
                 bubble_items.append(ft.Container(content=ft.Row([ft.Icon(ft.Icons.PLAY_CIRCLE_FILL, color="red"), ft.Text("비디오")], spacing=10), padding=10, border=ft.border.all(1, "grey"), on_click=play_video))
             else:
                 bubble_items.append(ft.Container(content=ft.Row([ft.Icon(ft.Icons.ATTACH_FILE), ft.Text("파일")], spacing=10), padding=10, border=ft.border.all(1, "grey"), on_click=lambda e: e.page.launch_url(img_url)))
+        elif msg.get("pending_attachment"):
+            # Optimistic bubble of an attachment still uploading: file name only, the preview comes with the real URL
+            bubble_items.append(ft.Container(content=ft.Row([ft.ProgressRing(width=14, height=14, stroke_width=2), ft.Text(msg["pending_attachment"], size=12)], spacing=10), padding=10, border=ft.border.all(1, "grey")))
         
+        self.text_ctrl = None
         if content:
-            bubble_items.append(ft.Text(content, color=text_color, size=14, selectable=not self.selection_mode))
+            self.text_ctrl = ft.Text(content, color=text_color, size=14, selectable=not self.selection_mode)
+            bubble_items.append(self.text_ctrl)
 
         bubble = ft.Container(
             content=ft.Column(bubble_items, spacing=5, tight=True),
@@ -101,23 +134,23 @@ class ChatBubble(ft.Container):
             border=border_side
         )
 
-        selection_ctrl = ft.Container(visible=False)
-        if self.selection_mode:
-            def handle_checkbox_change(cb):
-                if self.on_select and callable(self.on_select):
-                    result = self.on_select(self.message.get('id'), cb.value)
-                    if hasattr(result, '__await__'):
-                        asyncio.create_task(result)
-            
-            self.custom_checkbox = CustomCheckbox(
-                value=False,
-                on_change=handle_checkbox_change,
-                label_style=ft.TextStyle(size=0)
-            )
-            selection_ctrl = ft.Container(
-                content=self.custom_checkbox,
-                width=40, height=40, alignment=ft.Alignment(0, 0), visible=True
-            )
+        # The checkbox always exists; set_selection_mode() only flips its visibility
+        def handle_checkbox_change(cb):
+            if self.on_select and callable(self.on_select):
+                result = self.on_select(self.message.get('id'), cb.value)
+                if hasattr(result, '__await__'):
+                    asyncio.create_task(result)
+        
+        self.custom_checkbox = CustomCheckbox(
+            value=False,
+            on_change=handle_checkbox_change,
+            label_style=ft.TextStyle(size=0)
+        )
+        selection_ctrl = ft.Container(
+            content=self.custom_checkbox,
+            width=40, height=40, alignment=ft.Alignment(0, 0), visible=self.selection_mode
+        )
+        self.selection_ctrl = selection_ctrl
         # [FINAL ALIGNMENT] 
         # Me: RIGHT (MainAxisAlignment.END)
         # Others: LEFT (MainAxisAlignment.START)
@@ -145,31 +178,75 @@ class ChatBubble(ft.Container):
             ], alignment=ft.MainAxisAlignment.START, spacing=10)
 
 
-        # [Improved Selection UX] Click anywhere to toggle
-        if self.selection_mode:
-            print(f"DEBUG_BUBBLE: Creating GestureDetector for message {self.message.get('id')}")
-            async def toggle_bubble(e):
-                print(f"DEBUG_BUBBLE: GestureDetector on_tap triggered for message {self.message.get('id')}")
-                self.custom_checkbox.value = not self.custom_checkbox.value
-                print(f"DEBUG_BUBBLE: Checkbox value now: {self.custom_checkbox.value}")
-                # Need to call on_select first to update state
-                if self.on_select and callable(self.on_select):
-                    result = self.on_select(self.message.get('id'), self.custom_checkbox.value)
-                    if hasattr(result, '__await__'):
-                        await result
-                # Update the UI
-                self.custom_checkbox.update()
-                print(f"DEBUG_BUBBLE: After update()")
-            
-            # Wrap content in GestureDetector for full-area clicking
-            original_content = self.content
-            self.content = ft.GestureDetector(
-                content=original_content,
-                on_tap=lambda e: asyncio.create_task(toggle_bubble(e)),
-                mouse_cursor=ft.MouseCursor.CLICK
-            )
-            print(f"DEBUG_BUBBLE: GestureDetector created successfully")
+        # [Improved Selection UX] Click anywhere to toggle (tap handler only while selecting)
+        self.gesture = ft.GestureDetector(content=self.content)
+        self.content = self.gesture
+        self._apply_selection_mode()
 
         self.opacity = 0.6 if self.is_sending else 1.0
         self.padding = ft.padding.symmetric(vertical=5)
         self.expand = True # Essential for full-width in ListView
+
+    async def _toggle_bubble(self, e):
+        self.custom_checkbox.value = not self.custom_checkbox.value
+        # Need to call on_select first to update state
+        if self.on_select and callable(self.on_select):
+            result = self.on_select(self.message.get('id'), self.custom_checkbox.value)
+            if hasattr(result, '__await__'):
+                await result
+        # Update the UI
+        self.custom_checkbox.update()
+
+    def _apply_selection_mode(self):
+        active = self.selection_mode
+        self.selection_ctrl.visible = active
+        self.custom_checkbox.value = False
+        self.custom_checkbox.check_icon.visible = False
+        if self.text_ctrl:
+            self.text_ctrl.selectable = not active
+        self.gesture.on_tap = (lambda e: asyncio.create_task(self._toggle_bubble(e))) if active else None
+        self.gesture.mouse_cursor = ft.MouseCursor.CLICK if active else None
+
+    def set_selection_mode(self, active):
+        """Enter/leave selection mode in place (no rebuild); the checkbox starts unchecked."""
+        active = bool(active)
+        if active != self.selection_mode:
+            self.selection_mode = active
+            self._apply_selection_mode()
+
+
+class BubbleFactory:
+    """
+    Reuses ChatBubble controls across list rebuilds.
+    Bubbles are cached per (message id, is_me); a selection-mode switch toggles the cached bubble's
+    checkbox instead of constructing a new one. LRU-bounded so long sessions don't pin every bubble.
+    """
+    def __init__(self, current_user_id, on_select=None, on_image_click=None, maxsize=300):
+        self.current_user_id = current_user_id
+        self.on_select = on_select
+        self.on_image_click = on_image_click
+        self.maxsize = maxsize
+        self._bubbles = OrderedDict()
+
+    def get(self, message, selection_mode=False):
+        is_me = str(message.get("user_id")).strip().lower() == str(self.current_user_id).strip().lower()
+        key = (str(message.get("id")), is_me)
+        bubble = self._bubbles.get(key)
+        if bubble is None or (bubble.message is not message and bubble.message != message):
+            bubble = ChatBubble(
+                message, self.current_user_id,
+                key=f"msg_{message['id']}",
+                selection_mode=selection_mode,
+                on_select=self.on_select,
+                on_image_click=self.on_image_click
+            )
+            self._bubbles[key] = bubble
+            if len(self._bubbles) > self.maxsize:
+                self._bubbles.popitem(last=False)
+        else:
+            self._bubbles.move_to_end(key)
+            bubble.set_selection_mode(selection_mode)
+        return bubble
+
+    def clear(self):
+        self._bubbles.clear()
@@ -0,0 +1,165 @@
+import flet as ft
+import asyncio
+import math
+from bisect import bisect_right
+from views.components.chat_bubble import media_kind
+
+
+def estimate_height(message):
+    """Rough rendered height of a ChatBubble (px); only used to size the off-screen spacers."""
+    height = 56  # Padding, time and sender name rows
+    kind = media_kind(message.get("image_url"))
+    if kind:
+        height += 210 if kind == "image" else 50
+    content = message.get("content") or ""
+    if content:
+        lines = sum(max(1, math.ceil(len(line) / 28)) for line in content.split("\n"))
+        height += 20 * lines
+    return height
+
+
+class VirtualMessageList(ft.ListView):
+    """
+    Windowed chat list.
+    Every loaded message is kept as data, but only the visible bubbles plus `overscan` on each side
+    are live controls; two spacer containers stand in for the rest. Bubbles that stay in the window
+    are reused when it moves, so each update() patches a window-sized diff regardless of history length.
+    """
+    def __init__(self, build_item, window_size=40, overscan=10, on_scroll=None, **kwargs):
+        super().__init__(on_scroll=self._handle_scroll, **kwargs)
+        self._build_item = build_item  # message -> Control
+        self._window_size = window_size
+        self._overscan = overscan
+        self._user_on_scroll = on_scroll
+        self._messages = []
+        self._offsets = [0]  # Prefix sums of estimated heights
+        self._start = 0
+        self._end = 0
+        self._live = {}  # message key -> control currently in the window
+        self._pixels = 0.0
+        self._viewport = 0.0
+        self._top_spacer = ft.Container(height=0)
+        self._bottom_spacer = ft.Container(height=0)
+
+    # --- data ------------------------------------------------------------
+
+    @property
+    def messages(self):
+        return self._messages
+
+    def has_messages(self):
+        return bool(self._messages)
+
+    def live_items(self):
+        return list(self._live.values())
+
+    def set_messages(self, messages, rebuild=False):
+        """Replace the data and show the newest window. rebuild=True rebuilds the window's bubbles."""
+        if rebuild:
+            self._live = {}
+        self._messages = list(messages)
+        self._reindex()
+        self._place(len(self._messages) - self._window_size)
+
+    def prepend(self, messages):
+        """Older page: stays windowed around the current scroll offset (near the top)."""
+        self._messages[0:0] = messages
+        self._reindex()
+        self._place(self._index_at(self._pixels) - self._overscan)
+
+    def append(self, messages, follow=False):
+        """New rows. follow=True moves the window to the end (the view is about to scroll there)."""
+        self._messages.extend(messages)
+        self._reindex()
+        if follow:
+            self._place(len(self._messages) - self._window_size)
+        else:
+            self._place(self._start)  # Off-screen rows only grow the bottom spacer
+
+    def remove_where(self, predicate):
+        kept = [m for m in self._messages if not predicate(m)]
+        if len(kept) != len(self._messages):
+            self._messages = kept
+            self._reindex()
+            self._place(min(self._start, len(kept) - self._window_size))
+
+    def rebuild(self):
+        """Rebuild the live bubbles (e.g. selection mode changed); off-screen rows cost nothing."""
+        self._live = {}
+        self._place(self._start)
+
+    def show_placeholder(self, control):
+        """Loading / error state instead of messages."""
+        self._messages = []
+        self._reindex()
+        self._live = {}
+        self._start = self._end = 0
+        self.controls = [control]
+
+    async def scroll_to_end(self, duration=300):
+        if self._end < len(self._messages):
+            self._place(len(self._messages) - self._window_size)
+            self.update()
+        if hasattr(self, "scroll_to_async"):
+            await self.scroll_to_async(offset=-1, duration=duration)
+        else:
+            res = self.scroll_to(offset=-1, duration=duration)
+            if res is not None and hasattr(res, "__await__"):
+                await res
+
+    # --- windowing -------------------------------------------------------
+
+    @staticmethod
+    def _key(message):
+        return str(message.get("id"))
+
+    def _reindex(self):
+        offsets = [0]
+        for m in self._messages:
+            offsets.append(offsets[-1] + estimate_height(m) + (self.spacing or 0))
+        self._offsets = offsets
+
+    def _index_at(self, pixels):
+        return max(0, min(len(self._messages) - 1, bisect_right(self._offsets, pixels) - 1))
+
+    def _place(self, start):
+        n = len(self._messages)
+        self._start = max(0, min(start, n - self._window_size))
+        self._end = min(n, self._start + self._window_size)
+
+        live = {}
+        items = []
+        for m in self._messages[self._start:self._end]:
+            key = self._key(m)
+            control = self._live.get(key) or self._build_item(m)
+            live[key] = control
+            items.append(control)
+        self._live = live
+
+        self._top_spacer.height = self._offsets[self._start]
+        self._bottom_spacer.height = self._offsets[n] - self._offsets[self._end]
+        self.controls = [self._top_spacer, *items, self._bottom_spacer]
+
+    def _needs_move(self, first, last):
+        margin = self._overscan // 2
+        return (first < self._start + margin and self._start > 0) or \
+               (last >= self._end - margin and self._end < len(self._messages))
+
+    async def _handle_scroll(self, e: ft.OnScrollEvent):
+        self._pixels = e.pixels
+        self._viewport = e.viewport_dimension
+        if self._messages:
+            first = self._index_at(e.pixels)
+            last = self._index_at(e.pixels + e.viewport_dimension)
+            if self._needs_move(first, last):
+                visible = last - first + 1
+                self._window_size = max(self._window_size, visible + 2 * self._overscan)
+                self._place(first - self._overscan)
+                try:
+                    self.update()
+                except Exception:
+                    pass  # Not mounted
+        if self._user_on_scroll:
+            result = self._user_on_scroll(e)
+            if asyncio.iscoroutine(result):
+                await result
@@ -3,6 +3,7 @@ import asyncio
 import json
 from datetime import datetime, timedelta
 from services.handover_service import handover_service
+from services.poll_scheduler import poll_scheduler
 from services import audio_service
 from utils.logger import log_info, log_error, log_debug
 from views.styles import AppColors, AppTextStyles, AppLayout, AppButtons
@@ -490,6 +491,7 @@ async def get_handover_controls(page: ft.Page, navigate_to):
                     print("[VIEW DEBUG] Update success")
                     overlay.close()
                     await fetch_and_update()
+                    poll_scheduler.poke(poll_key)
                 else:
                     print("[VIEW DEBUG] Update returned False")
                     page.open(ft.SnackBar(ft.Text("수정 실패: 권한이 없거나 오류 발생"), bgcolor="red"))
@@ -526,6 +528,7 @@ async def get_handover_controls(page: ft.Page, navigate_to):
     async def delete_entry(item_id):
         await handover_service.delete_handover(item_id, user_id)
         await fetch_and_update()
+        poll_scheduler.poke(poll_key)
 
     async def render_feed():
         list_view.controls.clear()
@@ -606,6 +609,10 @@ async def get_handover_controls(page: ft.Page, navigate_to):
 
     async def fetch_and_update():
         raw = await handover_service.get_handovers(channel_id)
+        await apply_handovers(raw)
+
+    async def apply_handovers(raw):
+        raw = list(raw)
         from collections import defaultdict
         temp_grouped = defaultdict(lambda: {"handover": [], "order": []})
         raw.sort(key=lambda x: x.get("created_at") or "")
@@ -655,6 +662,7 @@ async def get_handover_controls(page: ft.Page, navigate_to):
         target_cat = "handover" if current_tab == "인수 인계" else "order"
         await handover_service.add_handover_entry(user_id, channel_id, target_cat, txt)
         await fetch_and_update()
+        poll_scheduler.poke(poll_key)  # Other sessions in this channel pick it up now
 
     async def on_tab_change(e):
         nonlocal current_tab
@@ -714,19 +722,22 @@ async def get_handover_controls(page: ft.Page, navigate_to):
     # Custom Header Container was combining title and tabs. 
     # Now AppHeader handles title. Tabs should be separate.
 
-    async def poll_updates():
-        while True:
-            await asyncio.sleep(POLL_INTERVAL)
-            # Only poll if this view is effectively active (simple check)
-            try:
-                await fetch_and_update()
-            except Exception:
-                break
+    # [OPTIMIZATION] One shared poll per channel (all open sessions), backing off while nothing changes.
+    # Released on unmount (and by Router.navigate_to / session close for this page).
+    poll_key = f"handover:{channel_id}"
+    poll_state = {"token": None}
 
     async def on_mount(e=None):
         print("[Handover] View mounted. Starting initial fetch.")
         await fetch_and_update()
-        asyncio.create_task(poll_updates())
+        poll_state["token"] = poll_scheduler.register(
+            poll_key, lambda: handover_service.get_handovers(channel_id), apply_handovers,
+            owner=page, interval=POLL_INTERVAL, max_interval=POLL_INTERVAL * 6
+        )
+
+    def on_unmount(e=None):
+        poll_scheduler.unregister(poll_state["token"])
+        poll_state["token"] = None
 
     main_layout = ft.SafeArea(
         expand=True,
@@ -741,5 +752,6 @@ async def get_handover_controls(page: ft.Page, navigate_to):
         expand=True
     )
     root_stack.did_mount = on_mount
+    root_stack.will_unmount = on_unmount
 
     return [root_stack]
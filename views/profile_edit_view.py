@@ -3,7 +3,7 @@ import asyncio
 import os
 from services.auth_service import auth_service
 from db import service_supabase, url
-from postgrest import SyncPostgrestClient
+from utils.cache import profile_cache
 from views.components.app_header import AppHeader
 from views.styles import AppColors, AppLayout, AppButtons
 
@@ -43,20 +43,17 @@ async def get_profile_edit_controls(page: ft.Page, navigate_to):
             if not headers:
                 raise Exception("세션이 만료되었습니다. 다시 로그인해주세요.")
             
-            # Use this client for the upsert
-            user_client = SyncPostgrestClient(f"{url}/rest/v1", headers=headers, schema="public", timeout=20)
+            # Use this client for the upsert (shares the pooled connection)
+            user_client = service_supabase.get_user_client(headers)
             
-            try:
-                # [SECURITY] role은 제외 - 이름만 업데이트
-                res_update = user_client.from_("profiles").upsert({
-                    "id": user.id,
-                    "full_name": name_tf.value,
-                    "updated_at": "now()"
-                }).execute()
-            finally:
-                try: user_client.session.close()
-                except Exception: pass
+            # [SECURITY] role은 제외 - 이름만 업데이트
+            res_update = user_client.from_("profiles").upsert({
+                "id": user.id,
+                "full_name": name_tf.value,
+                "updated_at": "now()"
+            }).execute()
 
+            profile_cache.clear()  # Member name lists are cached per channel
             msg.value = "저장 완료!"
             msg.color = "green"
             page.update()
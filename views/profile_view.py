@@ -3,6 +3,7 @@ import asyncio
 from services.channel_service import channel_service
 from services.auth_service import auth_service
 from db import service_supabase
+from utils.cache import profile_cache
 from views.components.app_header import AppHeader
 from views.components.modal_overlay import ModalOverlay
 from views.styles import AppColors, AppLayout
@@ -123,6 +124,7 @@ async def get_profile_controls(page: ft.Page, navigate_to):
                 "full_name": profile_name_tf.value,
                 "updated_at": "now()"
             }).execute())
+            profile_cache.clear()  # Member name lists are cached per channel
             page.app_session["display_name"] = profile_name_tf.value
             page.open(ft.SnackBar(ft.Text("프로필이 저장되었습니다."), bgcolor="green"))
             overlay.close()
@@ -3,7 +3,6 @@ import asyncio
 from services.channel_service import channel_service
 from services.auth_service import auth_service
 from db import service_supabase
-from postgrest import SyncPostgrestClient
 import os
 from datetime import datetime, timezone
 from utils.logger import log_debug, log_error, log_info
@@ -304,13 +304,11 @@ async def get_work_controls(page: ft.Page, navigate_to):
                  }
 
                  from services.auth_service import auth_service
-                 from postgrest import SyncPostgrestClient
                  headers = auth_service.get_auth_headers()
                  if not headers: return
                  if "apikey" not in headers: headers["apikey"] = os.environ.get("SUPABASE_KEY")
                  
-                 url = os.environ.get("SUPABASE_URL")
-                 client = SyncPostgrestClient(f"{url}/rest/v1", headers=headers, schema="public", timeout=20)
+                 client = service_supabase.get_user_client(headers)
                  
                  if edit_mode.value == "correction":
                      # SIMPLE UPDATE
@@ -412,12 +410,10 @@ async def get_work_controls(page: ft.Page, navigate_to):
         async def save_action(e=None):
             try:
                 from services.auth_service import auth_service
-                from postgrest import SyncPostgrestClient
                 headers = auth_service.get_auth_headers()
                 if not headers: return
                 if "apikey" not in headers: headers["apikey"] = os.environ.get("SUPABASE_KEY")
-                url = os.environ.get("SUPABASE_URL")
-                client = SyncPostgrestClient(f"{url}/rest/v1", headers=headers, schema="public", timeout=20)
+                client = service_supabase.get_user_client(headers)
 
                 new_val = res_date.value if mode == "resign" else None
                 await asyncio.to_thread(lambda: client.from_("labor_contracts").update({"contract_end_date": new_val}).eq("id", contract['id']).execute())
@@ -463,13 +459,11 @@ async def get_work_controls(page: ft.Page, navigate_to):
 
         try:
             from services.auth_service import auth_service
-            from postgrest import SyncPostgrestClient
             headers = auth_service.get_auth_headers()
             if not headers: return
             if "apikey" not in headers: headers["apikey"] = os.environ.get("SUPABASE_KEY")
             
-            url = os.environ.get("SUPABASE_URL")
-            client = SyncPostgrestClient(f"{url}/rest/v1", headers=headers, schema="public", timeout=20)
+            client = service_supabase.get_user_client(headers)
             
             # [Cleanup] Delete contracts resigned more than 30 days ago
             one_month_ago = (datetime.now() - timedelta(days=30)).strftime("%Y-%m-%d")
@@ -679,13 +673,11 @@ async def get_work_controls(page: ft.Page, navigate_to):
         async def _delete():
             try:
                 from services.auth_service import auth_service
-                from postgrest import SyncPostgrestClient
                 headers = auth_service.get_auth_headers()
                 if not headers: return
                 if "apikey" not in headers: headers["apikey"] = os.environ.get("SUPABASE_KEY")
                 
-                url = os.environ.get("SUPABASE_URL")
-                client = SyncPostgrestClient(f"{url}/rest/v1", headers=headers, schema="public", timeout=20)
+                client = service_supabase.get_user_client(headers)
                 
                 await asyncio.to_thread(lambda: client.from_("labor_contracts").delete().eq("id", contract_id).execute())
                 
@@ -709,15 +701,13 @@ async def get_work_controls(page: ft.Page, navigate_to):
 
                 # 1. Setup Client FIRST
                 from services.auth_service import auth_service
-                from postgrest import SyncPostgrestClient
                 headers = auth_service.get_auth_headers()
                 if not headers:
                     page.open(ft.SnackBar(ft.Text("인증 정보가 없습니다. 다시 로그인해주세요."), bgcolor="red"))
                     page.update()
                     return
                 if "apikey" not in headers: headers["apikey"] = os.environ.get("SUPABASE_KEY")
-                url = os.environ.get("SUPABASE_URL")
-                client = SyncPostgrestClient(f"{url}/rest/v1", headers=headers, schema="public", timeout=20)
+                client = service_supabase.get_user_client(headers)
 
                 # 2. Build Work Schedule
                 work_schedule = {}